@@ -0,0 +1,172 @@
+"""
+Import-time breakdown of the agent packages served by main.py.
+
+Each agent package is imported in a fresh interpreter with `python -X
+importtime`, so every package is measured as a cold start would see it, not
+after another package has already loaded the shared dependencies. For each
+package the report shows the total import time, the part spent in the ADK
+framework (paid once per process), the package's own modules, and the
+heaviest third-party modules it pulls in.
+
+Usage:
+    python import_times.py                    # all agent packages
+    python import_times.py lesson_planner     # selected packages
+    python import_times.py --json             # machine-readable output
+    python import_times.py --max-seconds 3    # exit 1 if any package is slower
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
+FRAMEWORK_PREFIXES = ("google.adk",)
+
+
+def discover_agent_packages(agents_dir: str = AGENT_DIR) -> List[str]:
+    """Lists the agent packages (directories with an __init__.py) in agents_dir."""
+    return sorted(
+        name for name in os.listdir(agents_dir)
+        if not name.startswith((".", "_"))
+        and os.path.isfile(os.path.join(agents_dir, name, "__init__.py"))
+    )
+
+
+def _parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parses `-X importtime` lines into module, self_us, cumulative_us and depth."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip(" "))) // 2
+        })
+    return entries
+
+
+def measure_package(package: str, agents_dir: str = AGENT_DIR, top: int = 5) -> Dict[str, Any]:
+    """
+    Imports one agent package in a fresh interpreter and breaks down where
+    its import time goes.
+
+    Returns:
+        Dictionary with package, status, total_seconds, framework_seconds,
+        package_seconds and the heaviest third-party modules (cumulative)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {package}"],
+        cwd=agents_dir,
+        capture_output=True,
+        text=True
+    )
+    entries = _parse_importtime(completed.stderr)
+    if completed.returncode != 0:
+        error_lines = [
+            line for line in completed.stderr.splitlines()
+            if re.match(r"[\w.]+(Error|Exception)\b", line)
+        ]
+        return {
+            "package": package,
+            "status": "error",
+            "error_message": error_lines[-1] if error_lines else f"exit code {completed.returncode}"
+        }
+
+    # Top-level imports (depth 0) add up to the whole import
+    total_us = sum(entry["cumulative_us"] for entry in entries if entry["depth"] == 0)
+    own_prefix = package + "."
+
+    def kind(module: str) -> str:
+        if module == package or module.startswith(own_prefix):
+            return "own"
+        if module.startswith(FRAMEWORK_PREFIXES):
+            return "framework"
+        if module.split(".")[0] in sys.stdlib_module_names:
+            return "stdlib"
+        return "third_party"
+
+    # Count each subtree once, at its outermost framework or third-party
+    # module; third-party modules under 1 ms are interpreter startup noise
+    framework_us = 0
+    outermost_third_party = []
+    for entry, parent in zip(entries, _parent_modules(entries)):
+        entry_kind = kind(entry["module"])
+        parent_kind = kind(parent) if parent else None
+        if entry_kind == "framework" and parent_kind != "framework":
+            framework_us += entry["cumulative_us"]
+        elif (
+            entry_kind == "third_party" and parent_kind not in ("framework", "third_party")
+            and entry["cumulative_us"] >= 1000
+        ):
+            outermost_third_party.append(entry)
+    package_us = sum(entry["self_us"] for entry in entries if kind(entry["module"]) == "own")
+    heaviest = sorted(outermost_third_party, key=lambda entry: entry["cumulative_us"], reverse=True)[:top]
+    return {
+        "package": package,
+        "status": "success",
+        "total_seconds": round(total_us / 1e6, 3),
+        "framework_seconds": round(framework_us / 1e6, 3),
+        "package_seconds": round(package_us / 1e6, 3),
+        "heaviest_modules": [
+            {"module": entry["module"], "seconds": round(entry["cumulative_us"] / 1e6, 3)}
+            for entry in heaviest
+        ]
+    }
+
+
+def _parent_modules(entries: List[Dict[str, Any]]) -> List[Optional[str]]:
+    """Returns the module that imported each entry (None for top-level imports)."""
+    # importtime prints a module after its children; walking the lines in
+    # reverse visits every module before the ones it imported
+    parents: List[Optional[str]] = [None] * len(entries)
+    stack: List[Dict[str, Any]] = []
+    for index in range(len(entries) - 1, -1, -1):
+        entry = entries[index]
+        while stack and stack[-1]["depth"] >= entry["depth"]:
+            stack.pop()
+        parents[index] = stack[-1]["module"] if stack else None
+        stack.append(entry)
+    return parents
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time breakdown per agent package")
+    parser.add_argument("packages", nargs="*", help="Agent packages to measure (default: all)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest third-party modules to show per package")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="Exit with status 1 if any package takes longer to import")
+    args = parser.parse_args(argv)
+
+    reports = [measure_package(package, top=args.top) for package in (args.packages or discover_agent_packages())]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print(f"{'package':<26}{'total s':>9}{'adk s':>9}{'own s':>9}  heaviest third-party modules")
+        for report in reports:
+            if report["status"] != "success":
+                print(f"{report['package']:<26}  error: {report['error_message']}")
+                continue
+            heaviest = ", ".join(f"{module['module']} {module['seconds']:.2f}" for module in report["heaviest_modules"])
+            print(
+                f"{report['package']:<26}{report['total_seconds']:>9.2f}{report['framework_seconds']:>9.2f}"
+                f"{report['package_seconds']:>9.3f}  {heaviest}"
+            )
+
+    failed = any(report["status"] != "success" for report in reports)
+    too_slow = args.max_seconds is not None and any(
+        report.get("total_seconds", 0) > args.max_seconds for report in reports
+    )
+    return 1 if failed or too_slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
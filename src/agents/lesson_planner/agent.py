@@ -14,12 +14,15 @@
 
 """Lesson_planner: Create detailed weekly lesson plans for teachers with day-by-day breakdown."""
 
-from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
 from google.adk.tools.agent_tool import AgentTool
 
 # # Import sub-agents from sub_agents folder
 # from .sub_agents.teacher_intent_processor.agent import root_agent as teacher_intent_processor
 from .sub_agents.curriculum_content_retriever.agent import root_agent as curriculum_content_retriever
+from .sub_agents.curriculum_content_retriever.config import CURRICULUM_RETRIEVAL_MODE
+from .sub_agents.curriculum_content_retriever.retrieval_stage import retrieval_stage
+from .sub_agents.curriculum_content_retriever.tools.rate_limiter import limit_model_calls
 # from .sub_agents.lesson_plan_generator.agent import root_agent as lesson_plan_generator
 # from .sub_agents.lesson_plan_validator.agent import root_agent as lesson_plan_validator
 
@@ -75,7 +78,8 @@ Provide a structured analysis in JSON format:
 
 Output *only* the JSON analysis. Do not add explanatory text before or after.""",
     description="Analyzes teacher's pedagogical intentions and goals from their request.",
-    output_key="teacher_intent_analysis"
+    output_key="teacher_intent_analysis",
+    before_model_callback=limit_model_calls
 )
 
 # Lesson Plan Generator Agent  
@@ -184,6 +188,7 @@ Create a comprehensive lesson plan in structured format:
 Output *only* the complete markdown lesson plan. Do not add explanatory text before or after.""",
     description="Creates detailed 5-day lesson plans based on teacher intent and curriculum content.",
     # output_key="generated_lesson_plan"
+    before_model_callback=limit_model_calls
 )
 
 # Lesson Plan Validator Agent
@@ -257,21 +262,41 @@ If no issues are found:
 
 Output *only* the JSON validation result. Do not add explanatory text before or after.""",
     description="Validates lesson plans against educational standards and best practices.",
-    output_key="validation_result"
+    output_key="validation_result",
+    before_model_callback=limit_model_calls
 )
 
-# --- 2. Create the SequentialAgent ---
+# --- 2. Create the Preparation Stage ---
+# Content retrieval is either the deterministic retrieval stage, which
+# searches the corpora without a model call ("direct"), or the curriculum
+# retriever LLM agent ("llm")
+if CURRICULUM_RETRIEVAL_MODE not in ("direct", "llm"):
+    raise ValueError(f"Unknown curriculum retrieval mode '{CURRICULUM_RETRIEVAL_MODE}'. Expected 'direct' or 'llm'.")
+curriculum_retrieval = curriculum_content_retriever if CURRICULUM_RETRIEVAL_MODE == "llm" else retrieval_stage
+
+# Intent analysis and content retrieval both work from the teacher's request
+# alone, so they run concurrently. Each writes its own state key
+# (teacher_intent_analysis, curriculum_content) for plan generation.
+lesson_preparation_stage = ParallelAgent(
+    name="lesson_preparation_stage",
+    description="Analyzes the teacher's intent and retrieves curriculum content at the same time.",
+    sub_agents=[
+        teacher_intent_analysis_agent,
+        curriculum_retrieval
+    ]
+)
+
+# --- 3. Create the SequentialAgent ---
 # This agent orchestrates the pipeline by running the sub_agents in order.
 lesson_planning_workflow = SequentialAgent(
     name="lesson_planning_workflow",
-    description="Executes a complete sequence of lesson planning: intent analysis, content retrieval, plan generation, and validation.",
+    description="Executes a complete sequence of lesson planning: intent analysis and content retrieval, plan generation, and validation.",
     sub_agents=[
-        teacher_intent_analysis_agent,
-        curriculum_content_retriever, 
+        lesson_preparation_stage,
         lesson_plan_creation_agent,
         # lesson_plan_validation_agent
     ]
-    # The agents will run in order: Intent Analysis -> Content Retrieval -> Plan Generation -> Validation
+    # The agents will run in order: (Intent Analysis + Content Retrieval) -> Plan Generation -> Validation
 )
 
 # For ADK tools compatibility, the root agent must be named `root_agent`
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the lesson planning pipeline. Each module runs with
+`python -m` from src/agents and needs no Google Cloud access.
+"""
@@ -0,0 +1,146 @@
+"""
+Benchmark: end-to-end lesson planner latency by pipeline layout.
+
+Runs the lesson planning pipeline through an ADK Runner with every Gemini
+model replaced by a stub that answers after a fixed latency, and retrieval
+served by the local backend with a simulated network latency. The stubbed
+retriever makes one search_all_corpora call and then summarizes, like the
+real one does for a simple request.
+
+- sequential: intent analysis -> content retrieval -> plan generation
+- parallel: (intent analysis + content retrieval) -> plan generation, the
+  layout of lesson_planner.agent with CURRICULUM_RETRIEVAL_MODE=llm
+- direct: (intent analysis + deterministic retrieval stage) -> plan
+  generation, the default layout, with no retriever model calls
+
+Run from src/agents:
+    python -m lesson_planner.benchmarks.pipeline_latency
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent, ParallelAgent, SequentialAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from .. import agent as lesson_planner
+from ..sub_agents.curriculum_content_retriever.benchmarks.slow_backend import install_slow_backend
+from ..sub_agents.curriculum_content_retriever.retrieval_stage import retrieval_stage
+from ..sub_agents.curriculum_content_retriever.tools import corpus_tools
+
+_REQUEST = "Plan a week of Class 7 science lessons on photosynthesis with group activities."
+
+
+class _StubLlm(BaseLlm):
+    """Model that answers after latency_seconds, optionally calling a tool first."""
+
+    latency_seconds: float
+    text: str
+    tool_call: Optional[Dict[str, Any]] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.latency_seconds)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered = last is not None and any(part.function_response for part in last.parts or [])
+        if self.tool_call and not answered:
+            part = types.Part(function_call=types.FunctionCall(name=self.tool_call["name"], args=self.tool_call["args"]))
+        else:
+            part = types.Part(text=self.text)
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def _stub(agent: LlmAgent, **model_fields: Any) -> LlmAgent:
+    """Copies an agent of lesson_planner.agent with a stub model and no parent."""
+    return agent.model_copy(update={"model": _StubLlm(model="stub", **model_fields), "parent_agent": None})
+
+
+def _build(layout: str, latencies: Dict[str, float]) -> BaseAgent:
+    intent = _stub(
+        lesson_planner.teacher_intent_analysis_agent,
+        latency_seconds=latencies["intent"],
+        text='{"subject_area": "science", "grade_level": "7"}'
+    )
+    retriever = _stub(
+        lesson_planner.curriculum_content_retriever,
+        latency_seconds=latencies["retriever"],
+        text="Photosynthesis: plants make food from sunlight, carbon dioxide and water. [Source: S1]",
+        tool_call={"name": "search_all_corpora", "args": {"query_text": "photosynthesis class 7"}}
+    )
+    creation = _stub(
+        lesson_planner.lesson_plan_creation_agent,
+        latency_seconds=latencies["generation"],
+        text="# Weekly Lesson Plan: Photosynthesis for Class 7"
+    )
+    if layout == "sequential":
+        sub_agents = [intent, retriever, creation]
+    elif layout == "direct":
+        stage = retrieval_stage.model_copy(update={"parent_agent": None})
+        sub_agents = [ParallelAgent(name="lesson_preparation_stage", sub_agents=[intent, stage]), creation]
+    else:
+        sub_agents = [ParallelAgent(name="lesson_preparation_stage", sub_agents=[intent, retriever]), creation]
+    return SequentialAgent(name=f"{layout}_workflow", sub_agents=sub_agents)
+
+
+async def _run_once(workflow: BaseAgent) -> float:
+    runner = InMemoryRunner(agent=workflow, app_name="pipeline_latency")
+    session = await runner.session_service.create_session(app_name="pipeline_latency", user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text=_REQUEST)])
+
+    started = time.perf_counter()
+    async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        pass
+    wall = time.perf_counter() - started
+
+    session = await runner.session_service.get_session(
+        app_name="pipeline_latency", user_id="bench", session_id=session.id
+    )
+    missing = [key for key in ("teacher_intent_analysis", "curriculum_content") if key not in session.state]
+    if missing:
+        raise RuntimeError(f"Pipeline finished without {', '.join(missing)} in state")
+    return wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Pipeline runs per layout")
+    parser.add_argument("--intent-latency", type=float, default=1.5, help="Seconds per intent analysis model call")
+    parser.add_argument("--retriever-latency", type=float, default=0.8, help="Seconds per retriever model call")
+    parser.add_argument("--generation-latency", type=float, default=3.0, help="Seconds per plan generation model call")
+    parser.add_argument("--retrieval-latency", type=float, default=0.3, help="Simulated seconds per retrieval")
+    args = parser.parse_args()
+    # ADK 1.1.1 runs ParallelAgent branches in separate tasks, and OpenTelemetry
+    # logs a harmless "Failed to detach context" for every span they close
+    logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+    install_slow_backend(args.retrieval_latency)
+    latencies = {
+        "intent": args.intent_latency,
+        "retriever": args.retriever_latency,
+        "generation": args.generation_latency
+    }
+    print(
+        f"{args.runs} runs per layout; model latency intent {args.intent_latency:.1f} s, "
+        f"retriever {args.retriever_latency:.1f} s x2, generation {args.generation_latency:.1f} s; "
+        f"retrieval {args.retrieval_latency:.1f} s"
+    )
+    print(f"{'layout':<12}{'median s':>10}{'min s':>10}{'max s':>10}")
+    for layout in ("sequential", "parallel", "direct"):
+        walls = []
+        for _ in range(args.runs):
+            # Every run retrieves upstream rather than from the caches
+            corpus_tools.retrieval_cache.clear()
+            corpus_tools.get_semantic_cache().clear()
+            walls.append(asyncio.run(_run_once(_build(layout, latencies))))
+        print(f"{layout:<12}{statistics.median(walls):>10.2f}{min(walls):>10.2f}{max(walls):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ from google.adk.tools.load_memory_tool import load_memory_tool
 # Local tool imports
 from .tools import corpus_tools
 from .tools import storage_tools
+from .tools.context_packer import pack_curriculum_content, record_retrieved_chunks
+from .tools.rate_limiter import limit_model_calls
 from .config import (
     AGENT_NAME,
     AGENT_MODEL,
@@ -29,13 +31,15 @@ agent = Agent(
        - SEARCH ALL CORPORA: Use search_all_corpora(query_text="your question") to search across ALL available corpora
        - SEARCH SPECIFIC CORPUS: Use query_rag_corpus(corpus_id="ID", query_text="your question") for a specific corpus
        - When the user asks a question or for information, use the search_all_corpora tool by default.
+       - When the grade, subject, board or language is known (for example from the teacher's request), pass it as grade_level, subject_area, board or language so only the matching corpora are searched.
        - If the user specifies a corpus ID, use the query_rag_corpus tool for that corpus.
        
        - IMPORTANT - CITATION FORMAT:
          - When presenting search results, ALWAYS include the citation information
          - Format each result with its citation at the end: "[Source: Corpus Name (Corpus ID)]"
-         - You can find citation information in each result's "citation" field
-         - At the end of all results, include a Citations section with the citation_summary information
+         - search_all_corpora results cite a source ID (e.g. "S1"); look the ID up in the response's "citations" table for the citation text; a result with "also_in" appears in those sources too, so cite all of them
+         - query_rag_corpus results all come from the corpus in the response's "corpus_id"; cite that corpus and the result's source_uri file
+         - At the end of all results, include a Citations section listing every source you used
 
     Always executing them , do not ask any questions to the user, just execute the tools directly.
    
@@ -50,7 +54,13 @@ agent = Agent(
         load_memory_tool,
     ],
     # Output key automatically saves the agent's final response in state under this key
-    output_key="curriculum_content"
+    output_key="curriculum_content",
+    # Wait for Gemini quota before each model call
+    before_model_callback=limit_model_calls,
+    # Keep the retrieved chunks, then pack curriculum_content into the
+    # plan generator's token budget
+    after_tool_callback=record_retrieved_chunks,
+    after_agent_callback=pack_curriculum_content
 )
 
 root_agent = agent
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the curriculum content retriever tools. Each module runs with
+`python -m` from src/agents and needs no Google Cloud access.
+"""
@@ -0,0 +1,81 @@
+"""
+Benchmark: retrieval tail latency with and without hedged requests.
+
+Sends query_rag_corpus calls from several concurrent clients to the local
+backend with a heavy-tailed simulated latency: most retrievals take
+--fast-latency seconds, a --slow-fraction of them take --slow-latency. Each
+run reports the call latency percentiles and, from the retrieval policy's
+stats, what they would have been without hedging.
+
+Run from src/agents:
+    python -m lesson_planner.sub_agents.curriculum_content_retriever.benchmarks.hedging
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from ..tools import corpus_tools
+from ..tools.backends.local import LocalVectorBackend
+from ..tools.retry_policy import RetrievalPolicy
+
+
+class _HeavyTailBackend(LocalVectorBackend):
+    """Local backend whose retrievals are usually fast and sometimes very slow."""
+
+    def __init__(self, fast_latency: float, slow_latency: float, slow_fraction: float, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.fast_latency = fast_latency
+        self.slow_latency = slow_latency
+        self.slow_fraction = slow_fraction
+
+    def retrieve(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        slow = random.random() < self.slow_fraction
+        time.sleep(self.slow_latency if slow else self.fast_latency)
+        return super().retrieve(*args, **kwargs)
+
+
+def _run(corpus_id: str, hedge: bool, calls: int, clients: int) -> Dict[str, Any]:
+    corpus_tools.retrieval_policy = RetrievalPolicy(hedge=hedge, hedge_percentile=95, hedge_min_samples=20)
+    corpus_tools.retrieval_cache.clear()
+
+    def query(i: int) -> None:
+        corpus_tools.query_rag_corpus(corpus_id, f"photosynthesis {i}", vector_distance_threshold=1.0)
+
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(query, range(calls)))
+    # Let losing primaries finish so their would-be latency is recorded
+    time.sleep(1.0)
+    return corpus_tools.retrieval_policy.stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=400, help="Retrievals per run")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent callers")
+    parser.add_argument("--fast-latency", type=float, default=0.02, help="Seconds of a normal retrieval")
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="Seconds of a slow retrieval")
+    parser.add_argument("--slow-fraction", type=float, default=0.03, help="Share of slow retrievals")
+    args = parser.parse_args()
+
+    random.seed(7)
+    backend = _HeavyTailBackend(args.fast_latency, args.slow_latency, args.slow_fraction, chunk_size=50, chunk_overlap=10)
+    corpus_tools.set_retrieval_backend(backend)
+    corpus_id = corpus_tools.create_rag_corpus("Benchmark Science")["corpus_id"]
+    backend.add_document(corpus_id, "Photosynthesis is how green plants use sunlight to make food.", source_uri="bench://science.txt")
+
+    print(f"{args.calls} retrievals from {args.clients} clients; {args.slow_fraction:.0%} take {args.slow_latency:.2f} s, the rest {args.fast_latency:.2f} s")
+    print(f"{'mode':<10}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'unhedged p99 s':>16}{'hedges':>8}{'wins':>6}{'attempts':>10}")
+    for name, hedge in (("single", False), ("hedged", True)):
+        stats = _run(corpus_id, hedge, args.calls, args.clients)
+        latency = stats["latency_seconds"]
+        print(
+            f"{name:<10}{latency['p50']:>8.3f}{latency['p95']:>8.3f}{latency['p99']:>8.3f}"
+            f"{stats['unhedged_latency_seconds']['p99']:>16.3f}{stats['hedges']:>8}{stats['hedge_wins']:>6}{stats['attempts']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Local backend with simulated retrieval latency, shared by the benchmarks.
+
+Benchmarks run without Google Cloud access, so they stand in for Vertex AI
+with the in-process local backend and make each retrieval sleep like a
+remote call would.
+"""
+
+import time
+from typing import Any, Dict, List
+
+from ..tools import corpus_tools
+from ..tools.backends.local import LocalVectorBackend
+
+_SCIENCE_TEXT = (
+    "Photosynthesis is the process by which green plants use sunlight to make food "
+    "from carbon dioxide and water. Chlorophyll in the leaves absorbs the light. "
+    "The water cycle includes evaporation, condensation and precipitation."
+)
+
+
+class SlowLocalBackend(LocalVectorBackend):
+    """Local backend whose retrievals take at least latency_seconds, like a remote call."""
+
+    def __init__(self, latency_seconds: float, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.latency_seconds = latency_seconds
+
+    def retrieve(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        time.sleep(self.latency_seconds)
+        return super().retrieve(*args, **kwargs)
+
+
+def install_slow_backend(latency_seconds: float) -> str:
+    """
+    Switches the corpus tools to a SlowLocalBackend holding one science
+    corpus, and returns that corpus's ID.
+    """
+    backend = SlowLocalBackend(latency_seconds, chunk_size=50, chunk_overlap=10)
+    corpus_tools.set_retrieval_backend(backend)
+    corpus_id = corpus_tools.create_rag_corpus("Benchmark Science")["corpus_id"]
+    backend.add_document(corpus_id, _SCIENCE_TEXT, source_uri="bench://science.txt")
+    return corpus_id
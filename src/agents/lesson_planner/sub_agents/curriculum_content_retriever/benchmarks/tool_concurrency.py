@@ -0,0 +1,78 @@
+"""
+Benchmark: concurrent tool calls with and without the tool executor.
+
+Runs N concurrent query_rag_corpus calls through FunctionTool.run_async, the
+way ADK runs them for N teachers on one instance, against the local backend
+with a simulated network latency per retrieval. A heartbeat coroutine
+ticks on the same event loop and records how late each tick fires, which is
+how long a /run_sse stream would have been frozen.
+
+- blocking: FunctionTool(query_rag_corpus), the synchronous function
+  called directly on the event loop
+- executor: query_rag_corpus_tool, which runs the call on the tool executor
+
+Run from src/agents:
+    python -m lesson_planner.sub_agents.curriculum_content_retriever.benchmarks.tool_concurrency
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from google.adk.tools import FunctionTool
+
+from ..tools import corpus_tools
+from .slow_backend import install_slow_backend
+
+
+async def _heartbeat(interval: float, lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _run(tool: FunctionTool, corpus_id: str, concurrency: int) -> Dict[str, float]:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(0.01, lags, stop))
+    await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        tool.run_async(
+            # Distinct queries so the retrieval cache does not answer them
+            args={"corpus_id": corpus_id, "query_text": f"photosynthesis sunlight {i}", "vector_distance_threshold": 1.0},
+            tool_context=None
+        )
+        for i in range(concurrency)
+    ])
+    wall = time.perf_counter() - started
+
+    stop.set()
+    await heartbeat
+    return {"wall_seconds": wall, "max_loop_stall_seconds": max(lags, default=0.0)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent tool calls")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated seconds per retrieval")
+    args = parser.parse_args()
+
+    corpus_id = install_slow_backend(args.latency)
+    modes = {
+        "blocking": FunctionTool(corpus_tools.query_rag_corpus),
+        "executor": corpus_tools.query_rag_corpus_tool
+    }
+    print(f"{args.concurrency} concurrent query_rag_corpus calls, {args.latency:.2f} s simulated latency each")
+    print(f"{'mode':<10}{'wall s':>10}{'max loop stall s':>20}")
+    for name, tool in modes.items():
+        corpus_tools.retrieval_cache.clear()
+        result = asyncio.run(_run(tool, corpus_id, args.concurrency))
+        print(f"{name:<10}{result['wall_seconds']:>10.2f}{result['max_loop_stall_seconds']:>20.3f}")
+
+
+if __name__ == "__main__":
+    main()
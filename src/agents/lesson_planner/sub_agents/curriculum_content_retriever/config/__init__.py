@@ -13,6 +13,7 @@ GCS_DEFAULT_LOCATION = "US"
 GCS_LIST_BUCKETS_MAX_RESULTS = 50
 GCS_LIST_BLOBS_MAX_RESULTS = 100
 GCS_DEFAULT_CONTENT_TYPE = "application/pdf"  # Default content type for uploaded files
+GCS_HTTP_POOL_SIZE = int(os.environ.get("GCS_HTTP_POOL_SIZE", "16"))  # Keep-alive connections of the shared storage client
 
 # RAG Corpus Settings
 RAG_DEFAULT_EMBEDDING_MODEL = "text-embedding-004"
@@ -20,6 +21,97 @@ RAG_DEFAULT_TOP_K = 10  # Default number of results for single corpus query
 RAG_DEFAULT_SEARCH_TOP_K = 5  # Default number of results per corpus for search_all
 RAG_DEFAULT_VECTOR_DISTANCE_THRESHOLD = 0.5
 RAG_DEFAULT_PAGE_SIZE = 50  # Default page size for listing files
+RAG_LIST_FILES_MAX_RESULTS = int(os.environ.get("RAG_LIST_FILES_MAX_RESULTS", "1000"))  # Most files one all-pages listing returns
+
+# Retrieval Backend Settings
+RAG_BACKEND = os.environ.get("RAG_BACKEND", "vertex")  # "vertex" (Vertex AI RAG Engine) or "local" (in-process index)
+RAG_LOCAL_EMBEDDING_DIMENSIONS = int(os.environ.get("RAG_LOCAL_EMBEDDING_DIMENSIONS", "512"))  # Hashing embedder vector size
+RAG_LOCAL_CHUNK_SIZE = int(os.environ.get("RAG_LOCAL_CHUNK_SIZE", "200"))  # Words per chunk on local import
+RAG_LOCAL_CHUNK_OVERLAP = int(os.environ.get("RAG_LOCAL_CHUNK_OVERLAP", "40"))  # Words shared by consecutive chunks
+RAG_LOCAL_INDEX_TYPE = os.environ.get("RAG_LOCAL_INDEX_TYPE", "auto")  # "exact", "ivf" or "auto"
+RAG_LOCAL_IVF_MIN_CHUNKS = int(os.environ.get("RAG_LOCAL_IVF_MIN_CHUNKS", "4096"))  # Corpus size from which "auto" uses IVF
+RAG_LOCAL_IVF_NPROBE = int(os.environ.get("RAG_LOCAL_IVF_NPROBE", "8"))  # Inverted lists scanned per IVF search
+
+# Bulk Import Settings
+RAG_IMPORT_BATCH_SIZE = int(os.environ.get("RAG_IMPORT_BATCH_SIZE", "25"))  # URIs per import_files call
+RAG_IMPORT_MAX_CONCURRENCY = int(os.environ.get("RAG_IMPORT_MAX_CONCURRENCY", "2"))  # Concurrent import_files calls per bulk import
+RAG_IMPORT_MAX_RETRIES = int(os.environ.get("RAG_IMPORT_MAX_RETRIES", "3"))  # Retries of a failed import_files call
+RAG_IMPORT_CHECKPOINT_DIR = os.environ.get("RAG_IMPORT_CHECKPOINT_DIR", "~/.cache/teacher_sahayak/rag_imports")  # Resumable import progress files and sync manifests
+RAG_SYNC_LOCK_STALE_SECONDS = float(os.environ.get("RAG_SYNC_LOCK_STALE_SECONDS", "21600"))  # Age after which a sync lock is taken over
+
+# Hybrid Search Settings
+RAG_DEFAULT_SEARCH_MODE = os.environ.get("RAG_DEFAULT_SEARCH_MODE", "vector")  # "vector", "keyword" or "hybrid"
+RAG_HYBRID_CANDIDATE_MULTIPLIER = int(os.environ.get("RAG_HYBRID_CANDIDATE_MULTIPLIER", "3"))  # Candidates per retriever, as a multiple of top_k
+RAG_HYBRID_RRF_K = int(os.environ.get("RAG_HYBRID_RRF_K", "60"))  # Reciprocal rank fusion damping constant
+
+# Search Fan-out Settings
+RAG_SEARCH_MAX_WORKERS = int(os.environ.get("RAG_SEARCH_MAX_WORKERS", "8"))  # Concurrent corpus queries per process
+RAG_SEARCH_PER_CORPUS_TIMEOUT = float(os.environ.get("RAG_SEARCH_PER_CORPUS_TIMEOUT", "10"))  # Seconds a single corpus query may run
+RAG_SEARCH_DEADLINE = float(os.environ.get("RAG_SEARCH_DEADLINE", "20"))  # Seconds for the whole search_all_corpora call
+RAG_SEARCH_BATCHED = os.environ.get("RAG_SEARCH_BATCHED", "true").lower() == "true"  # Send several corpora per retrieval call
+RAG_SEARCH_BATCH_SIZE = int(os.environ.get("RAG_SEARCH_BATCH_SIZE", "10"))  # Maximum corpora per batched retrieval call
+RAG_SEARCH_MAX_RESULTS = int(os.environ.get("RAG_SEARCH_MAX_RESULTS", "20"))  # Global top-k across corpora (0 keeps all)
+RAG_SEARCH_SCORE_NORMALIZATION = os.environ.get("RAG_SEARCH_SCORE_NORMALIZATION", "none")  # "none", "zscore" or "minmax" per corpus
+RAG_SEARCH_ROUTING = os.environ.get("RAG_SEARCH_ROUTING", "true").lower() == "true"  # Only search corpora matching grade/subject/board/language
+RAG_SEARCH_COLLAPSE_DUPLICATES = os.environ.get("RAG_SEARCH_COLLAPSE_DUPLICATES", "true").lower() == "true"  # Merge near-identical results from different corpora into one
+RAG_SEARCH_DUPLICATE_THRESHOLD = float(os.environ.get("RAG_SEARCH_DUPLICATE_THRESHOLD", "0.8"))  # Estimated shingle Jaccard similarity of near-duplicate results
+RAG_SEARCH_RESPONSE_FORMAT = os.environ.get("RAG_SEARCH_RESPONSE_FORMAT", "compact")  # "compact" (citation table, results listed once) or "verbose"
+RAG_SEARCH_MAX_CHUNK_TOKENS = int(os.environ.get("RAG_SEARCH_MAX_CHUNK_TOKENS", "0"))  # Truncate each compact result's text to about this many tokens (0 keeps full texts)
+
+# Retry and Hedging Settings
+RAG_RETRY_MAX_ATTEMPTS = int(os.environ.get("RAG_RETRY_MAX_ATTEMPTS", "3"))  # Attempts per retrieval call, including the first
+RAG_RETRY_BASE_DELAY = float(os.environ.get("RAG_RETRY_BASE_DELAY", "0.2"))  # Backoff cap in seconds before the first retry, doubled per retry
+RAG_RETRY_MAX_DELAY = float(os.environ.get("RAG_RETRY_MAX_DELAY", "2"))  # Largest backoff cap in seconds
+RAG_RETRY_BUDGET_RATIO = float(os.environ.get("RAG_RETRY_BUDGET_RATIO", "0.2"))  # Retries allowed per retrieval call on average
+RAG_HEDGE_ENABLED = os.environ.get("RAG_HEDGE_ENABLED", "false").lower() == "true"  # Send a second attempt when a retrieval is slow
+RAG_HEDGE_PERCENTILE = float(os.environ.get("RAG_HEDGE_PERCENTILE", "95"))  # Observed latency percentile after which to hedge
+RAG_HEDGE_MIN_SAMPLES = int(os.environ.get("RAG_HEDGE_MIN_SAMPLES", "20"))  # Retrievals observed before hedging starts
+
+# Circuit Breaker Settings
+RAG_BREAKER_ENABLED = os.environ.get("RAG_BREAKER_ENABLED", "true").lower() == "true"  # Skip corpora whose recent retrievals keep failing
+RAG_BREAKER_WINDOW_SIZE = int(os.environ.get("RAG_BREAKER_WINDOW_SIZE", "20"))  # Recent retrievals per corpus considered
+RAG_BREAKER_MIN_CALLS = int(os.environ.get("RAG_BREAKER_MIN_CALLS", "5"))  # Retrievals observed before a breaker may open
+RAG_BREAKER_FAILURE_RATE = float(os.environ.get("RAG_BREAKER_FAILURE_RATE", "0.5"))  # Share of failed or slow retrievals that opens it
+RAG_BREAKER_SLOW_CALL_SECONDS = float(os.environ.get("RAG_BREAKER_SLOW_CALL_SECONDS", "8"))  # Retrievals slower than this count as failures
+RAG_BREAKER_OPEN_SECONDS = float(os.environ.get("RAG_BREAKER_OPEN_SECONDS", "30"))  # How long an open corpus is skipped before probing
+RAG_BREAKER_HALF_OPEN_PROBES = int(os.environ.get("RAG_BREAKER_HALF_OPEN_PROBES", "2"))  # Successful probes needed to close again
+
+# Rate Limit Settings
+RATE_LIMIT_STORE = os.environ.get("RATE_LIMIT_STORE", "memory").lower()  # "memory" (per process) or "sqlite" (shared by the processes of a host)
+RATE_LIMIT_SQLITE_PATH = os.environ.get("RATE_LIMIT_SQLITE_PATH", "~/.cache/teacher_sahayak/rate_limits.sqlite3")  # Bucket file for the sqlite store
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.environ.get("RATE_LIMIT_MAX_WAIT_SECONDS", "30"))  # How long a call may queue for quota before failing
+RAG_RETRIEVAL_RATE = float(os.environ.get("RAG_RETRIEVAL_RATE", "20"))  # Vertex AI RAG retrievals per second (0 = unlimited)
+RAG_RETRIEVAL_BURST = float(os.environ.get("RAG_RETRIEVAL_BURST", "40"))  # Retrievals that may go out at once
+RAG_IMPORT_RATE = float(os.environ.get("RAG_IMPORT_RATE", "1"))  # Vertex AI RAG import_files calls per second (0 = unlimited)
+RAG_IMPORT_BURST = float(os.environ.get("RAG_IMPORT_BURST", "2"))  # import_files calls that may go out at once
+MODEL_CALL_RATE = float(os.environ.get("MODEL_CALL_RATE", "10"))  # Gemini calls per second across the lesson planner agents (0 = unlimited)
+MODEL_CALL_BURST = float(os.environ.get("MODEL_CALL_BURST", "20"))  # Gemini calls that may go out at once
+
+# Tool Execution Settings
+TOOL_MAX_WORKERS = int(os.environ.get("TOOL_MAX_WORKERS", "16"))  # Threads running blocking corpus and storage tool calls off the event loop
+
+# Corpus Catalog Cache Settings
+RAG_CATALOG_TTL_SECONDS = float(os.environ.get("RAG_CATALOG_TTL_SECONDS", "300"))  # How long the corpus list is reused
+RAG_CATALOG_FILE_COUNT_TTL_SECONDS = float(os.environ.get("RAG_CATALOG_FILE_COUNT_TTL_SECONDS", "900"))  # How long per-corpus file counts are reused
+
+# Retrieval Result Cache Settings
+RAG_RETRIEVAL_CACHE_MAX_ENTRIES = int(os.environ.get("RAG_RETRIEVAL_CACHE_MAX_ENTRIES", "1024"))  # 0 disables the cache
+RAG_RETRIEVAL_CACHE_MAX_BYTES = int(os.environ.get("RAG_RETRIEVAL_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # Approximate memory bound
+RAG_RETRIEVAL_CACHE_TTL_SECONDS = float(os.environ.get("RAG_RETRIEVAL_CACHE_TTL_SECONDS", "3600"))  # How long cached results are reused
+
+# Semantic Query Cache Settings
+RAG_SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get("RAG_SEMANTIC_CACHE_MAX_ENTRIES", "256"))  # search_all_corpora responses kept for similar queries (0 disables)
+RAG_SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("RAG_SEMANTIC_CACHE_THRESHOLD", "0.9"))  # Cosine similarity at which a cached search is reused
+RAG_SEMANTIC_CACHE_TTL_SECONDS = float(os.environ.get("RAG_SEMANTIC_CACHE_TTL_SECONDS", "900"))  # How long a cached search is reused
+
+# Context Packing Settings
+CONTEXT_PACK_TOKEN_BUDGET = int(os.environ.get("CONTEXT_PACK_TOKEN_BUDGET", "4000"))  # Estimated tokens of curriculum_content passed to plan generation (0 disables packing)
+CONTEXT_PACK_DUPLICATE_THRESHOLD = float(os.environ.get("CONTEXT_PACK_DUPLICATE_THRESHOLD", "0.8"))  # Word-shingle Jaccard similarity at which a block is a near-duplicate
+CONTEXT_PACK_SOURCE_DECAY = float(os.environ.get("CONTEXT_PACK_SOURCE_DECAY", "0.8"))  # Score factor per block already kept from the same source (1 ignores sources)
+
+# Retrieval Stage Settings
+CURRICULUM_RETRIEVAL_MODE = os.environ.get("CURRICULUM_RETRIEVAL_MODE", "direct").lower()  # "direct" (search without a model call) or "llm" (curriculum retriever agent)
+RETRIEVAL_STAGE_MAX_QUERY_WORDS = int(os.environ.get("RETRIEVAL_STAGE_MAX_QUERY_WORDS", "64"))  # Words of the teacher's request used as the search query
 
 # Agent Settings
 AGENT_NAME = "curriculum_retriever_agent"
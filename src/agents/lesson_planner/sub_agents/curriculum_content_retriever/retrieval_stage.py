@@ -0,0 +1,158 @@
+"""
+Deterministic curriculum retrieval stage for the lesson planning pipeline.
+
+The curriculum retriever agent spends one model call deciding to call
+search_all_corpora and another rewriting the results, on every lesson plan.
+This stage does the same without a model: it builds the search query and
+routing filters from the teacher's request, calls search_all_corpora
+directly, packs the results into the plan generator's token budget, and
+writes them to curriculum_content as cited passages. It runs beside the
+intent analysis, so only the raw request is used.
+
+CURRICULUM_RETRIEVAL_MODE selects this stage ("direct") or the LLM agent
+("llm") for the lesson planner.
+"""
+
+import logging
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from .config import (
+    CONTEXT_PACK_TOKEN_BUDGET,
+    CONTEXT_PACK_DUPLICATE_THRESHOLD,
+    CONTEXT_PACK_SOURCE_DECAY,
+    RETRIEVAL_STAGE_MAX_QUERY_WORDS
+)
+from .tools import corpus_tools
+from .tools.context_packer import CURRICULUM_CONTENT_KEY, PACKING_REPORT_KEY, pack_chunks
+from .tools.corpus_router import extract_request_facets
+from .tools.lexical_index import canonical_query
+from .tools.tool_executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Query, filters and result counts of the stage's search
+RETRIEVAL_REPORT_KEY = "curriculum_retrieval"
+
+# Request facets -> search_all_corpora routing filters
+_FACET_FILTERS = {"grade": "grade_level", "subject": "subject_area", "board": "board", "language": "language"}
+
+
+def _request_text(content: Optional[types.Content]) -> str:
+    if not content or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if part.text).strip()
+
+
+def build_search(request: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Builds the search_all_corpora query and routing filters for a lesson
+    plan request.
+
+    The query is the content words of the request (without phrasing such
+    as "create a weekly lesson plan"), cut to RETRIEVAL_STAGE_MAX_QUERY_WORDS
+    words. The filters are the grade, subject, board and language the
+    request names.
+    """
+    query = " ".join(canonical_query(request)[0].split()[:RETRIEVAL_STAGE_MAX_QUERY_WORDS]) or request
+    filters = {_FACET_FILTERS[facet]: value for facet, value in extract_request_facets(request).items() if value}
+    return query, filters
+
+
+def format_curriculum_content(query: str, response: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, int]]]:
+    """
+    Renders a compact search_all_corpora response as cited passages, packed
+    into CONTEXT_PACK_TOKEN_BUDGET (0 keeps every passage).
+
+    Returns:
+        The curriculum content and the packing report (None when not packed)
+    """
+    if response.get("status") != "success":
+        return f"No curriculum content could be retrieved for \"{query}\": {response.get('message')}", None
+    if not response.get("results"):
+        return f"No curriculum content was found for \"{query}\".", None
+
+    chunks = [
+        {"text": result["text"], "score": result.get("score") or 0.0, "source": result["source"], "result": result}
+        for result in response["results"]
+    ]
+    report = None
+    if CONTEXT_PACK_TOKEN_BUDGET > 0:
+        chunks, report = pack_chunks(
+            chunks,
+            CONTEXT_PACK_TOKEN_BUDGET,
+            CONTEXT_PACK_DUPLICATE_THRESHOLD,
+            CONTEXT_PACK_SOURCE_DECAY
+        )
+
+    blocks: List[str] = [f"# Curriculum content for: {query}"]
+    cited: List[str] = []
+    for chunk in chunks:
+        sources = [chunk["source"]] + chunk["result"].get("also_in", [])
+        blocks.append(f"{chunk['text'].strip()} [{', '.join(sources)}]")
+        cited.extend(source for source in sources if source not in cited)
+    citations = response.get("citations", {})
+    blocks.append("## Citations\n" + "\n".join(f"- {source}: {citations.get(source, source)}" for source in cited))
+    return "\n\n".join(blocks), report
+
+
+class CurriculumRetrievalStage(BaseAgent):
+    """
+    Pipeline stage writing curriculum_content from a direct search, with no
+    model call. Drop-in replacement for the curriculum retriever agent in
+    the lesson planning workflow.
+    """
+
+    output_key: str = CURRICULUM_CONTENT_KEY
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        query, filters = build_search(_request_text(ctx.user_content))
+        if not query:
+            response = {"status": "error", "error_message": "Empty query", "message": "The request has no text to search for"}
+        else:
+            try:
+                # search_all_corpora blocks, so it runs on the tool pool. Hybrid
+                # search, since the query is not phrased for vector search the
+                # way the LLM retriever phrases it
+                response = await run_blocking(
+                    corpus_tools.search_all_corpora, query, search_mode="hybrid", response_format="compact", **filters
+                )
+            except Exception as e:
+                logger.exception("Curriculum retrieval failed")
+                response = {"status": "error", "error_message": str(e), "message": f"Error searching corpora: {str(e)}"}
+
+        content, packing_report = format_curriculum_content(query, response)
+        state_delta: Dict[str, Any] = {
+            self.output_key: content,
+            RETRIEVAL_REPORT_KEY: {
+                "query": query,
+                "filters": filters,
+                "status": response.get("status"),
+                "results": response.get("count", 0),
+                "kept": packing_report["kept"] if packing_report else response.get("count", 0)
+            }
+        }
+        if packing_report:
+            state_delta[PACKING_REPORT_KEY] = {"token_budget": CONTEXT_PACK_TOKEN_BUDGET, **packing_report}
+        logger.info(
+            "Retrieved %s for %r with filters %s: %s",
+            self.output_key, query, filters, state_delta[RETRIEVAL_REPORT_KEY]
+        )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=content)]),
+            actions=EventActions(state_delta=state_delta)
+        )
+
+
+# Create the deterministic retrieval stage
+retrieval_stage = CurriculumRetrievalStage(
+    name="curriculum_retrieval_stage",
+    description="Searches all curriculum corpora for the teacher's request and writes the cited passages to curriculum_content."
+)
@@ -9,6 +9,8 @@ from .corpus_tools import (
     get_corpus_tool,
     delete_corpus_tool,
     import_document_tool,
+    bulk_import_tool,
+    sync_corpus_tool,
     
     # File management tools
     list_files_tool,
@@ -18,6 +20,9 @@ from .corpus_tools import (
     # Query tools
     query_rag_corpus_tool,
     search_all_corpora_tool,
+    
+    # Monitoring tools
+    retrieval_cache_stats_tool,
 )
 
 from .storage_tools import (
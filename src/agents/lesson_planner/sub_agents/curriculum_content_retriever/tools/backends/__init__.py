@@ -0,0 +1,63 @@
+"""
+Retrieval backends for the RAG corpus tools.
+
+The backend is chosen with the RAG_BACKEND setting ("vertex" or "local") and
+created on first use. Backend modules are imported only when selected, so
+the local backend's NumPy dependency is not needed for Vertex deployments.
+"""
+
+import threading
+from typing import Optional
+
+from ...config import (
+    PROJECT_ID,
+    LOCATION,
+    RAG_BACKEND,
+    RAG_LOCAL_EMBEDDING_DIMENSIONS,
+    RAG_LOCAL_CHUNK_SIZE,
+    RAG_LOCAL_CHUNK_OVERLAP,
+    RAG_LOCAL_INDEX_TYPE,
+    RAG_LOCAL_IVF_MIN_CHUNKS,
+    RAG_LOCAL_IVF_NPROBE
+)
+from .base import RetrievalBackend
+
+_backend: Optional[RetrievalBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: Optional[str] = None) -> RetrievalBackend:
+    """Creates a backend by name (default: the RAG_BACKEND setting)."""
+    name = (name or RAG_BACKEND).lower()
+    if name == "vertex":
+        from .vertex import VertexRagBackend
+
+        return VertexRagBackend(project_id=PROJECT_ID, location=LOCATION)
+    if name == "local":
+        from .local import HashingEmbedder, LocalVectorBackend
+
+        return LocalVectorBackend(
+            embedder=HashingEmbedder(dimensions=RAG_LOCAL_EMBEDDING_DIMENSIONS),
+            chunk_size=RAG_LOCAL_CHUNK_SIZE,
+            chunk_overlap=RAG_LOCAL_CHUNK_OVERLAP,
+            index_type=RAG_LOCAL_INDEX_TYPE,
+            ivf_min_chunks=RAG_LOCAL_IVF_MIN_CHUNKS,
+            ivf_nprobe=RAG_LOCAL_IVF_NPROBE
+        )
+    raise ValueError(f"Unknown retrieval backend '{name}'. Expected 'vertex' or 'local'.")
+
+
+def get_backend() -> RetrievalBackend:
+    """Returns the process-wide backend, creating it on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+        return _backend
+
+
+def set_backend(backend: RetrievalBackend) -> None:
+    """Replaces the process-wide backend."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,119 @@
+"""
+Retrieval backend interface used by the RAG corpus tools.
+
+A backend owns corpora, their files and retrieval over them. Every method
+returns plain dictionaries in the shapes the tools already report, and raises
+on failure; the tools turn exceptions into their usual error responses.
+
+Corpus dictionaries carry: id, name, display_name, description, create_time,
+update_time and status (plus raw_api_data when the backend has one).
+File dictionaries carry: id, name, display_name, description, source_uri,
+create_time and update_time (plus raw_api_data when available).
+Result dictionaries carry: text, source_uri, relevance_score (higher is more
+relevant) and corpus_id, the queried corpus the result came from.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RetrievalBackend(ABC):
+    """Abstract corpus store and retriever behind the RAG corpus tools."""
+
+    # Name reported in tool responses and used by the backend factory
+    name = "base"
+
+    # Whether retrieve() can serve several corpora in one call; backends
+    # without it are only ever given one corpus per call
+    supports_batch_retrieval = False
+
+    # Whether lexical_retrieve() is implemented over the full corpora
+    supports_lexical = False
+
+    @abstractmethod
+    def create_corpus(
+        self,
+        display_name: str,
+        description: str,
+        embedding_model: str
+    ) -> Dict[str, Any]:
+        """Creates a corpus and returns its dictionary."""
+
+    @abstractmethod
+    def update_corpus(
+        self,
+        corpus_id: str,
+        display_name: Optional[str] = None,
+        description: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Updates the given fields of a corpus and returns its dictionary."""
+
+    @abstractmethod
+    def get_corpus(self, corpus_id: str) -> Dict[str, Any]:
+        """Returns the dictionary of a single corpus."""
+
+    @abstractmethod
+    def list_corpora(self) -> List[Dict[str, Any]]:
+        """Returns the dictionaries of all corpora."""
+
+    @abstractmethod
+    def delete_corpus(self, corpus_id: str) -> None:
+        """Deletes a corpus and all of its files."""
+
+    @abstractmethod
+    def import_files(self, corpus_id: str, uris: List[str]) -> Dict[str, int]:
+        """
+        Imports documents into a corpus.
+
+        Returns:
+            Counts with keys imported, skipped and failed
+        """
+
+    @abstractmethod
+    def list_files(
+        self,
+        corpus_id: str,
+        page_size: Optional[int] = None,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Returns one page of file dictionaries and the next page token."""
+
+    @abstractmethod
+    def get_file(self, corpus_id: str, file_id: str) -> Dict[str, Any]:
+        """Returns the dictionary of a single file."""
+
+    @abstractmethod
+    def delete_file(self, corpus_id: str, file_id: str) -> None:
+        """Deletes a file and its chunks from a corpus."""
+
+    @abstractmethod
+    def retrieve(
+        self,
+        corpus_ids: List[str],
+        query_text: str,
+        top_k: int,
+        vector_distance_threshold: float,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves the top_k chunks across the given corpora, best first.
+
+        A remote backend gives up after timeout seconds (None for its default),
+        so a caller that stopped waiting does not leave the call holding a
+        thread.
+        """
+
+    def lexical_retrieve(
+        self,
+        corpus_ids: List[str],
+        query_text: str,
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves the top_k chunks by keyword (BM25) score, best first, with
+        the BM25 score as relevance_score.
+
+        Only backends with supports_lexical implement this; for the others the
+        tools rank vector candidates by BM25 instead.
+        """
+        raise NotImplementedError(f"The {self.name} backend has no keyword index")
@@ -0,0 +1,479 @@
+"""
+In-process retrieval backend backed by a NumPy embedding matrix.
+
+Intended for benchmarks, load tests and offline development: corpora, files
+and chunks live in memory, embeddings come from a pluggable embedder (a
+deterministic feature-hashing embedder by default), and top-k search is either
+exact or IVF-style approximate over each corpus's embedding matrix.
+
+Distances follow Vertex AI's COSINE_DISTANCE convention (1 - cosine
+similarity), so vector_distance_threshold has the same meaning as with the
+Vertex backend, and relevance_score is the cosine similarity. Each corpus also
+keeps a BM25 keyword index over its chunks for hybrid search.
+"""
+
+import hashlib
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..lexical_index import BM25Index, tokenize
+from .base import RetrievalBackend
+
+# Embedder signature: list of texts in, (len(texts), dimensions) float array out
+Embedder = Callable[[List[str]], np.ndarray]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """
+    Splits text into chunks of chunk_size words overlapping by chunk_overlap.
+    """
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, chunk_size - chunk_overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_size]))
+        if start + chunk_size >= len(words):
+            break
+    return chunks
+
+
+class HashingEmbedder:
+    """
+    Deterministic feature-hashing embedder over words and character n-grams.
+
+    It needs no model or network access, which makes it a stand-in for real
+    embeddings in tests, benchmarks and offline runs. Vectors are L2
+    normalized.
+
+    Args:
+        dimensions: Size of the embedding vectors
+        char_ngram_sizes: Character n-gram lengths hashed in addition to words
+    """
+
+    def __init__(self, dimensions: int = 512, char_ngram_sizes: Tuple[int, ...] = (3, 4)):
+        self.dimensions = dimensions
+        self.char_ngram_sizes = char_ngram_sizes
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                hashed = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if hashed & 0x80000000 else -1.0
+                matrix[row, hashed % self.dimensions] += sign
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _features(self, text: str) -> Iterable[str]:
+        for token in tokenize(text):
+            yield f"w:{token}"
+            padded = f"#{token}#"
+            for size in self.char_ngram_sizes:
+                for start in range(max(1, len(padded) - size + 1)):
+                    yield f"c:{padded[start:start + size]}"
+
+
+class VectorIndex:
+    """
+    Embedding matrix of one corpus with exact and IVF-style top-k search.
+
+    The IVF structure (spherical k-means centroids and their inverted lists)
+    is built lazily on the first approximate search after the index changes.
+
+    Args:
+        dimensions: Size of the embedding vectors
+        nprobe: Number of inverted lists scanned per approximate search
+    """
+
+    def __init__(self, dimensions: int, nprobe: int = 8):
+        self.dimensions = dimensions
+        self.nprobe = nprobe
+        self._matrix = np.zeros((0, dimensions), dtype=np.float32)
+        self._chunk_ids: List[str] = []
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self._chunk_ids)
+
+    def add(self, chunk_ids: List[str], vectors: np.ndarray) -> None:
+        """Appends vectors for the given chunk IDs."""
+        if not chunk_ids:
+            return
+        self._matrix = np.vstack([self._matrix, vectors.astype(np.float32, copy=False)])
+        self._chunk_ids.extend(chunk_ids)
+        self._centroids = None
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        """Removes the vectors of the given chunk IDs."""
+        doomed = set(chunk_ids)
+        if not doomed:
+            return
+        keep = [i for i, chunk_id in enumerate(self._chunk_ids) if chunk_id not in doomed]
+        self._matrix = self._matrix[keep]
+        self._chunk_ids = [self._chunk_ids[i] for i in keep]
+        self._centroids = None
+
+    def search(self, query_vector: np.ndarray, top_k: int, approximate: bool = False) -> List[Tuple[str, float]]:
+        """Returns up to top_k (chunk_id, cosine similarity) pairs, best first."""
+        if not self._chunk_ids or top_k <= 0:
+            return []
+        if approximate:
+            candidates = self._ivf_candidates(query_vector)
+            scores = self._matrix[candidates] @ query_vector
+        else:
+            candidates = None
+            scores = self._matrix @ query_vector
+
+        if top_k < len(scores):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        positions = candidates[best] if candidates is not None else best
+        return [(self._chunk_ids[position], float(scores[i])) for i, position in zip(best, positions)]
+
+    def _ivf_candidates(self, query_vector: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            self._build_ivf()
+        probe = np.argsort(-(self._centroids @ query_vector))[:self.nprobe]
+        return np.concatenate([self._lists[i] for i in probe])
+
+    def _build_ivf(self, iterations: int = 10) -> None:
+        # Spherical k-means with sqrt(n) lists; vectors are already normalized
+        count = len(self._chunk_ids)
+        nlist = max(1, min(1024, int(np.sqrt(count))))
+        rng = np.random.default_rng(0)
+        centroids = self._matrix[rng.choice(count, size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(self._matrix @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = self._matrix[assignment == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    if norm > 0:
+                        centroids[cluster] = centroid / norm
+        assignment = np.argmax(self._matrix @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._lists = [np.flatnonzero(assignment == cluster) for cluster in range(nlist)]
+
+
+class LocalVectorBackend(RetrievalBackend):
+    """
+    Retrieval backend keeping corpora, files and embeddings in process memory.
+
+    Args:
+        embedder: Callable turning a list of texts into an embedding matrix
+            (default: HashingEmbedder)
+        chunk_size: Words per chunk when importing documents
+        chunk_overlap: Words shared by consecutive chunks
+        index_type: "exact", "ivf" or "auto" (IVF once a corpus reaches
+            ivf_min_chunks chunks)
+        ivf_min_chunks: Corpus size from which "auto" uses IVF search
+        ivf_nprobe: Inverted lists scanned per approximate search
+        read_source: Callable returning the text of a source URI (default
+            reads local paths, file:// and gs:// URIs)
+    """
+
+    name = "local"
+    supports_batch_retrieval = True
+    supports_lexical = True
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        chunk_size: int = 200,
+        chunk_overlap: int = 40,
+        index_type: str = "auto",
+        ivf_min_chunks: int = 4096,
+        ivf_nprobe: int = 8,
+        read_source: Optional[Callable[[str], str]] = None
+    ):
+        if index_type not in ("exact", "ivf", "auto"):
+            raise ValueError(f"Unknown index type '{index_type}'")
+        self.embedder = embedder or HashingEmbedder()
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.index_type = index_type
+        self.ivf_min_chunks = ivf_min_chunks
+        self.ivf_nprobe = ivf_nprobe
+        self.read_source = read_source or _read_source
+
+        self._lock = threading.RLock()
+        self._corpora: Dict[str, Dict[str, Any]] = {}
+        # corpus_id -> file_id -> file dictionary (plus private _content_hash)
+        self._files: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # corpus_id -> file_id -> chunk IDs
+        self._file_chunks: Dict[str, Dict[str, List[str]]] = {}
+        # chunk_id -> (corpus_id, file_id, text)
+        self._chunks: Dict[str, Tuple[str, str, str]] = {}
+        # corpus_id -> vector index, None until the corpus's first chunks arrive
+        self._indexes: Dict[str, Optional[VectorIndex]] = {}
+        self._keyword_indexes: Dict[str, BM25Index] = {}
+
+    # --- Corpus management ---
+
+    def create_corpus(
+        self,
+        display_name: str,
+        description: str,
+        embedding_model: str
+    ) -> Dict[str, Any]:
+        corpus_id = uuid.uuid4().hex[:16]
+        now = _now()
+        corpus = {
+            "id": corpus_id,
+            "name": f"local/ragCorpora/{corpus_id}",
+            "display_name": display_name,
+            "description": description,
+            "create_time": now,
+            "update_time": now,
+            "status": "ACTIVE"
+        }
+        with self._lock:
+            self._corpora[corpus_id] = corpus
+            self._files[corpus_id] = {}
+            self._file_chunks[corpus_id] = {}
+            self._indexes[corpus_id] = None
+            self._keyword_indexes[corpus_id] = BM25Index()
+        return dict(corpus)
+
+    def update_corpus(
+        self,
+        corpus_id: str,
+        display_name: Optional[str] = None,
+        description: Optional[str] = None
+    ) -> Dict[str, Any]:
+        with self._lock:
+            corpus = self._corpus(corpus_id)
+            if display_name:
+                corpus["display_name"] = display_name
+            if description:
+                corpus["description"] = description
+            corpus["update_time"] = _now()
+            return dict(corpus)
+
+    def get_corpus(self, corpus_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._corpus(corpus_id))
+
+    def list_corpora(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(corpus) for corpus in self._corpora.values()]
+
+    def delete_corpus(self, corpus_id: str) -> None:
+        with self._lock:
+            self._corpus(corpus_id)
+            for chunk_ids in self._file_chunks.pop(corpus_id).values():
+                for chunk_id in chunk_ids:
+                    self._chunks.pop(chunk_id, None)
+            del self._corpora[corpus_id]
+            del self._files[corpus_id]
+            del self._indexes[corpus_id]
+            del self._keyword_indexes[corpus_id]
+
+    # --- File management ---
+
+    def import_files(self, corpus_id: str, uris: List[str]) -> Dict[str, int]:
+        self.get_corpus(corpus_id)
+        counts = {"imported": 0, "skipped": 0, "failed": 0}
+        for uri in uris:
+            try:
+                text = self.read_source(uri)
+            except Exception:
+                counts["failed"] += 1
+                continue
+            if self._has_identical_file(corpus_id, uri, text):
+                counts["skipped"] += 1
+                continue
+            self.add_document(corpus_id, text, source_uri=uri)
+            counts["imported"] += 1
+        return counts
+
+    def add_document(
+        self,
+        corpus_id: str,
+        text: str,
+        source_uri: Optional[str] = None,
+        display_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Chunks, embeds and stores a document, replacing any earlier file with
+        the same source URI. Returns the new file dictionary.
+        """
+        file_id = uuid.uuid4().hex[:16]
+        chunks = chunk_text(text, self.chunk_size, self.chunk_overlap)
+        # Embed outside the lock; this is the expensive part of an import
+        vectors = self.embedder(chunks) if chunks else np.zeros((0, 1), dtype=np.float32)
+        chunk_ids = [f"{file_id}-{i}" for i in range(len(chunks))]
+        now = _now()
+
+        with self._lock:
+            corpus = self._corpus(corpus_id)
+            if source_uri:
+                for existing in list(self._files[corpus_id].values()):
+                    if existing["source_uri"] == source_uri:
+                        self._delete_file_locked(corpus_id, existing["id"])
+
+            rag_file = {
+                "id": file_id,
+                "name": f"{corpus['name']}/ragFiles/{file_id}",
+                "display_name": display_name or (source_uri.rstrip("/").split("/")[-1] if source_uri else file_id),
+                "description": None,
+                "source_uri": source_uri,
+                "create_time": now,
+                "update_time": now,
+                "_content_hash": hashlib.sha256(text.encode("utf-8")).hexdigest()
+            }
+            self._files[corpus_id][file_id] = rag_file
+            self._file_chunks[corpus_id][file_id] = chunk_ids
+            for chunk_id, chunk in zip(chunk_ids, chunks):
+                self._chunks[chunk_id] = (corpus_id, file_id, chunk)
+                self._keyword_indexes[corpus_id].add(chunk_id, chunk)
+            if chunk_ids:
+                index = self._indexes[corpus_id]
+                if index is None:
+                    index = VectorIndex(vectors.shape[1], nprobe=self.ivf_nprobe)
+                    self._indexes[corpus_id] = index
+                index.add(chunk_ids, vectors)
+            return _public_file(rag_file)
+
+    def list_files(
+        self,
+        corpus_id: str,
+        page_size: Optional[int] = None,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        with self._lock:
+            self._corpus(corpus_id)
+            files = list(self._files[corpus_id].values())
+        start = int(page_token) if page_token else 0
+        end = start + page_size if page_size else len(files)
+        next_page_token = str(end) if end < len(files) else None
+        return [_public_file(rag_file) for rag_file in files[start:end]], next_page_token
+
+    def get_file(self, corpus_id: str, file_id: str) -> Dict[str, Any]:
+        with self._lock:
+            self._corpus(corpus_id)
+            rag_file = self._files[corpus_id].get(file_id)
+            if rag_file is None:
+                raise KeyError(f"File '{file_id}' not found in corpus '{corpus_id}'")
+            return _public_file(rag_file)
+
+    def delete_file(self, corpus_id: str, file_id: str) -> None:
+        with self._lock:
+            self._corpus(corpus_id)
+            if file_id not in self._files[corpus_id]:
+                raise KeyError(f"File '{file_id}' not found in corpus '{corpus_id}'")
+            self._delete_file_locked(corpus_id, file_id)
+
+    # --- Retrieval ---
+
+    def retrieve(
+        self,
+        corpus_ids: List[str],
+        query_text: str,
+        top_k: int,
+        vector_distance_threshold: float,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        # In-process searches are short, so the timeout is not needed
+        query_vector = self.embedder([query_text])[0]
+        scored = []
+        with self._lock:
+            for corpus_id in corpus_ids:
+                self._corpus(corpus_id)
+                index = self._indexes[corpus_id]
+                if index is None:
+                    continue
+                approximate = self.index_type == "ivf" or (
+                    self.index_type == "auto" and len(index) >= self.ivf_min_chunks
+                )
+                for chunk_id, score in index.search(query_vector, top_k, approximate=approximate):
+                    if 1.0 - score <= vector_distance_threshold:
+                        scored.append((score, chunk_id))
+
+            return self._top_results(scored, top_k)
+
+    def lexical_retrieve(
+        self,
+        corpus_ids: List[str],
+        query_text: str,
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        scored = []
+        with self._lock:
+            for corpus_id in corpus_ids:
+                self._corpus(corpus_id)
+                for chunk_id, score in self._keyword_indexes[corpus_id].search(query_text, top_k):
+                    scored.append((score, chunk_id))
+            return self._top_results(scored, top_k)
+
+    # --- Helpers ---
+
+    def _corpus(self, corpus_id: str) -> Dict[str, Any]:
+        corpus = self._corpora.get(corpus_id)
+        if corpus is None:
+            raise KeyError(f"Corpus '{corpus_id}' not found")
+        return corpus
+
+    def _top_results(self, scored: List[Tuple[float, str]], top_k: int) -> List[Dict[str, Any]]:
+        scored.sort(key=lambda item: item[0], reverse=True)
+        results = []
+        for score, chunk_id in scored[:top_k]:
+            corpus_id, file_id, text = self._chunks[chunk_id]
+            results.append({
+                "text": text,
+                "source_uri": self._files[corpus_id][file_id]["source_uri"],
+                "relevance_score": score,
+                "corpus_id": corpus_id
+            })
+        return results
+
+    def _has_identical_file(self, corpus_id: str, source_uri: str, text: str) -> bool:
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            return any(
+                rag_file["source_uri"] == source_uri and rag_file["_content_hash"] == content_hash
+                for rag_file in self._files[corpus_id].values()
+            )
+
+    def _delete_file_locked(self, corpus_id: str, file_id: str) -> None:
+        del self._files[corpus_id][file_id]
+        chunk_ids = self._file_chunks[corpus_id].pop(file_id, [])
+        for chunk_id in chunk_ids:
+            self._chunks.pop(chunk_id, None)
+            self._keyword_indexes[corpus_id].remove(chunk_id)
+        if self._indexes[corpus_id] is not None:
+            self._indexes[corpus_id].remove(chunk_ids)
+
+
+def _public_file(rag_file: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in rag_file.items() if not key.startswith("_")}
+
+
+def _read_source(uri: str) -> str:
+    """Reads a document as text from a local path, file:// or gs:// URI."""
+    if uri.startswith("gs://"):
+        from ..cloud_clients import get_storage_client
+
+        bucket_name, _, blob_name = uri[len("gs://"):].partition("/")
+        blob = get_storage_client().bucket(bucket_name).blob(blob_name)
+        return blob.download_as_bytes().decode("utf-8", errors="replace")
+    path = uri[len("file://"):] if uri.startswith("file://") else uri
+    with open(path, "r", encoding="utf-8", errors="replace") as source:
+        return source.read()
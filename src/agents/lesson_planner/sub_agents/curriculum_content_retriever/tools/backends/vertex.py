@@ -0,0 +1,268 @@
+"""
+Vertex AI RAG Engine retrieval backend.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import vertexai
+from vertexai.preview import rag
+from google.api_core.exceptions import DeadlineExceeded
+from google.cloud import aiplatform_v1beta1
+
+from ..cloud_clients import get_credentials, get_rag_service_client
+from ..rate_limiter import rate_limiters
+from .base import RetrievalBackend
+
+
+def _raw_api_data(resource: Any) -> Dict[str, Any]:
+    """Returns the raw API fields of an SDK object for transparency."""
+    if hasattr(resource, "to_dict"):
+        return resource.to_dict()
+    if hasattr(resource, "__dict__"):
+        return {k: v for k, v in resource.__dict__.items() if not k.startswith('_')}
+    return {}
+
+
+def _corpus_to_dict(corpus: Any) -> Dict[str, Any]:
+    """Converts a RAG corpus object into the backend corpus dictionary."""
+    # Get corpus status
+    status = None
+    if hasattr(corpus, "corpus_status") and hasattr(corpus.corpus_status, "state"):
+        status = corpus.corpus_status.state
+    elif hasattr(corpus, "corpusStatus") and hasattr(corpus.corpusStatus, "state"):
+        status = corpus.corpusStatus.state
+
+    return {
+        "id": corpus.name.split('/')[-1],
+        "name": corpus.name,
+        "display_name": corpus.display_name,
+        "description": corpus.description if hasattr(corpus, "description") else None,
+        "create_time": str(corpus.create_time) if hasattr(corpus, "create_time") else None,
+        "update_time": str(corpus.update_time) if hasattr(corpus, "update_time") else None,
+        "status": status
+    }
+
+
+def _file_source_uri(rag_file: Any) -> Optional[str]:
+    """
+    Returns the URI a RAG file was imported from. RagFile has no source_uri
+    field; the URI is in the source it was imported with.
+    """
+    gcs_source = getattr(rag_file, "gcs_source", None)
+    if gcs_source is not None and gcs_source.uris:
+        return gcs_source.uris[0]
+    drive_source = getattr(rag_file, "google_drive_source", None)
+    if drive_source is not None and drive_source.resource_ids:
+        # The form import_files takes for Drive files
+        return f"https://drive.google.com/file/d/{drive_source.resource_ids[0].resource_id}"
+    return getattr(rag_file, "source_uri", None) or None
+
+
+def _file_to_dict(rag_file: Any) -> Dict[str, Any]:
+    """Converts a RAG file object into the backend file dictionary."""
+    return {
+        "id": rag_file.name.split("/")[-1],
+        "name": rag_file.name,
+        "display_name": rag_file.display_name if hasattr(rag_file, "display_name") else None,
+        "description": rag_file.description if hasattr(rag_file, "description") else None,
+        "source_uri": _file_source_uri(rag_file),
+        "create_time": str(rag_file.create_time) if hasattr(rag_file, "create_time") else None,
+        "update_time": str(rag_file.update_time) if hasattr(rag_file, "update_time") else None
+    }
+
+
+def _context_relevance(context: Any) -> Optional[float]:
+    """
+    Reads a context's relevance, higher meaning more relevant.
+
+    Corpora created by these tools use RagManagedDb with its default
+    COSINE_DISTANCE metric, so Context.score (and the deprecated
+    Context.distance on older responses) is a cosine distance, where lower
+    means more relevant. The relevance is 1 - distance, the cosine
+    similarity, as with the local backend.
+    """
+    try:
+        if "score" in context:
+            return 1.0 - float(context.score)
+    except TypeError:
+        pass
+    distance = getattr(context, "distance", None)
+    if distance is None:
+        return None
+    return 1.0 - float(distance)
+
+
+class VertexRagBackend(RetrievalBackend):
+    """
+    Backend that delegates everything to vertexai.preview.rag.
+
+    Args:
+        project_id: Google Cloud project hosting the corpora
+        location: Vertex AI region of the corpora
+    """
+
+    name = "vertex"
+    # The pinned SDK accepts a single RagResource per retrieval call
+    supports_batch_retrieval = False
+
+    def __init__(self, project_id: str, location: str):
+        self.project_id = project_id
+        self.location = location
+        # Share the process-wide credentials instead of rediscovering them
+        vertexai.init(project=project_id, location=location, credentials=get_credentials())
+
+    def corpus_name(self, corpus_id: str) -> str:
+        """Returns the full resource name of a corpus."""
+        return f"projects/{self.project_id}/locations/{self.location}/ragCorpora/{corpus_id}"
+
+    def file_name(self, corpus_id: str, file_id: str) -> str:
+        """Returns the full resource name of a file in a corpus."""
+        return f"{self.corpus_name(corpus_id)}/ragFiles/{file_id}"
+
+    def create_corpus(
+        self,
+        display_name: str,
+        description: str,
+        embedding_model: str
+    ) -> Dict[str, Any]:
+        # Configure embedding model
+        embedding_model_config = rag.EmbeddingModelConfig(
+            publisher_model=f"publishers/google/models/{embedding_model}"
+        )
+        corpus = rag.create_corpus(
+            display_name=display_name,
+            description=description,
+            embedding_model_config=embedding_model_config,
+        )
+        return _corpus_to_dict(corpus)
+
+    def update_corpus(
+        self,
+        corpus_id: str,
+        display_name: Optional[str] = None,
+        description: Optional[str] = None
+    ) -> Dict[str, Any]:
+        corpus = rag.get_corpus(name=self.corpus_name(corpus_id))
+        if display_name:
+            corpus.display_name = display_name
+        if description:
+            corpus.description = description
+        updated_corpus = rag.update_corpus(
+            corpus=corpus,
+            update_mask=["display_name", "description"]
+        )
+        return _corpus_to_dict(updated_corpus)
+
+    def get_corpus(self, corpus_id: str) -> Dict[str, Any]:
+        corpus = rag.get_corpus(name=self.corpus_name(corpus_id))
+        corpus_details = _corpus_to_dict(corpus)
+        raw_data = _raw_api_data(corpus)
+        if raw_data:
+            corpus_details["raw_api_data"] = raw_data
+        return corpus_details
+
+    def list_corpora(self) -> List[Dict[str, Any]]:
+        return [_corpus_to_dict(corpus) for corpus in rag.list_corpora()]
+
+    def delete_corpus(self, corpus_id: str) -> None:
+        rag.delete_corpus(name=self.corpus_name(corpus_id))
+
+    def import_files(self, corpus_id: str, uris: List[str]) -> Dict[str, int]:
+        rate_limiters.get("import").acquire()
+        # Use the most basic form of the API call to avoid parameter issues
+        response = rag.import_files(self.corpus_name(corpus_id), list(uris))
+        return {
+            "imported": getattr(response, "imported_rag_files_count", len(uris)),
+            "skipped": getattr(response, "skipped_rag_files_count", 0),
+            "failed": getattr(response, "failed_rag_files_count", 0)
+        }
+
+    def list_files(
+        self,
+        corpus_id: str,
+        page_size: Optional[int] = None,
+        page_token: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        response = rag.list_files(
+            corpus_name=self.corpus_name(corpus_id),
+            page_size=page_size,
+            page_token=page_token
+        )
+        files = [_file_to_dict(rag_file) for rag_file in response.rag_files]
+        next_page_token = response.next_page_token if hasattr(response, "next_page_token") else None
+        return files, next_page_token or None
+
+    def get_file(self, corpus_id: str, file_id: str) -> Dict[str, Any]:
+        rag_file = rag.get_file(name=self.file_name(corpus_id, file_id))
+        file_details = _file_to_dict(rag_file)
+        file_details["id"] = file_id
+        raw_data = _raw_api_data(rag_file)
+        if raw_data:
+            file_details["raw_api_data"] = raw_data
+        return file_details
+
+    def delete_file(self, corpus_id: str, file_id: str) -> None:
+        rag.delete_file(name=self.file_name(corpus_id, file_id))
+
+    def retrieve(
+        self,
+        corpus_ids: List[str],
+        query_text: str,
+        top_k: int,
+        vector_distance_threshold: float,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        deadline_at = None if timeout is None else time.monotonic() + timeout
+        # Call the RAG service through the shared client; rag.retrieval_query
+        # would open a new gRPC channel for every query
+        request = aiplatform_v1beta1.RetrieveContextsRequest(
+            parent=f"projects/{self.project_id}/locations/{self.location}",
+            vertex_rag_store=aiplatform_v1beta1.RetrieveContextsRequest.VertexRagStore(
+                rag_resources=[
+                    aiplatform_v1beta1.RetrieveContextsRequest.VertexRagStore.RagResource(
+                        rag_corpus=self.corpus_name(corpus_id)
+                    )
+                    for corpus_id in corpus_ids
+                ]
+            ),
+            query=aiplatform_v1beta1.RagQuery(
+                text=query_text,
+                rag_retrieval_config=aiplatform_v1beta1.RagRetrievalConfig(
+                    top_k=top_k,
+                    filter=aiplatform_v1beta1.RagRetrievalConfig.Filter(
+                        vector_distance_threshold=vector_distance_threshold
+                    )
+                )
+            )
+        )
+        limiter = rate_limiters.get("retrieval")
+        limiter.acquire(timeout=None if timeout is None else min(timeout, limiter.max_wait_seconds))
+        call_options = {}
+        if deadline_at is not None:
+            # Waiting for quota used part of the time; the RPC gets the rest
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"No time left to query {len(corpus_ids)} corpora")
+            call_options["timeout"] = remaining
+        response = get_rag_service_client(self.location).retrieve_contexts(request=request, **call_options)
+
+        # Searches send one corpus per call, so every result is from it
+        corpus_id = corpus_ids[0] if len(corpus_ids) == 1 else None
+
+        results = []
+        if hasattr(response, "contexts"):
+            # Handle different response structures
+            contexts = response.contexts
+            if hasattr(contexts, "contexts"):
+                contexts = contexts.contexts
+
+            # Extract text and metadata from each context
+            for context in contexts:
+                results.append({
+                    "text": context.text if hasattr(context, "text") else "",
+                    "source_uri": context.source_uri if hasattr(context, "source_uri") else None,
+                    "relevance_score": _context_relevance(context),
+                    "corpus_id": corpus_id
+                })
+        return results
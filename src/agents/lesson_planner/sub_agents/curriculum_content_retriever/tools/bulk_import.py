@@ -0,0 +1,227 @@
+"""
+Bulk, resumable import of documents into a RAG corpus.
+
+Onboarding a textbook set means importing hundreds of files. The importer
+takes the URIs from a GCS prefix or a manifest, sends them to the backend in
+batches (one import_files call per batch), runs a bounded number of batches
+concurrently, and records every finished batch in a local JSON checkpoint.
+Running the same import again skips the URIs the checkpoint already lists as
+imported, so an interrupted import resumes where it stopped.
+"""
+
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .cloud_clients import get_storage_client
+from .rate_limiter import PRIORITY_LOW, rate_limit_priority
+
+
+def _split_gcs_uri(uri: str) -> Tuple[str, str]:
+    if not uri.startswith("gs://"):
+        raise ValueError(f"Not a GCS URI: '{uri}'")
+    bucket_name, _, path = uri[len("gs://"):].partition("/")
+    if not bucket_name:
+        raise ValueError(f"GCS URI has no bucket: '{uri}'")
+    return bucket_name, path
+
+
+def list_gcs_objects(prefix_uri: str) -> List[Dict[str, Any]]:
+    """
+    Lists the objects under a GCS prefix, skipping folder placeholders.
+
+    Returns:
+        Dictionaries with uri, generation, md5_hash and size
+    """
+    bucket_name, prefix = _split_gcs_uri(prefix_uri)
+    client = get_storage_client()
+    return [
+        {
+            "uri": f"gs://{bucket_name}/{blob.name}",
+            "generation": blob.generation,
+            "md5_hash": blob.md5_hash,
+            "size": blob.size
+        }
+        for blob in client.list_blobs(bucket_name, prefix=prefix or None)
+        if not blob.name.endswith("/")
+    ]
+
+
+def list_gcs_uris(prefix_uri: str) -> List[str]:
+    """Lists the gs:// URIs of all objects under a GCS prefix, skipping folder placeholders."""
+    return [gcs_object["uri"] for gcs_object in list_gcs_objects(prefix_uri)]
+
+
+def read_manifest(manifest_uri: str) -> List[str]:
+    """
+    Reads a manifest of document URIs from a local path or a gs:// URI.
+
+    The manifest is either a JSON list of URIs or plain text with one URI
+    per line; blank lines and lines starting with # are ignored.
+    """
+    if manifest_uri.startswith("gs://"):
+        bucket_name, path = _split_gcs_uri(manifest_uri)
+        client = get_storage_client()
+        content = client.bucket(bucket_name).blob(path).download_as_text()
+    else:
+        with open(os.path.expanduser(manifest_uri), encoding="utf-8") as manifest:
+            content = manifest.read()
+
+    if content.lstrip().startswith("["):
+        uris = [str(uri).strip() for uri in json.loads(content)]
+    else:
+        uris = [line.strip() for line in content.splitlines()]
+    return [uri for uri in uris if uri and not uri.startswith("#")]
+
+
+def default_checkpoint_path(checkpoint_dir: str, corpus_id: str, source: str, suffix: str = ".json") -> str:
+    """Names the checkpoint file of one (corpus, source) import."""
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(os.path.expanduser(checkpoint_dir), f"{corpus_id}-{digest}{suffix}")
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Writes JSON to a temp file next to path and renames it into place."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as temp_file:
+            json.dump(data, temp_file)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class ImportCheckpoint:
+    """
+    JSON file recording which URIs of an import have been imported and
+    which failed. Every update is written atomically (temp file + rename),
+    so a crash never leaves a truncated checkpoint behind.
+
+    Args:
+        path: Checkpoint file location; created on first save. None keeps
+            the checkpoint in memory only.
+        corpus_id: Corpus the import targets. A checkpoint written for
+            another corpus is ignored.
+    """
+
+    def __init__(self, path: Optional[str], corpus_id: str):
+        self.path = path
+        self.corpus_id = corpus_id
+        self._lock = threading.Lock()
+        self.completed: set = set()
+        self.failed: Dict[str, str] = {}
+
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as checkpoint:
+                data = json.load(checkpoint)
+            if data.get("corpus_id") == corpus_id:
+                self.completed = set(data.get("completed", []))
+                self.failed = dict(data.get("failed", {}))
+
+    def record(self, imported: Iterable[str], failed: Dict[str, str]) -> None:
+        """Records the outcome of a batch and saves the checkpoint."""
+        with self._lock:
+            for uri in imported:
+                self.completed.add(uri)
+                self.failed.pop(uri, None)
+            self.failed.update(failed)
+            self._save()
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        write_json_atomic(self.path, {
+            "corpus_id": self.corpus_id,
+            "updated_at": time.time(),
+            "completed": sorted(self.completed),
+            "failed": self.failed
+        })
+
+
+def run_bulk_import(
+    import_batch: Callable[[List[str]], Dict[str, int]],
+    uris: List[str],
+    checkpoint: ImportCheckpoint,
+    batch_size: int,
+    max_concurrency: int,
+    max_retries: int = 3,
+    retry_backoff_seconds: float = 2.0
+) -> Dict[str, Any]:
+    """
+    Imports the URIs not yet in the checkpoint, batch_size per call and up to
+    max_concurrency calls at a time.
+
+    A batch that raises is retried with jittered exponential backoff (Vertex
+    AI rejects imports while another operation runs on the same corpus). A
+    batch whose call succeeds but reports failed files is recorded as failed
+    as a whole, since the backend does not say which files failed; the next
+    run retries it and the backend skips the files it already has.
+
+    Args:
+        import_batch: Callable importing a list of URIs and returning counts
+            with keys imported, skipped and failed
+
+    Returns:
+        Counts (total, already_completed, imported, skipped, failed) plus the
+        failed URIs with their errors
+    """
+    # De-duplicate while keeping the given order
+    uris = list(dict.fromkeys(uris))
+    pending = [uri for uri in uris if uri not in checkpoint.completed]
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), max(1, batch_size))]
+    summary = {
+        "total": len(uris),
+        "already_completed": len(uris) - len(pending),
+        "imported": 0,
+        "skipped": 0,
+        "failed": 0,
+        "failed_uris": {}
+    }
+    summary_lock = threading.Lock()
+
+    def run_batch(batch: List[str]) -> None:
+        error = None
+        counts = None
+        for attempt in range(max_retries + 1):
+            try:
+                # Background imports queue behind interactive calls for quota
+                with rate_limit_priority(PRIORITY_LOW):
+                    counts = import_batch(batch)
+                break
+            except Exception as e:
+                error = e
+                if attempt < max_retries:
+                    time.sleep(retry_backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+        if counts is None:
+            failed = {uri: str(error) for uri in batch}
+            imported, skipped = 0, 0
+        elif counts.get("failed", 0):
+            message = f"{counts['failed']} of {len(batch)} files in this batch failed to import"
+            failed = {uri: message for uri in batch}
+            imported, skipped = counts.get("imported", 0), counts.get("skipped", 0)
+        else:
+            failed = {}
+            imported, skipped = counts.get("imported", 0), counts.get("skipped", 0)
+
+        checkpoint.record(batch if not failed else [], failed)
+        with summary_lock:
+            summary["imported"] += imported
+            summary["skipped"] += skipped
+            summary["failed"] += len(failed)
+            summary["failed_uris"].update(failed)
+
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="rag-import") as executor:
+            for future in as_completed([executor.submit(run_batch, batch) for batch in batches]):
+                future.result()
+    return summary
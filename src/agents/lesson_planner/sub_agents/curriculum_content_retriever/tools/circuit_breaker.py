@@ -0,0 +1,195 @@
+"""
+Per-corpus circuit breakers for the retrieval layer.
+
+A misconfigured corpus, or one in a degraded region, would otherwise make
+every search wait for its timeout. Each corpus gets a breaker that watches
+its recent retrievals; failures and slow calls both count against it.
+
+- closed: retrievals run normally. Once enough of the recent calls failed
+  or were slow, the breaker opens.
+- open: searches skip the corpus (and report it) for open_seconds.
+- half-open: a limited number of probe retrievals are let through. If they
+  all succeed the breaker closes again; a failed probe reopens it.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Breaker for one corpus. Thread-safe.
+
+    Args:
+        window_size: Recent calls considered for the failure rate
+        min_calls: Calls in the window before the breaker may open
+        failure_rate: Share of failed or slow calls at which it opens
+        slow_call_seconds: Calls slower than this count as failures
+        open_seconds: How long the breaker stays open before probing
+        half_open_probes: Successful probes needed to close; also the most
+            probes in flight at once
+    """
+
+    def __init__(
+        self,
+        window_size: int,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_seconds: float,
+        open_seconds: float,
+        half_open_probes: int
+    ):
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)  # True = failed or slow
+        self._opened_at = 0.0
+        self._probes_started: List[float] = []
+        self._probe_successes = 0
+        self._last_error: Optional[str] = None
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance()
+            return self._state
+
+    def allow(self) -> bool:
+        """Tells whether a call may go to the corpus now; reserves a probe when half-open."""
+        with self._lock:
+            self._advance()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                return False
+            # A probe whose outcome never arrived (e.g. answered from the
+            # cache) stops counting as in flight after open_seconds
+            now = time.monotonic()
+            self._probes_started = [t for t in self._probes_started if now - t < self.open_seconds]
+            if len(self._probes_started) >= self.half_open_probes:
+                return False
+            self._probes_started.append(now)
+            return True
+
+    def record(self, success: bool, latency_seconds: float = 0.0, error: Optional[str] = None) -> None:
+        """Records the outcome of a call; slow successes count as failures."""
+        failed = not success or latency_seconds > self.slow_call_seconds
+        with self._lock:
+            self._advance()
+            if failed:
+                self._last_error = error or (
+                    f"Slow call ({latency_seconds:.1f} s)" if success else "Call failed"
+                )
+            if self._state == HALF_OPEN:
+                if self._probes_started:
+                    self._probes_started.pop(0)
+                if failed:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._state = CLOSED
+                        self._outcomes.clear()
+                return
+            if self._state == OPEN:
+                # A call started before the breaker opened
+                return
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls:
+                if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                    self._open()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the state, failure rate, reopen countdown and last error."""
+        with self._lock:
+            self._advance()
+            outcomes = list(self._outcomes)
+            return {
+                "state": self._state,
+                "recent_calls": len(outcomes),
+                "failure_rate": sum(outcomes) / len(outcomes) if outcomes else 0.0,
+                "retry_in_seconds": (
+                    max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+                    if self._state == OPEN else 0.0
+                ),
+                "times_opened": self._times_opened,
+                "last_error": self._last_error
+            }
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._times_opened += 1
+        self._probes_started = []
+        self._probe_successes = 0
+
+    def _advance(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes_started = []
+            self._probe_successes = 0
+
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers keyed by corpus ID, created on first use. Disabled
+    registries allow every call and record nothing.
+    """
+
+    def __init__(self, enabled: bool = True, **breaker_settings: Any):
+        self.enabled = enabled
+        self.breaker_settings = breaker_settings
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, corpus_id: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(corpus_id)
+            if breaker is None:
+                breaker = self._breakers[corpus_id] = CircuitBreaker(**self.breaker_settings)
+            return breaker
+
+    def allow(self, corpus_id: str) -> bool:
+        return not self.enabled or self.get(corpus_id).allow()
+
+    def record(self, corpus_id: str, success: bool, latency_seconds: float = 0.0, error: Optional[str] = None) -> None:
+        if self.enabled:
+            self.get(corpus_id).record(success, latency_seconds, error)
+
+    def forget(self, corpus_id: str) -> None:
+        """Drops a corpus's breaker, e.g. after the corpus was deleted or re-imported."""
+        with self._lock:
+            self._breakers.pop(corpus_id, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns every breaker that is not closed or has recorded failures."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        snapshots = {corpus_id: breaker.snapshot() for corpus_id, breaker in breakers.items()}
+        return {
+            "enabled": self.enabled,
+            "tracked_corpora": len(snapshots),
+            "open": sorted(corpus_id for corpus_id, snap in snapshots.items() if snap["state"] == OPEN),
+            "half_open": sorted(corpus_id for corpus_id, snap in snapshots.items() if snap["state"] == HALF_OPEN),
+            "corpora": {
+                corpus_id: snap for corpus_id, snap in snapshots.items()
+                if snap["state"] != CLOSED or snap["failure_rate"] > 0 or snap["times_opened"]
+            }
+        }
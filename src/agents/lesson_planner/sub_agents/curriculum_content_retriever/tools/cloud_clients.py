@@ -0,0 +1,110 @@
+"""
+Process-wide registry of Google Cloud clients shared by the storage and RAG
+tools.
+
+Building a client per call repeats credential discovery and opens new
+connections, paying a TLS handshake (and for gRPC, a new channel) every
+time. The registry builds each client once per process instead:
+credentials are discovered once and shared, the storage client keeps an
+HTTP connection pool sized for the tools' concurrency, and the Vertex AI RAG
+service client keeps one gRPC channel.
+
+The Google Cloud SDKs themselves are imported on first use, so importing the
+tools costs nothing for requests that never reach Cloud Storage or RAG.
+
+Clients are dropped in a forked child (gunicorn/uvicorn workers created with
+fork), since sockets and gRPC channels must not be shared across processes;
+the child builds its own on first use.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from ..config import PROJECT_ID, LOCATION, GCS_HTTP_POOL_SIZE
+
+_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+# Reentrant: building the storage client looks up the shared credentials
+_lock = threading.RLock()
+_clients: Dict[str, Any] = {}
+_owner_pid = os.getpid()
+
+
+def _reset_after_fork() -> None:
+    global _lock, _owner_pid
+    # The parent's lock may have been held at fork time; start fresh
+    _lock = threading.RLock()
+    _clients.clear()
+    _owner_pid = os.getpid()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _get_or_create(key: str, factory: Callable[[], Any]) -> Any:
+    if os.getpid() != _owner_pid:
+        # Forked without the at-fork hook (e.g. platforms without it)
+        _reset_after_fork()
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+        return client
+
+
+def get_credentials() -> Any:
+    """Returns the application default credentials, discovered once per process."""
+    def create() -> Any:
+        import google.auth
+
+        credentials, _ = google.auth.default(scopes=_SCOPES)
+        return credentials
+    return _get_or_create("credentials", create)
+
+
+def get_storage_client() -> Any:
+    """
+    Returns the shared Cloud Storage client. Its HTTP session keeps up to
+    GCS_HTTP_POOL_SIZE connections alive per host, enough for the search,
+    import and listing thread pools to run without reconnecting.
+    """
+    def create() -> Any:
+        from google.auth.transport.requests import AuthorizedSession
+        from google.cloud import storage
+        from requests.adapters import HTTPAdapter
+
+        session = AuthorizedSession(get_credentials())
+        adapter = HTTPAdapter(pool_connections=GCS_HTTP_POOL_SIZE, pool_maxsize=GCS_HTTP_POOL_SIZE)
+        session.mount("https://", adapter)
+        return storage.Client(project=PROJECT_ID, credentials=get_credentials(), _http=session)
+    return _get_or_create("storage", create)
+
+
+def get_rag_service_client(location: Optional[str] = None) -> Any:
+    """
+    Returns the shared Vertex AI RAG service client (v1beta1) for a region.
+
+    The high-level vertexai.preview.rag functions build a new client, and
+    with it a new gRPC channel, on every call; retrieval on the query path
+    uses this long-lived client instead.
+    """
+    location = location or LOCATION
+
+    def create() -> Any:
+        from google.api_core.client_options import ClientOptions
+        from google.cloud.aiplatform_v1beta1.services.vertex_rag_service import VertexRagServiceClient
+
+        return VertexRagServiceClient(
+            credentials=get_credentials(),
+            client_options=ClientOptions(api_endpoint=f"{location}-aiplatform.googleapis.com")
+        )
+    return _get_or_create(f"rag:{location}", create)
+
+
+def reset_clients() -> None:
+    """Drops every cached client, e.g. after rotating credentials."""
+    with _lock:
+        _clients.clear()
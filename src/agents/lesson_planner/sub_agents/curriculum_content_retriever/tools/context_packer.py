@@ -0,0 +1,255 @@
+"""
+Token-budgeted packing of curriculum_content.
+
+LessonPlanCreationAgent interpolates the retriever's curriculum_content into
+its instruction, and nothing bounded its size, so some lesson plans went out
+with very large prompts. The packer sits between retrieval and generation:
+
+1. While the retriever runs, record_retrieved_chunks keeps the scored
+   chunks its search tools returned (invocation-scoped temp state).
+2. When the retriever finishes, pack_curriculum_content splits its
+   curriculum_content into blocks (paragraphs, list items), scores each
+   block by the best retrieved chunk it reproduces, drops near-duplicate
+   blocks, and fills the token budget with the highest-scoring blocks,
+   discounting further blocks from a source already used so the plan draws
+   on several sources. Kept blocks stay in their original order.
+3. The token counts before and after packing are saved in state under
+   "context_packing" for every request.
+"""
+
+import logging
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.tools import BaseTool, ToolContext
+
+from ..config import (
+    CONTEXT_PACK_TOKEN_BUDGET,
+    CONTEXT_PACK_DUPLICATE_THRESHOLD,
+    CONTEXT_PACK_SOURCE_DECAY
+)
+from .response_format import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# The retriever's output_key, read by LessonPlanCreationAgent
+CURRICULUM_CONTENT_KEY = "curriculum_content"
+# Invocation-scoped state key for the retrieved chunks; ADK never persists
+# "temp:" keys
+RETRIEVED_CHUNKS_KEY = "temp:retrieved_chunks"
+PACKING_REPORT_KEY = "context_packing"
+
+_SEARCH_TOOLS = ("search_all_corpora", "query_rag_corpus")
+
+# Blocks this short (headings, citation lines) are kept without competing
+_PINNED_TOKENS = 12
+
+# Share of a block's shingles a chunk must contain to lend it its score
+_MIN_CONTAINMENT = 0.3
+
+_SHINGLE_SIZE = 3
+_BLOCK_BREAK = re.compile(r"\n\s*\n|\n(?=\s*(?:[-*•]|\d+[.)]|#{1,6})\s)")
+_SOURCE_MARKER = re.compile(r"\[Source:[^\]]*\]|\bS\d+\b")
+
+
+def shingles(text: str, size: int = _SHINGLE_SIZE) -> FrozenSet[str]:
+    """Returns the set of word n-grams of a text, lowercased."""
+    words = re.findall(r"\w+", text.casefold())
+    if len(words) <= size:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def pack_chunks(
+    chunks: List[Dict[str, Any]],
+    token_budget: int,
+    duplicate_threshold: float = 0.8,
+    source_decay: float = 0.8
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Selects chunks to fit a token budget.
+
+    Args:
+        chunks: Dicts with text, score and source (any hashable, or None);
+            "pinned" chunks are always kept
+        token_budget: Maximum estimated tokens of the kept chunks
+        duplicate_threshold: Shingle Jaccard similarity at which a chunk
+            counts as a near-duplicate of a better one and is dropped
+        source_decay: Factor applied to a chunk's score for every chunk
+            already kept from the same source (1 ignores sources)
+
+    Returns:
+        The kept chunks in their original order, and counts: chunks,
+        kept, duplicates_dropped, over_budget_dropped, input_tokens,
+        packed_tokens and tokens_saved
+    """
+    entries = [
+        {"index": i, "chunk": chunk, "tokens": estimate_tokens(chunk["text"]), "shingles": shingles(chunk["text"])}
+        for i, chunk in enumerate(chunks)
+    ]
+    input_tokens = sum(entry["tokens"] for entry in entries)
+
+    # Near-duplicates: keep the better-scored copy
+    distinct: List[Dict[str, Any]] = []
+    for entry in sorted(entries, key=lambda e: (not e["chunk"].get("pinned"), -e["chunk"].get("score", 0.0), e["index"])):
+        if entry["chunk"].get("pinned") or not any(
+            jaccard(entry["shingles"], kept["shingles"]) >= duplicate_threshold for kept in distinct
+        ):
+            distinct.append(entry)
+    duplicates = len(entries) - len(distinct)
+
+    # Pinned chunks first, then greedily the best remaining utility that fits
+    selected = [entry for entry in distinct if entry["chunk"].get("pinned")]
+    used = sum(entry["tokens"] for entry in selected)
+    candidates = [entry for entry in distinct if not entry["chunk"].get("pinned")]
+    per_source: Dict[Any, int] = {}
+    while candidates:
+        best, best_utility = None, None
+        for entry in candidates:
+            if used + entry["tokens"] > token_budget:
+                continue
+            source = entry["chunk"].get("source")
+            utility = entry["chunk"].get("score", 0.0) * (source_decay ** per_source.get(source, 0) if source else 1.0)
+            if best_utility is None or utility > best_utility:
+                best, best_utility = entry, utility
+        if best is None:
+            break
+        candidates.remove(best)
+        selected.append(best)
+        used += best["tokens"]
+        source = best["chunk"].get("source")
+        if source:
+            per_source[source] = per_source.get(source, 0) + 1
+
+    selected.sort(key=lambda entry: entry["index"])
+    return [entry["chunk"] for entry in selected], {
+        "chunks": len(entries),
+        "kept": len(selected),
+        "duplicates_dropped": duplicates,
+        "over_budget_dropped": len(distinct) - len(selected),
+        "input_tokens": input_tokens,
+        "packed_tokens": used,
+        "tokens_saved": input_tokens - used
+    }
+
+
+def _response_chunks(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Extracts text, score and source from a compact or verbose search response."""
+    citations = response.get("citations", {})
+    chunks = []
+    for result in response.get("results", []):
+        source = result.get("source")
+        if source in citations:
+            source = citations[source]
+        else:
+            source = result.get("citation") or result.get("source_uri") or response.get("corpus_id")
+        chunks.append({
+            "text": result.get("text", ""),
+            "score": result.get("relevance_score", result.get("score")) or 0.0,
+            "source": source
+        })
+    return chunks
+
+
+def record_retrieved_chunks(
+    tool: BaseTool,
+    args: Dict[str, Any],
+    tool_context: ToolContext,
+    tool_response: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """after_tool_callback keeping the chunks the search tools returned for packing."""
+    if tool.name in _SEARCH_TOOLS and isinstance(tool_response, dict) and tool_response.get("status") == "success":
+        recorded = list(tool_context.state.get(RETRIEVED_CHUNKS_KEY) or [])
+        recorded.extend(_response_chunks(tool_response))
+        tool_context.state[RETRIEVED_CHUNKS_KEY] = recorded
+    return None
+
+
+def _score_blocks(blocks: List[str], retrieved: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Scores each block by the best retrieved chunk it reproduces. Without
+    retrieved chunks, earlier blocks score higher.
+    """
+    retrieved = [(shingles(chunk["text"]), chunk) for chunk in retrieved]
+    scored = []
+    for position, block in enumerate(blocks):
+        marker = _SOURCE_MARKER.search(block)
+        chunk = {"text": block, "score": 1.0 - position / len(blocks), "source": marker.group(0) if marker else None}
+        if estimate_tokens(block) <= _PINNED_TOKENS or block.lstrip().startswith("#"):
+            chunk["pinned"] = True
+        elif retrieved:
+            block_shingles = shingles(block)
+            chunk["score"] = 0.0
+            for chunk_shingles, retrieved_chunk in retrieved:
+                if not block_shingles:
+                    break
+                containment = len(block_shingles & chunk_shingles) / len(block_shingles)
+                if containment >= _MIN_CONTAINMENT and containment * retrieved_chunk["score"] > chunk["score"]:
+                    chunk["score"] = containment * retrieved_chunk["score"]
+                    chunk["source"] = chunk["source"] or retrieved_chunk["source"]
+        scored.append(chunk)
+    return scored
+
+
+def pack_text(
+    text: str,
+    retrieved: List[Dict[str, Any]],
+    token_budget: int,
+    duplicate_threshold: float = 0.8,
+    source_decay: float = 0.8
+) -> Tuple[str, Dict[str, int]]:
+    """Packs a text block by block into a token budget; see pack_chunks."""
+    # Each block remembers the break before it, so list items stay on
+    # consecutive lines
+    blocks, separators = [], []
+    start, separator = 0, ""
+    for match in _BLOCK_BREAK.finditer(text):
+        if text[start:match.start()].strip():
+            blocks.append(text[start:match.start()])
+            separators.append(separator)
+        start, separator = match.end(), "\n\n" if match.group(0).count("\n") > 1 else "\n"
+    if text[start:].strip():
+        blocks.append(text[start:])
+        separators.append(separator)
+
+    scored = _score_blocks(blocks, retrieved)
+    for chunk, block_separator in zip(scored, separators):
+        chunk["separator"] = block_separator
+    kept, report = pack_chunks(scored, token_budget, duplicate_threshold, source_decay)
+    packed = "".join(chunk["separator"] + chunk["text"] for chunk in kept)
+    return packed.lstrip("\n"), report
+
+
+def pack_curriculum_content(callback_context: CallbackContext) -> None:
+    """
+    after_agent_callback of the retriever: packs its output into the
+    context token budget and records the tokens saved.
+    """
+    content = callback_context.state.get(CURRICULUM_CONTENT_KEY)
+    if not isinstance(content, str) or CONTEXT_PACK_TOKEN_BUDGET <= 0:
+        return None
+    retrieved = callback_context.state.get(RETRIEVED_CHUNKS_KEY) or []
+    packed, report = pack_text(
+        content,
+        retrieved,
+        CONTEXT_PACK_TOKEN_BUDGET,
+        CONTEXT_PACK_DUPLICATE_THRESHOLD,
+        CONTEXT_PACK_SOURCE_DECAY
+    )
+    if report["tokens_saved"] > 0:
+        callback_context.state[CURRICULUM_CONTENT_KEY] = packed
+    callback_context.state[PACKING_REPORT_KEY] = {"token_budget": CONTEXT_PACK_TOKEN_BUDGET, **report}
+    callback_context.state[RETRIEVED_CHUNKS_KEY] = None
+    logger.info(
+        "Packed %s: %d -> %d tokens (%d saved, %d duplicates dropped)",
+        CURRICULUM_CONTENT_KEY, report["input_tokens"], report["packed_tokens"],
+        report["tokens_saved"], report["duplicates_dropped"]
+    )
+    return None
@@ -0,0 +1,169 @@
+"""
+Process-wide cache of the RAG corpus catalog.
+
+Listing corpora is needed on every search_all_corpora call, but the set of
+corpora only changes when a corpus is created, updated or deleted. The catalog
+is fetched once, reused until its TTL expires, and dropped explicitly by the
+tools that change it.
+
+File counts are tracked separately: they cost list_files calls per corpus,
+are only needed for reporting, and are refreshed in the background so they
+never sit on the query hot path.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class CorpusCatalog:
+    """
+    TTL cache of corpus metadata plus lazily refreshed per-corpus file
+    counts.
+
+    Args:
+        fetch_corpora: Callable returning the full list of corpus dictionaries
+            (each with at least "id" and "name" keys)
+        count_files: Callable taking a corpus ID and returning its number
+            of files
+        ttl_seconds: How long a fetched catalog is reused
+        file_count_ttl_seconds: How long a file count is considered fresh
+    """
+
+    def __init__(
+        self,
+        fetch_corpora: Callable[[], List[Dict[str, Any]]],
+        count_files: Callable[[str], int],
+        ttl_seconds: float,
+        file_count_ttl_seconds: float
+    ):
+        self._fetch_corpora = fetch_corpora
+        self._count_files = count_files
+        self._ttl_seconds = ttl_seconds
+        self._file_count_ttl_seconds = file_count_ttl_seconds
+
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._corpora: Optional[List[Dict[str, Any]]] = None
+        self._fetched_at = 0.0
+        self._generation = 0
+
+        # corpus_id -> (count, counted_at)
+        self._file_counts: Dict[str, Tuple[int, float]] = {}
+        # Bumped when a corpus's files change (per corpus) or on reset (all),
+        # so a count started before the change is not cached after it
+        self._file_generations: Dict[str, int] = {}
+        self._counts_generation = 0
+        self._counts_in_flight: set = set()
+        self._count_executor: Optional[ThreadPoolExecutor] = None
+
+    def get_corpora(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Returns the corpus catalog, fetching it only when missing or expired.
+
+        Concurrent callers that find the catalog expired share a single fetch.
+        Errors from the fetch propagate to the caller and nothing is cached.
+        """
+        corpora = None if force_refresh else self._fresh_corpora()
+        if corpora is not None:
+            return corpora
+
+        with self._fetch_lock:
+            # Another caller may have refreshed while we waited for the lock
+            corpora = None if force_refresh else self._fresh_corpora()
+            if corpora is not None:
+                return corpora
+
+            with self._lock:
+                generation = self._generation
+            corpora = self._fetch_corpora()
+            with self._lock:
+                # Drop the result if the catalog was invalidated mid-fetch
+                if generation == self._generation:
+                    self._corpora = corpora
+                    self._fetched_at = time.monotonic()
+            return [dict(corpus) for corpus in corpora]
+
+    def get_file_count(self, corpus_id: str) -> Optional[int]:
+        """
+        Returns the cached file count for a corpus without blocking.
+
+        A missing or stale count schedules a background refresh; the stale
+        value (or None when never counted) is returned in the meantime.
+        """
+        with self._lock:
+            cached = self._file_counts.get(corpus_id)
+            stale = cached is None or time.monotonic() - cached[1] >= self._file_count_ttl_seconds
+        if stale:
+            self._schedule_count(corpus_id)
+        return cached[0] if cached else None
+
+    def refresh_file_count(self, corpus_id: str) -> int:
+        """
+        Counts the files of a corpus synchronously and caches the count,
+        unless the files were invalidated while counting.
+        """
+        with self._lock:
+            generation = self._file_generation(corpus_id)
+        count = self._count_files(corpus_id)
+        with self._lock:
+            if generation == self._file_generation(corpus_id):
+                self._file_counts[corpus_id] = (count, time.monotonic())
+        return count
+
+    def invalidate(self) -> None:
+        """Drops the cached catalog so the next lookup fetches it again."""
+        with self._lock:
+            self._corpora = None
+            self._generation += 1
+
+    def invalidate_file_count(self, corpus_id: str) -> None:
+        """Drops the cached file count for a corpus after its files changed."""
+        with self._lock:
+            self._file_counts.pop(corpus_id, None)
+            self._file_generations[corpus_id] = self._file_generations.get(corpus_id, 0) + 1
+
+    def remove(self, corpus_id: str) -> None:
+        """Forgets everything cached about a deleted corpus."""
+        self.invalidate()
+        self.invalidate_file_count(corpus_id)
+
+    def reset(self) -> None:
+        """Forgets the catalog and every file count."""
+        self.invalidate()
+        with self._lock:
+            self._file_counts.clear()
+            self._counts_generation += 1
+
+    def _fresh_corpora(self) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            if self._corpora is None or time.monotonic() - self._fetched_at >= self._ttl_seconds:
+                return None
+            return [dict(corpus) for corpus in self._corpora]
+
+    def _file_generation(self, corpus_id: str) -> Tuple[int, int]:
+        return self._counts_generation, self._file_generations.get(corpus_id, 0)
+
+    def _schedule_count(self, corpus_id: str) -> None:
+        with self._lock:
+            if corpus_id in self._counts_in_flight:
+                return
+            self._counts_in_flight.add(corpus_id)
+            if self._count_executor is None:
+                self._count_executor = ThreadPoolExecutor(
+                    max_workers=2,
+                    thread_name_prefix="rag-catalog"
+                )
+            executor = self._count_executor
+        executor.submit(self._background_count, corpus_id)
+
+    def _background_count(self, corpus_id: str) -> None:
+        try:
+            self.refresh_file_count(corpus_id)
+        except Exception:
+            # Leave the previous count in place; the next lookup retries
+            pass
+        finally:
+            with self._lock:
+                self._counts_in_flight.discard(corpus_id)
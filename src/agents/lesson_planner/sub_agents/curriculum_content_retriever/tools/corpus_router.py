@@ -0,0 +1,254 @@
+"""
+Metadata routing of searches to the corpora that can answer them.
+
+Curriculum corpora are usually organised by grade, subject, board and
+language ("Class 8 Science - CBSE", "Grade 5 Maths (Tamil medium)"). The
+router reads those facets from each corpus's display name and description,
+or from explicit tags in the description such as "grade: 8" or
+"subject=science", and maps them to corpus IDs so a search with a known
+grade or subject only queries the matching corpora.
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+FACETS = ("grade", "subject", "board", "language")
+
+# Canonical value -> spellings found in corpus names and teacher requests
+_SUBJECT_SYNONYMS = {
+    "mathematics": ("mathematics", "maths", "math", "ganit", "गणित", "கணிதம்"),
+    "science": ("science", "vigyan", "विज्ञान", "அறிவியல்"),
+    "physics": ("physics",),
+    "chemistry": ("chemistry",),
+    "biology": ("biology",),
+    "social science": ("social science", "social studies", "sst", "samajik vigyan"),
+    "history": ("history",),
+    "geography": ("geography",),
+    "civics": ("civics", "political science"),
+    "economics": ("economics",),
+    "evs": ("evs", "environmental studies", "environmental science"),
+    "computer science": ("computer science", "computers", "computer", "ict"),
+}
+_LANGUAGE_SYNONYMS = {
+    "english": ("english",),
+    "hindi": ("hindi", "हिन्दी", "हिंदी"),
+    "tamil": ("tamil", "தமிழ்"),
+    "telugu": ("telugu",),
+    "kannada": ("kannada",),
+    "malayalam": ("malayalam",),
+    "marathi": ("marathi",),
+    "bengali": ("bengali", "bangla"),
+    "gujarati": ("gujarati",),
+    "punjabi": ("punjabi",),
+    "odia": ("odia", "oriya"),
+    "urdu": ("urdu",),
+    "sanskrit": ("sanskrit",),
+}
+_BOARD_SYNONYMS = {
+    "cbse": ("cbse", "ncert"),
+    "icse": ("icse", "cisce"),
+    "state board": ("state board", "samacheer", "samacheer kalvi", "tnscert", "scert"),
+    "ib": ("ib", "international baccalaureate"),
+    "igcse": ("igcse", "cambridge"),
+}
+
+_ROMAN_NUMERALS = {
+    "i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6,
+    "vii": 7, "viii": 8, "ix": 9, "x": 10, "xi": 11, "xii": 12
+}
+_GRADE_PATTERN = re.compile(
+    r"\b(?:grade|class|std|standard|year)\s*[-:.]?\s*"
+    r"(1[0-2]|[1-9]|xii|xi|x|ix|viii|vii|vi|v|iv|iii|ii|i)\b"
+    r"|\b(1[0-2]|[1-9])(?:st|nd|rd|th)\s+(?:grade|class|std|standard)\b"
+)
+_GRADE_RANGE_PATTERN = re.compile(
+    r"\b(?:grades?|class(?:es)?|std|standards?)\s*[-:.]?\s*(1[0-2]|[1-9])\s*(?:-|–|to)\s*(1[0-2]|[1-9])\b"
+)
+_TAG_PATTERN = re.compile(r"\b(grade|subject|board|language)\s*[:=]\s*([^,;\n\]\)]+)")
+# How a request names its medium of instruction: "in Tamil", "Tamil medium"
+_MEDIUM_PATTERN = re.compile(r"\bin\s+(\S+)|(\S+)\s+medium\b")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+def _find_terms(text: str, synonyms: Dict[str, Tuple[str, ...]]) -> Set[str]:
+    # Longest spellings first, blanking each match, so "social science"
+    # does not also count as "science"
+    spellings = sorted(
+        ((spelling, canonical) for canonical, names in synonyms.items() for spelling in names),
+        key=lambda pair: len(pair[0]),
+        reverse=True
+    )
+    found = set()
+    for spelling, canonical in spellings:
+        # Word boundaries do not hold around Indic combining marks, so
+        # native-script spellings are matched as plain substrings
+        if spelling.isascii():
+            pattern = rf"(?<!\w){re.escape(spelling)}(?!\w)"
+        else:
+            pattern = re.escape(spelling)
+        text, matches = re.subn(pattern, " ", text)
+        if matches:
+            found.add(canonical)
+    return found
+
+
+def _find_grades(text: str) -> Set[str]:
+    grades = set()
+    for match in _GRADE_PATTERN.finditer(text):
+        value = match.group(1) or match.group(2)
+        grades.add(str(_ROMAN_NUMERALS.get(value, value)))
+    for match in _GRADE_RANGE_PATTERN.finditer(text):
+        low, high = sorted((int(match.group(1)), int(match.group(2))))
+        grades.update(str(grade) for grade in range(low, high + 1))
+    return grades
+
+
+def parse_facet_values(facet: str, value: str) -> Set[str]:
+    """
+    Normalizes a facet value given by a caller or a tag, e.g. "Class VIII" to
+    {"8"} or "Maths" to {"mathematics"}. Unrecognised values are kept as
+    their normalized text.
+    """
+    text = _normalize(value)
+    if not text:
+        return set()
+    if facet == "grade":
+        found = _find_grades(text) or _find_grades(f"grade {text}")
+        if not found:
+            found = {str(int(digits)) for digits in re.findall(r"\d+", text)}
+    elif facet == "subject":
+        found = _find_terms(text, _SUBJECT_SYNONYMS) | _find_terms(text, _LANGUAGE_SYNONYMS)
+    elif facet == "language":
+        found = _find_terms(text, _LANGUAGE_SYNONYMS)
+    elif facet == "board":
+        found = _find_terms(text, _BOARD_SYNONYMS)
+    else:
+        raise ValueError(f"Unknown routing facet '{facet}'")
+    return found or {text}
+
+
+def extract_corpus_metadata(corpus: Dict[str, Any]) -> Dict[str, FrozenSet[str]]:
+    """
+    Reads grade, subject, board and language values of a corpus.
+
+    Explicit tags in the description ("grade: 8, subject: science") take
+    precedence for their facet; other facets are inferred from the display
+    name and description. A language named in a corpus title (e.g. "Class 6
+    Tamil") may be the taught subject or the medium, so it counts as both.
+    """
+    description = corpus.get("description") or ""
+    text = _normalize(f"{corpus.get('display_name') or ''} {description}")
+
+    tagged: Dict[str, Set[str]] = {}
+    for facet, value in _TAG_PATTERN.findall(_normalize(description)):
+        tagged.setdefault(facet, set()).update(parse_facet_values(facet, value))
+
+    languages = _find_terms(text, _LANGUAGE_SYNONYMS)
+    inferred = {
+        "grade": _find_grades(text),
+        "subject": _find_terms(text, _SUBJECT_SYNONYMS) | languages,
+        "board": _find_terms(text, _BOARD_SYNONYMS),
+        "language": languages,
+    }
+    return {facet: frozenset(tagged.get(facet) or inferred[facet]) for facet in FACETS}
+
+
+def extract_request_facets(text: str) -> Dict[str, Optional[str]]:
+    """
+    Reads the grade, subject, board and language a teacher's request
+    names, e.g. {"grade": "7", "subject": "science", ...} for "Class 7
+    science in Tamil". A facet is None unless exactly one value is found. A
+    language only counts as the medium when the request says so ("in
+    Tamil", "Tamil medium"); otherwise it is taken as the subject taught.
+    """
+    text = _normalize(text)
+    mediums = " ".join(first or second for first, second in _MEDIUM_PATTERN.findall(text))
+    languages = _find_terms(mediums, _LANGUAGE_SYNONYMS)
+    found = {
+        "grade": _find_grades(text),
+        "subject": _find_terms(text, _SUBJECT_SYNONYMS) or _find_terms(text, _LANGUAGE_SYNONYMS) - languages,
+        "board": _find_terms(text, _BOARD_SYNONYMS),
+        "language": languages,
+    }
+    return {facet: next(iter(values)) if len(values) == 1 else None for facet, values in found.items()}
+
+
+class CorpusRouter:
+    """
+    Inverted index from facet values to corpus IDs.
+
+    A corpus matches a routed search when it has a requested value for at
+    least one requested facet and does not contradict any of them; a corpus
+    that states no value for a facet (say, a grade-independent dictionary)
+    is compatible with any value of that facet.
+
+    Args:
+        corpora: Corpus dictionaries with "id", "display_name" and
+            "description" keys
+    """
+
+    def __init__(self, corpora: Iterable[Dict[str, Any]]):
+        self._metadata: Dict[str, Dict[str, FrozenSet[str]]] = {}
+        self._index: Dict[str, Dict[str, Set[str]]] = {facet: {} for facet in FACETS}
+        for corpus in corpora:
+            metadata = extract_corpus_metadata(corpus)
+            self._metadata[corpus["id"]] = metadata
+            for facet, values in metadata.items():
+                for value in values:
+                    self._index[facet].setdefault(value, set()).add(corpus["id"])
+
+    def metadata(self, corpus_id: str) -> Optional[Dict[str, FrozenSet[str]]]:
+        """Returns the facet values read for a corpus."""
+        return self._metadata.get(corpus_id)
+
+    def route(self, filters: Dict[str, Optional[str]]) -> Optional[Set[str]]:
+        """
+        Returns the IDs of corpora matching the given facet filters, or None
+        when no filter is set or no corpus matches (search everything).
+        """
+        wanted = {
+            facet: parse_facet_values(facet, value)
+            for facet, value in filters.items()
+            if value
+        }
+        wanted = {facet: values for facet, values in wanted.items() if values}
+        if not wanted:
+            return None
+
+        candidates: Set[str] = set()
+        for facet, values in wanted.items():
+            for value in values:
+                candidates |= self._index[facet].get(value, set())
+
+        matched = set()
+        for corpus_id in candidates:
+            metadata = self._metadata[corpus_id]
+            if all(not metadata[facet] or metadata[facet] & values for facet, values in wanted.items()):
+                matched.add(corpus_id)
+        return matched or None
+
+
+class CorpusRouterCache:
+    """Keeps the router of the current catalog, rebuilding it when corpora change."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[Tuple] = None
+        self._router: Optional[CorpusRouter] = None
+
+    def get(self, corpora: List[Dict[str, Any]]) -> CorpusRouter:
+        """Returns the router for this corpus list."""
+        fingerprint = tuple(
+            (corpus["id"], corpus.get("display_name"), corpus.get("description"))
+            for corpus in corpora
+        )
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                self._router = CorpusRouter(corpora)
+                self._fingerprint = fingerprint
+            return self._router
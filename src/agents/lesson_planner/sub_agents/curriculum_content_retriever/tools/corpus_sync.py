@@ -0,0 +1,222 @@
+"""
+Incremental re-indexing of a RAG corpus from a GCS prefix.
+
+Re-importing a whole syllabus bucket re-embeds every unchanged PDF. A sync
+instead compares the bucket's objects (GCS generation numbers and MD5
+hashes) with a local manifest of what was last imported and with the files
+the corpus actually holds, then imports only new or changed objects and
+deletes the files whose objects were removed.
+
+Syncs are idempotent and guarded by a lock file, so they can run on a
+schedule: overlapping runs exit early, and a run that dies part way through
+is completed by the next one.
+"""
+
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+from .bulk_import import ImportCheckpoint, run_bulk_import, write_json_atomic
+
+
+class SyncInProgressError(Exception):
+    """Raised when another sync of the same corpus and prefix holds the lock."""
+
+
+class SyncLock:
+    """
+    Exclusive lock file next to the sync manifest. A lock older than
+    stale_after_seconds is assumed to belong to a crashed run and is taken
+    over.
+    """
+
+    def __init__(self, path: str, stale_after_seconds: float):
+        self.path = path
+        self.stale_after_seconds = stale_after_seconds
+
+    def __enter__(self) -> "SyncLock":
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        for _ in range(2):
+            try:
+                handle = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    age = time.time() - os.path.getmtime(self.path)
+                except FileNotFoundError:
+                    continue
+                if age < self.stale_after_seconds:
+                    raise SyncInProgressError(f"Another sync is running (lock file {self.path})")
+                os.unlink(self.path)
+                continue
+            with os.fdopen(handle, "w") as lock_file:
+                lock_file.write(str(os.getpid()))
+            return self
+        raise SyncInProgressError(f"Could not take the sync lock {self.path}")
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def load_sync_manifest(path: str, corpus_id: str) -> Dict[str, Dict[str, Any]]:
+    """Returns the last synced {uri: {generation, md5_hash}} entries for a corpus."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as manifest:
+        data = json.load(manifest)
+    if data.get("corpus_id") != corpus_id:
+        return {}
+    return data.get("files", {})
+
+
+def compute_sync_diff(
+    gcs_objects: List[Dict[str, Any]],
+    corpus_files: List[Dict[str, Any]],
+    manifest: Dict[str, Dict[str, Any]],
+    prefix_uri: str
+) -> Dict[str, Any]:
+    """
+    Classifies objects and corpus files into new, changed, removed and
+    unchanged.
+
+    An object is new when the corpus has no file with its URI, and changed
+    when the manifest recorded a different generation or MD5 for it. Corpus
+    files already present but missing from the manifest (imported before
+    syncing was used) are taken as unchanged rather than re-embedded. Only
+    corpus files whose source URI lies under prefix_uri can be removed.
+
+    Returns:
+        A dictionary with new, changed, removed and unchanged URI lists and
+        file_ids, mapping each URI in the corpus to its file IDs
+    """
+    file_ids: Dict[str, List[str]] = {}
+    for corpus_file in corpus_files:
+        if corpus_file.get("source_uri"):
+            file_ids.setdefault(corpus_file["source_uri"], []).append(corpus_file["id"])
+
+    new, changed, unchanged = [], [], []
+    for gcs_object in gcs_objects:
+        uri = gcs_object["uri"]
+        recorded = manifest.get(uri)
+        if uri not in file_ids:
+            new.append(uri)
+        elif recorded is not None and (
+            recorded.get("generation") != gcs_object.get("generation")
+            or recorded.get("md5_hash") != gcs_object.get("md5_hash")
+        ):
+            changed.append(uri)
+        else:
+            unchanged.append(uri)
+
+    present = {gcs_object["uri"] for gcs_object in gcs_objects}
+    removed = sorted(uri for uri in file_ids if uri.startswith(prefix_uri) and uri not in present)
+    return {
+        "new": new,
+        "changed": changed,
+        "removed": removed,
+        "unchanged": unchanged,
+        "file_ids": file_ids
+    }
+
+
+def run_sync(
+    corpus_id: str,
+    prefix_uri: str,
+    gcs_objects: List[Dict[str, Any]],
+    corpus_files: List[Dict[str, Any]],
+    manifest_path: str,
+    import_batch: Callable[[List[str]], Dict[str, int]],
+    delete_file: Callable[[str], None],
+    batch_size: int,
+    max_concurrency: int,
+    max_retries: int,
+    delete_removed: bool = True,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Brings a corpus in line with the objects under a GCS prefix.
+
+    Changed files are deleted and re-imported; removed files are deleted
+    when delete_removed is set. If the prefix lists no objects at all while
+    the corpus has files under it, nothing is deleted, since an empty listing
+    is far more likely a wrong prefix or a permissions problem than a
+    deliberately emptied bucket. The manifest is rewritten with the objects
+    that are now in the corpus.
+
+    Returns:
+        Diff summary: new, changed, removed and unchanged counts and URIs,
+        plus failed URIs with their errors and any warnings
+    """
+    manifest = load_sync_manifest(manifest_path, corpus_id)
+    diff = compute_sync_diff(gcs_objects, corpus_files, manifest, prefix_uri)
+    file_ids = diff.pop("file_ids")
+    warnings = []
+
+    to_delete = list(diff["changed"])
+    if delete_removed and diff["removed"]:
+        if gcs_objects:
+            to_delete.extend(diff["removed"])
+        else:
+            warnings.append(f"{prefix_uri} lists no objects; kept the {len(diff['removed'])} files it would have removed")
+    elif diff["removed"]:
+        warnings.append(f"Kept {len(diff['removed'])} files whose objects were removed (delete_removed is off)")
+
+    summary = {
+        "dry_run": dry_run,
+        **{f"{kind}_count": len(uris) for kind, uris in diff.items()},
+        **{kind: uris for kind, uris in diff.items() if kind != "unchanged"},
+        "deleted": 0,
+        "imported": 0,
+        "failed_uris": {},
+        "warnings": warnings
+    }
+    if dry_run or not gcs_objects:
+        # An empty listing leaves the corpus and the manifest as they are
+        return summary
+
+    failed: Dict[str, str] = {}
+    deleted = set()
+    for uri in to_delete:
+        try:
+            for file_id in file_ids[uri]:
+                delete_file(file_id)
+            deleted.add(uri)
+        except Exception as e:
+            failed[uri] = f"Delete failed: {str(e)}"
+    summary["deleted"] = len(deleted)
+
+    # Changed files are re-imported only once their old copy is gone
+    to_import = diff["new"] + [uri for uri in diff["changed"] if uri in deleted]
+    checkpoint = ImportCheckpoint(None, corpus_id)
+    import_summary = run_bulk_import(
+        import_batch=import_batch,
+        uris=to_import,
+        checkpoint=checkpoint,
+        batch_size=batch_size,
+        max_concurrency=max_concurrency,
+        max_retries=max_retries
+    )
+    summary["imported"] = import_summary["imported"] + import_summary["skipped"]
+    failed.update(import_summary["failed_uris"])
+    summary["failed_uris"] = failed
+
+    # Record what the corpus now holds. Failed objects keep their previous
+    # entry (or stay unrecorded) so the next run picks them up again.
+    synced = {}
+    for gcs_object in gcs_objects:
+        uri = gcs_object["uri"]
+        if uri in failed:
+            if uri in manifest:
+                synced[uri] = manifest[uri]
+        elif uri in checkpoint.completed or uri not in to_import:
+            synced[uri] = {"generation": gcs_object.get("generation"), "md5_hash": gcs_object.get("md5_hash")}
+    write_json_atomic(manifest_path, {
+        "corpus_id": corpus_id,
+        "prefix": prefix_uri,
+        "synced_at": time.time(),
+        "files": synced
+    })
+    return summary
@@ -1,6 +1,9 @@
 """
 RAG Corpus Management Tools for Vertex AI using ADK function tools pattern.
 
+All tools go through the configured retrieval backend (see backends/), which
+is Vertex AI RAG Engine by default or an in-process local index.
+
 RAG Corpus Management:
 1. Create a new RAG corpus
 2. Update an existing RAG corpus
@@ -9,29 +12,193 @@ RAG Corpus Management:
 5. Delete a RAG corpus
 
 RAG File Management (within a corpus):
-6. Upload RAG files
+6. Upload RAG files (one at a time, in bulk from a GCS prefix or manifest, or
+   incrementally by syncing a corpus with a GCS prefix)
 7. List RAG files
 8. Get RAG file details
 9. Delete RAG files
 10. Query RAG files
+
+Queries run in one of three search modes: "vector" (embedding similarity),
+"keyword" (BM25) or "hybrid" (both, fused with reciprocal rank fusion).
 """
 
-import vertexai
-from vertexai.preview import rag
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+
 from google.adk.tools import FunctionTool
-from typing import Dict, Optional, Any
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Any, Tuple
 from ..config import (
-    PROJECT_ID,
-    LOCATION,
     RAG_DEFAULT_EMBEDDING_MODEL,
     RAG_DEFAULT_TOP_K,
     RAG_DEFAULT_SEARCH_TOP_K,
     RAG_DEFAULT_VECTOR_DISTANCE_THRESHOLD,
-    RAG_DEFAULT_PAGE_SIZE
+    RAG_DEFAULT_PAGE_SIZE,
+    RAG_LIST_FILES_MAX_RESULTS,
+    RAG_IMPORT_BATCH_SIZE,
+    RAG_IMPORT_MAX_CONCURRENCY,
+    RAG_IMPORT_MAX_RETRIES,
+    RAG_IMPORT_CHECKPOINT_DIR,
+    RAG_SYNC_LOCK_STALE_SECONDS,
+    RAG_DEFAULT_SEARCH_MODE,
+    RAG_HYBRID_CANDIDATE_MULTIPLIER,
+    RAG_HYBRID_RRF_K,
+    RAG_SEARCH_MAX_WORKERS,
+    RAG_SEARCH_PER_CORPUS_TIMEOUT,
+    RAG_SEARCH_DEADLINE,
+    RAG_SEARCH_BATCHED,
+    RAG_SEARCH_BATCH_SIZE,
+    RAG_SEARCH_MAX_RESULTS,
+    RAG_SEARCH_SCORE_NORMALIZATION,
+    RAG_SEARCH_ROUTING,
+    RAG_SEARCH_COLLAPSE_DUPLICATES,
+    RAG_SEARCH_DUPLICATE_THRESHOLD,
+    RAG_SEARCH_RESPONSE_FORMAT,
+    RAG_SEARCH_MAX_CHUNK_TOKENS,
+    RAG_CATALOG_TTL_SECONDS,
+    RAG_CATALOG_FILE_COUNT_TTL_SECONDS,
+    RAG_RETRIEVAL_CACHE_MAX_ENTRIES,
+    RAG_RETRIEVAL_CACHE_MAX_BYTES,
+    RAG_RETRIEVAL_CACHE_TTL_SECONDS,
+    RAG_SEMANTIC_CACHE_MAX_ENTRIES,
+    RAG_SEMANTIC_CACHE_THRESHOLD,
+    RAG_SEMANTIC_CACHE_TTL_SECONDS,
+    RAG_RETRY_MAX_ATTEMPTS,
+    RAG_RETRY_BASE_DELAY,
+    RAG_RETRY_MAX_DELAY,
+    RAG_RETRY_BUDGET_RATIO,
+    RAG_HEDGE_ENABLED,
+    RAG_HEDGE_PERCENTILE,
+    RAG_HEDGE_MIN_SAMPLES,
+    RAG_BREAKER_ENABLED,
+    RAG_BREAKER_WINDOW_SIZE,
+    RAG_BREAKER_MIN_CALLS,
+    RAG_BREAKER_FAILURE_RATE,
+    RAG_BREAKER_SLOW_CALL_SECONDS,
+    RAG_BREAKER_OPEN_SECONDS,
+    RAG_BREAKER_HALF_OPEN_PROBES
+)
+from .backends import RetrievalBackend, get_backend, set_backend
+from .circuit_breaker import CircuitBreakerRegistry
+from .bulk_import import (
+    ImportCheckpoint,
+    default_checkpoint_path,
+    list_gcs_objects,
+    list_gcs_uris,
+    read_manifest,
+    run_bulk_import
+)
+from .corpus_catalog import CorpusCatalog
+from .corpus_sync import SyncInProgressError, SyncLock, run_sync
+from .file_pager import count_items, iter_items, iter_pages
+from .corpus_router import CorpusRouterCache
+from .lexical_index import rank_by_bm25, reciprocal_rank_fusion
+from .near_duplicates import collapse_near_duplicates
+from .response_format import RESPONSE_FORMATS, compact_search_response
+from .result_merge import SCORE_NORMALIZATIONS, TopKMerger
+from .rate_limiter import RateLimitTimeout, rate_limiters
+from .retrieval_cache import RetrievalCache, make_retrieval_key, normalize_query
+from .retry_policy import RetrievalPolicy
+from .single_flight import SingleFlight
+from .tool_executor import ExecutorFunctionTool, get_tool_executor_stats
+
+# Shared worker pool for search_all_corpora fan-out. It is process-wide so that
+# concurrent searches stay bounded. Deadlines only stop a search waiting: a
+# running corpus query cannot be cancelled, so each query passes its remaining
+# time to the backend call, and retries stop there, to free its thread.
+_search_executor: Optional[ThreadPoolExecutor] = None
+_search_executor_lock = threading.Lock()
+
+
+def _get_search_executor() -> ThreadPoolExecutor:
+    """Returns the shared corpus search pool, creating it on first use."""
+    global _search_executor
+    with _search_executor_lock:
+        if _search_executor is None:
+            _search_executor = ThreadPoolExecutor(
+                max_workers=RAG_SEARCH_MAX_WORKERS,
+                thread_name_prefix="rag-search"
+            )
+        return _search_executor
+
+
+# Shared cache of single-corpus retrieval results, invalidated per corpus
+# whenever that corpus's files change
+retrieval_cache = RetrievalCache(
+    max_entries=RAG_RETRIEVAL_CACHE_MAX_ENTRIES,
+    max_bytes=RAG_RETRIEVAL_CACHE_MAX_BYTES,
+    ttl_seconds=RAG_RETRIEVAL_CACHE_TTL_SECONDS
+)
+
+# Semantic cache of search_all_corpora responses, created on first use since
+# it needs NumPy
+_semantic_cache: Optional[Any] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[Any]:
+    """Returns the shared SemanticQueryCache, or None when it is disabled."""
+    global _semantic_cache
+    if RAG_SEMANTIC_CACHE_MAX_ENTRIES <= 0:
+        return None
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            from .semantic_cache import SemanticQueryCache
+
+            _semantic_cache = SemanticQueryCache(
+                similarity_threshold=RAG_SEMANTIC_CACHE_THRESHOLD,
+                max_entries=RAG_SEMANTIC_CACHE_MAX_ENTRIES,
+                ttl_seconds=RAG_SEMANTIC_CACHE_TTL_SECONDS
+            )
+        return _semantic_cache
+
+
+def _invalidate_results(corpus_id: str) -> None:
+    """Drops cached results that a change to a corpus's files makes stale."""
+    retrieval_cache.invalidate_corpus(corpus_id)
+    # Any cached search may have covered the corpus
+    if _semantic_cache is not None:
+        _semantic_cache.clear()
+
+# Retries of transient retrieval errors and optional hedging of slow calls
+retrieval_policy = RetrievalPolicy(
+    max_attempts=RAG_RETRY_MAX_ATTEMPTS,
+    base_delay=RAG_RETRY_BASE_DELAY,
+    max_delay=RAG_RETRY_MAX_DELAY,
+    retry_budget_ratio=RAG_RETRY_BUDGET_RATIO,
+    hedge=RAG_HEDGE_ENABLED,
+    hedge_percentile=RAG_HEDGE_PERCENTILE,
+    hedge_min_samples=RAG_HEDGE_MIN_SAMPLES,
+    max_workers=RAG_SEARCH_MAX_WORKERS * 2
+)
+
+# Per-corpus health: searches skip corpora whose retrievals keep failing
+corpus_breakers = CircuitBreakerRegistry(
+    enabled=RAG_BREAKER_ENABLED,
+    window_size=RAG_BREAKER_WINDOW_SIZE,
+    min_calls=RAG_BREAKER_MIN_CALLS,
+    failure_rate=RAG_BREAKER_FAILURE_RATE,
+    slow_call_seconds=RAG_BREAKER_SLOW_CALL_SECONDS,
+    open_seconds=RAG_BREAKER_OPEN_SECONDS,
+    half_open_probes=RAG_BREAKER_HALF_OPEN_PROBES
 )
 
-# Initialize Vertex AI API
-vertexai.init(project=PROJECT_ID, location=LOCATION)
+# Identical queries that arrive while the first is still running wait for
+# its result instead of making their own upstream call
+query_flights = SingleFlight()
+search_flights = SingleFlight()
+
+
+def _echo_query(response: Dict[str, Any], query_text: str) -> Dict[str, Any]:
+    """Rewrites a shared response to echo this caller's query text."""
+    shared_query = response.get("query")
+    if shared_query is not None and shared_query != query_text:
+        response["query"] = query_text
+        response["message"] = response["message"].replace(f"'{shared_query}'", f"'{query_text}'")
+    return response
 
 
 def create_rag_corpus(
@@ -40,7 +207,7 @@ def create_rag_corpus(
     embedding_model: Optional[str] = None
 ) -> Dict[str, Any]:
     """
-    Creates a new RAG corpus in Vertex AI.
+    Creates a new RAG corpus in the retrieval backend.
     
     Args:
         display_name: A human-readable name for the corpus
@@ -58,26 +225,19 @@ def create_rag_corpus(
     if embedding_model is None:
         embedding_model = RAG_DEFAULT_EMBEDDING_MODEL
     try:
-        # Configure embedding model
-        embedding_model_config = rag.EmbeddingModelConfig(
-            publisher_model=f"publishers/google/models/{embedding_model}"
-        )
-        
         # Create the corpus
-        corpus = rag.create_corpus(
+        corpus = get_backend().create_corpus(
             display_name=display_name,
             description=description or f"RAG corpus: {display_name}",
-            embedding_model_config=embedding_model_config,
+            embedding_model=embedding_model
         )
-        
-        # Extract corpus ID from the full name
-        corpus_id = corpus.name.split('/')[-1]
+        corpus_catalog.invalidate()
         
         return {
             "status": "success",
-            "corpus_name": corpus.name,
-            "corpus_id": corpus_id,
-            "display_name": corpus.display_name,
+            "corpus_name": corpus["name"],
+            "corpus_id": corpus["id"],
+            "display_name": corpus["display_name"],
             "message": f"Successfully created RAG corpus '{display_name}'"
         }
     except Exception as e:
@@ -111,30 +271,20 @@ def update_rag_corpus(
         - error_message: Present only if an error occurred
     """
     try:
-        # Construct full corpus name
-        corpus_name = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}"
-        
-        # Get the existing corpus
-        corpus = rag.get_corpus(name=corpus_name)
-        
         # Update fields if provided
-        if display_name:
-            corpus.display_name = display_name
-        if description:
-            corpus.description = description
-        
-        # Apply updates
-        updated_corpus = rag.update_corpus(
-            corpus=corpus,
-            update_mask=["display_name", "description"]
+        updated_corpus = get_backend().update_corpus(
+            corpus_id=corpus_id,
+            display_name=display_name,
+            description=description
         )
+        corpus_catalog.invalidate()
         
         return {
             "status": "success",
-            "corpus_name": updated_corpus.name,
+            "corpus_name": updated_corpus["name"],
             "corpus_id": corpus_id,
-            "display_name": updated_corpus.display_name,
-            "description": updated_corpus.description,
+            "display_name": updated_corpus["display_name"],
+            "description": updated_corpus["description"],
             "message": f"Successfully updated RAG corpus '{corpus_id}'"
         }
     except Exception as e:
@@ -146,10 +296,37 @@ def update_rag_corpus(
         }
 
 
-def list_rag_corpora() -> Dict[str, Any]:
+def _fetch_corpus_catalog() -> List[Dict[str, Any]]:
+    """Fetches the corpus list from the backend without counting files."""
+    return get_backend().list_corpora()
+
+
+def _count_corpus_files(corpus_id: str) -> int:
+    """Counts the files of a corpus, prefetching pages and keeping none of them."""
+    return count_items(_corpus_page_fetcher(corpus_id, RAG_DEFAULT_PAGE_SIZE))
+
+
+# Shared corpus catalog; write tools below invalidate it when corpora change
+corpus_catalog = CorpusCatalog(
+    fetch_corpora=_fetch_corpus_catalog,
+    count_files=_count_corpus_files,
+    ttl_seconds=RAG_CATALOG_TTL_SECONDS,
+    file_count_ttl_seconds=RAG_CATALOG_FILE_COUNT_TTL_SECONDS
+)
+
+
+def list_rag_corpora(refresh_file_counts: bool = False) -> Dict[str, Any]:
     """
     Lists all RAG corpora in the current project and location.
     
+    The corpus list comes from a shared catalog cache. File counts are served
+    from cache and refreshed in the background; a count that has never been
+    computed is reported as None until the refresh completes.
+    
+    Args:
+        refresh_file_counts: Count files for every corpus now instead of using
+            cached counts (the corpora are counted concurrently)
+    
     Returns:
         A dictionary containing the list of corpora:
         - status: "success" or "error"
@@ -158,40 +335,24 @@ def list_rag_corpora() -> Dict[str, Any]:
         - error_message: Present only if an error occurred
     """
     try:
-        corpora = rag.list_corpora()
+        corpus_list = corpus_catalog.get_corpora()
         
-        corpus_list = []
-        for corpus in corpora:
-            corpus_id = corpus.name.split('/')[-1]
-            
-            # Get corpus status
-            status = None
-            if hasattr(corpus, "corpus_status") and hasattr(corpus.corpus_status, "state"):
-                status = corpus.corpus_status.state
-            elif hasattr(corpus, "corpusStatus") and hasattr(corpus.corpusStatus, "state"):
-                status = corpus.corpusStatus.state
-            
-            # Make an explicit API call to count files
-            files_count = 0
-            try:
-                # List all files to get the count
-                files_response = rag.list_files(corpus_name=corpus.name)
-                
-                if hasattr(files_response, "rag_files"):
-                    files_count = len(files_response.rag_files)
-            except Exception:
-                # If counting files fails, continue with zero count
-                pass
+        if refresh_file_counts and corpus_list:
+            def count_files(corpus_id: str) -> int:
+                try:
+                    return corpus_catalog.refresh_file_count(corpus_id)
+                except Exception:
+                    # If counting files fails, continue with zero count
+                    return 0
             
-            corpus_list.append({
-                "id": corpus_id,
-                "name": corpus.name,
-                "display_name": corpus.display_name,
-                "description": corpus.description if hasattr(corpus, "description") else None,
-                "create_time": str(corpus.create_time) if hasattr(corpus, "create_time") else None,
-                "files_count": files_count,
-                "status": status
-            })
+            workers = min(len(corpus_list), RAG_SEARCH_MAX_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rag-count") as executor:
+                counts = list(executor.map(count_files, [corpus["id"] for corpus in corpus_list]))
+            for corpus, files_count in zip(corpus_list, counts):
+                corpus["files_count"] = files_count
+        else:
+            for corpus in corpus_list:
+                corpus["files_count"] = corpus_catalog.get_file_count(corpus["id"])
         
         return {
             "status": "success",
@@ -222,27 +383,14 @@ def get_rag_corpus(corpus_id: str) -> Dict[str, Any]:
         - error_message: Present only if an error occurred
     """
     try:
-        # Construct full corpus name
-        corpus_name = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}"
-        
         # Get the corpus
-        corpus = rag.get_corpus(name=corpus_name)
-        
-        # Get corpus status
-        status = None
-        if hasattr(corpus, "corpus_status") and hasattr(corpus.corpus_status, "state"):
-            status = corpus.corpus_status.state
-        elif hasattr(corpus, "corpusStatus") and hasattr(corpus.corpusStatus, "state"):
-            status = corpus.corpusStatus.state
+        corpus = get_backend().get_corpus(corpus_id)
         
         # Make an explicit API call to count files
         files_count = 0
         try:
-            # List all files to get the count
-            files_response = rag.list_files(corpus_name=corpus_name)
-            
-            if hasattr(files_response, "rag_files"):
-                files_count = len(files_response.rag_files)
+            # Walk the file pages to get the count
+            files_count = corpus_catalog.refresh_file_count(corpus_id)
         except Exception as file_error:
             # If counting files fails, log but continue with zero count
             print(f"Warning: Could not count files: {str(file_error)}")
@@ -250,24 +398,18 @@ def get_rag_corpus(corpus_id: str) -> Dict[str, Any]:
         # Extract basic information
         corpus_details = {
             "id": corpus_id,
-            "name": corpus.name,
-            "display_name": corpus.display_name,
-            "description": corpus.description if hasattr(corpus, "description") else None,
-            "create_time": str(corpus.create_time) if hasattr(corpus, "create_time") else None,
-            "update_time": str(corpus.update_time) if hasattr(corpus, "update_time") else None,
+            "name": corpus["name"],
+            "display_name": corpus["display_name"],
+            "description": corpus["description"],
+            "create_time": corpus["create_time"],
+            "update_time": corpus["update_time"],
             "files_count": files_count,
-            "state": status
+            "state": corpus["status"]
         }
         
         # Include raw API response data for transparency
-        raw_data = {}
-        if hasattr(corpus, "to_dict"):
-            raw_data = corpus.to_dict()
-        elif hasattr(corpus, "__dict__"):
-            raw_data = {k: v for k, v in corpus.__dict__.items() if not k.startswith('_')}
-        
-        if raw_data:
-            corpus_details["raw_api_data"] = raw_data
+        if corpus.get("raw_api_data"):
+            corpus_details["raw_api_data"] = corpus["raw_api_data"]
         
         return {
             "status": "success",
@@ -298,11 +440,11 @@ def delete_rag_corpus(corpus_id: str) -> Dict[str, Any]:
         - error_message: Present only if an error occurred
     """
     try:
-        # Construct full corpus name
-        corpus_name = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}"
-        
         # Delete the corpus
-        rag.delete_corpus(name=corpus_name)
+        get_backend().delete_corpus(corpus_id)
+        corpus_catalog.remove(corpus_id)
+        _invalidate_results(corpus_id)
+        corpus_breakers.forget(corpus_id)
         
         return {
             "status": "success",
@@ -338,15 +480,13 @@ def import_document_to_corpus(
         - message: Status message
     """
     try:
-        # Construct full corpus name
-        corpus_name = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}"
-        
         # Import document with minimal configuration
-        # Use the most basic form of the API call to avoid parameter issues
-        result = rag.import_files(
-            corpus_name,
+        get_backend().import_files(
+            corpus_id,
             [gcs_uri]  # Single path in a list
         )
+        corpus_catalog.invalidate_file_count(corpus_id)
+        _invalidate_results(corpus_id)
         
         # Return success result
         return {
@@ -362,26 +502,228 @@ def import_document_to_corpus(
             "message": f"Failed to import document: {str(e)}"
         }
 
+def bulk_import_documents_to_corpus(
+    corpus_id: str,
+    gcs_prefix: Optional[str] = None,
+    manifest_uri: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    checkpoint_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Imports many documents into a RAG corpus, e.g. a full textbook set.
+    
+    Documents are imported in batches with several batches in flight, and
+    progress is saved to a local checkpoint file after every batch. Calling
+    the tool again with the same source resumes the import: documents that
+    were already imported are skipped and only the rest are sent.
+    
+    Args:
+        corpus_id: The ID of the corpus to import the documents into
+        gcs_prefix: Import every file under this GCS prefix
+            (gs://bucket-name/folder/)
+        manifest_uri: Local path or gs:// URI of a manifest listing document
+            URIs (one per line, or a JSON list); used instead of gcs_prefix
+        batch_size: Documents per import call (default: 25)
+        max_concurrency: Import calls running at once (default: 2)
+        checkpoint_path: Progress file (default: derived from the corpus and
+            source under the checkpoint directory)
+    
+    Returns:
+        A dictionary containing:
+        - status: "success", "partial" (some documents failed) or "error"
+        - corpus_id: The ID of the corpus
+        - total, already_completed, imported, skipped: Document counts
+        - failed: Documents in batches that failed and will be retried
+        - failed_uris: Failed documents with their errors (first 20)
+        - checkpoint_path: Where progress is recorded
+    """
+    if batch_size is None:
+        batch_size = RAG_IMPORT_BATCH_SIZE
+    if max_concurrency is None:
+        max_concurrency = RAG_IMPORT_MAX_CONCURRENCY
+    if bool(gcs_prefix) == bool(manifest_uri):
+        return {
+            "status": "error",
+            "corpus_id": corpus_id,
+            "error_message": "Exactly one of gcs_prefix and manifest_uri is required",
+            "message": "Failed to import documents: give either a GCS prefix or a manifest"
+        }
+    source = gcs_prefix or manifest_uri
+    if checkpoint_path is None:
+        checkpoint_path = default_checkpoint_path(RAG_IMPORT_CHECKPOINT_DIR, corpus_id, source)
+    try:
+        uris = list_gcs_uris(gcs_prefix) if gcs_prefix else read_manifest(manifest_uri)
+        checkpoint = ImportCheckpoint(checkpoint_path, corpus_id)
+        summary = run_bulk_import(
+            import_batch=partial(get_backend().import_files, corpus_id),
+            uris=uris,
+            checkpoint=checkpoint,
+            batch_size=batch_size,
+            max_concurrency=max_concurrency,
+            max_retries=RAG_IMPORT_MAX_RETRIES
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "corpus_id": corpus_id,
+            "checkpoint_path": checkpoint_path,
+            "error_message": str(e),
+            "message": f"Failed to import documents: {str(e)}"
+        }
+    finally:
+        # Even an interrupted import may have added files
+        corpus_catalog.invalidate_file_count(corpus_id)
+        _invalidate_results(corpus_id)
+    
+    failed_uris = summary.pop("failed_uris")
+    return {
+        "status": "partial" if failed_uris else "success",
+        "corpus_id": corpus_id,
+        **summary,
+        "failed_uris": dict(list(failed_uris.items())[:20]),
+        "checkpoint_path": checkpoint_path,
+        "message": f"Imported {summary['imported']} of {summary['total']} documents from {source} into corpus '{corpus_id}'"
+                   + (f", {summary['skipped']} already in the corpus" if summary["skipped"] else "")
+                   + (f" ({summary['already_completed']} already imported earlier)" if summary["already_completed"] else "")
+                   + (f"; {summary['failed']} documents are in failed batches, run again to retry them" if failed_uris else "")
+    }
+
+def iter_rag_files(
+    corpus_id: str,
+    page_size: Optional[int] = None,
+    page_token: Optional[str] = None,
+    prefetch: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yields every file of a corpus across all pages, fetching the next
+    page in the background while the current one is consumed. At most two
+    pages are held in memory.
+    """
+    if page_size is None:
+        page_size = RAG_DEFAULT_PAGE_SIZE
+    return iter_items(_corpus_page_fetcher(corpus_id, page_size), page_token=page_token, prefetch=prefetch)
+
+
+def _corpus_page_fetcher(corpus_id: str, page_size: int):
+    backend = get_backend()
+    return lambda page_token: backend.list_files(corpus_id, page_size=page_size, page_token=page_token)
+
+
+def _list_all_corpus_files(corpus_id: str) -> List[Dict[str, Any]]:
+    """Lists every file of a corpus, following page tokens."""
+    return list(iter_rag_files(corpus_id))
+
+
+def sync_corpus_with_gcs(
+    corpus_id: str,
+    gcs_prefix: str,
+    delete_removed: bool = True,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Re-indexes a corpus incrementally from a GCS prefix.
+    
+    Only new or changed files (by GCS generation and MD5, compared with the
+    last sync) are imported, and files whose objects were removed from the
+    prefix are deleted from the corpus. Unchanged files are not re-embedded.
+    Safe to run on a schedule: overlapping runs of the same sync are
+    refused, and a failed run is completed by the next one.
+    
+    Args:
+        corpus_id: The ID of the corpus to sync
+        gcs_prefix: GCS prefix holding the documents (gs://bucket-name/folder/)
+        delete_removed: Delete corpus files whose objects no longer exist
+            (default: True)
+        dry_run: Only report what would change (default: False)
+    
+    Returns:
+        A dictionary containing:
+        - status: "success", "partial" (some files failed), "skipped" (another
+          sync is running) or "error"
+        - corpus_id: The ID of the corpus
+        - new_count, changed_count, removed_count, unchanged_count: Diff sizes
+        - new, changed, removed: The URIs in each part of the diff
+        - imported, deleted: Files imported and deleted by this run
+        - failed_uris: Failed files with their errors
+        - warnings: Anything the sync refused to do
+    """
+    manifest_path = default_checkpoint_path(RAG_IMPORT_CHECKPOINT_DIR, corpus_id, gcs_prefix, suffix=".sync.json")
+    backend = get_backend()
+    try:
+        with SyncLock(manifest_path + ".lock", RAG_SYNC_LOCK_STALE_SECONDS):
+            summary = run_sync(
+                corpus_id=corpus_id,
+                prefix_uri=gcs_prefix,
+                gcs_objects=list_gcs_objects(gcs_prefix),
+                corpus_files=_list_all_corpus_files(corpus_id),
+                manifest_path=manifest_path,
+                import_batch=partial(backend.import_files, corpus_id),
+                delete_file=partial(backend.delete_file, corpus_id),
+                batch_size=RAG_IMPORT_BATCH_SIZE,
+                max_concurrency=RAG_IMPORT_MAX_CONCURRENCY,
+                max_retries=RAG_IMPORT_MAX_RETRIES,
+                delete_removed=delete_removed,
+                dry_run=dry_run
+            )
+    except SyncInProgressError as e:
+        return {
+            "status": "skipped",
+            "corpus_id": corpus_id,
+            "message": f"Sync not started: {str(e)}"
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "corpus_id": corpus_id,
+            "error_message": str(e),
+            "message": f"Failed to sync corpus: {str(e)}"
+        }
+    finally:
+        if not dry_run:
+            corpus_catalog.invalidate_file_count(corpus_id)
+            _invalidate_results(corpus_id)
+    
+    diff_text = (
+        f"{summary['new_count']} new, {summary['changed_count']} changed, "
+        f"{summary['removed_count']} removed, {summary['unchanged_count']} unchanged"
+    )
+    return {
+        "status": "partial" if summary["failed_uris"] else "success",
+        "corpus_id": corpus_id,
+        **summary,
+        "message": (f"Dry run of sync from {gcs_prefix}: {diff_text}" if dry_run else
+                    f"Synced corpus '{corpus_id}' from {gcs_prefix}: {diff_text}; "
+                    f"imported {summary['imported']}, deleted {summary['deleted']}"
+                    + (f", {len(summary['failed_uris'])} failed" if summary["failed_uris"] else ""))
+    }
+
 # RAG File Management Functions
 
 def list_rag_files(
     corpus_id: str,
     page_size: Optional[int] = None,
-    page_token: Optional[str] = None
+    page_token: Optional[str] = None,
+    all_pages: bool = False,
+    count_only: bool = False
 ) -> Dict[str, Any]:
     """
     Lists all RAG files in a corpus.
     
     Args:
         corpus_id: The ID of the corpus to list files from
-        page_size: Maximum number of files to return (default: 50)
+        page_size: Maximum number of files to return per page (default: 50)
         page_token: Token for pagination
+        all_pages: Follow page tokens and return the files of every page, up
+            to 1000 files, in one call (default: False)
+        count_only: Only count the files, without returning them
+            (default: False)
     
     Returns:
         A dictionary containing the list of files:
         - status: "success" or "error"
         - corpus_id: The ID of the corpus
-        - files: List of file objects
+        - files: List of file objects (omitted with count_only)
         - count: Number of files found
         - next_page_token: Token for the next page (if any)
         - error_message: Present only if an error occurred
@@ -389,37 +731,41 @@ def list_rag_files(
     if page_size is None:
         page_size = RAG_DEFAULT_PAGE_SIZE
     try:
-        # Construct full corpus name
-        corpus_name = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}"
-        
-        # List files
-        response = rag.list_files(
-            corpus_name=corpus_name,
-            page_size=page_size, 
-            page_token=page_token
-        )
+        if count_only:
+            # Pages are fetched ahead and dropped once counted
+            files_count = count_items(_corpus_page_fetcher(corpus_id, page_size))
+            return {
+                "status": "success",
+                "corpus_id": corpus_id,
+                "count": files_count,
+                "message": f"Corpus '{corpus_id}' has {files_count} file(s)"
+            }
         
-        # Process files
-        files = []
-        for file in response.rag_files:
-            file_id = file.name.split("/")[-1]
-            files.append({
-                "id": file_id,
-                "name": file.name,
-                "display_name": file.display_name if hasattr(file, "display_name") else None,
-                "description": file.description if hasattr(file, "description") else None,
-                "source_uri": file.source_uri if hasattr(file, "source_uri") else None,
-                "create_time": str(file.create_time) if hasattr(file, "create_time") else None,
-                "update_time": str(file.update_time) if hasattr(file, "update_time") else None
-            })
+        if all_pages:
+            # Walk pages with prefetching, stopping at a page boundary once
+            # the result cap is reached so next_page_token can resume there
+            files = []
+            next_page_token = None
+            for page, next_page_token in iter_pages(_corpus_page_fetcher(corpus_id, page_size), page_token=page_token):
+                files.extend(page)
+                if len(files) >= RAG_LIST_FILES_MAX_RESULTS:
+                    break
+        else:
+            # List files
+            files, next_page_token = get_backend().list_files(
+                corpus_id,
+                page_size=page_size,
+                page_token=page_token
+            )
         
         return {
             "status": "success",
             "corpus_id": corpus_id,
             "files": files,
             "count": len(files),
-            "next_page_token": response.next_page_token if hasattr(response, "next_page_token") else None,
+            "next_page_token": next_page_token,
             "message": f"Found {len(files)} file(s) in corpus '{corpus_id}'"
+                       + (" (more available with next_page_token)" if next_page_token else "")
         }
     except Exception as e:
         return {
@@ -448,32 +794,8 @@ def get_rag_file(
         - error_message: Present only if an error occurred
     """
     try:
-        # Construct full file name
-        file_name = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}/ragFiles/{file_id}"
-        
-        # Get the file
-        file = rag.get_file(name=file_name)
-        
-        # Extract file details
-        file_details = {
-            "id": file_id,
-            "name": file.name,
-            "display_name": file.display_name if hasattr(file, "display_name") else None,
-            "description": file.description if hasattr(file, "description") else None,
-            "source_uri": file.source_uri if hasattr(file, "source_uri") else None,
-            "create_time": str(file.create_time) if hasattr(file, "create_time") else None,
-            "update_time": str(file.update_time) if hasattr(file, "update_time") else None
-        }
-        
-        # Include raw API response data for transparency
-        raw_data = {}
-        if hasattr(file, "to_dict"):
-            raw_data = file.to_dict()
-        elif hasattr(file, "__dict__"):
-            raw_data = {k: v for k, v in file.__dict__.items() if not k.startswith('_')}
-        
-        if raw_data:
-            file_details["raw_api_data"] = raw_data
+        # Get the file, including raw API response data for transparency
+        file_details = get_backend().get_file(corpus_id, file_id)
         
         return {
             "status": "success",
@@ -509,11 +831,10 @@ def delete_rag_file(
         - error_message: Present only if an error occurred
     """
     try:
-        # Construct full file name
-        file_name = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}/ragFiles/{file_id}"
-        
         # Delete the file
-        rag.delete_file(name=file_name)
+        get_backend().delete_file(corpus_id, file_id)
+        corpus_catalog.invalidate_file_count(corpus_id)
+        _invalidate_results(corpus_id)
         
         return {
             "status": "success",
@@ -530,21 +851,113 @@ def delete_rag_file(
             "message": f"Failed to delete file: {str(e)}"
         }
 
+def _make_query_response(corpus_id: str, query_text: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Builds the query_rag_corpus success response for a list of results."""
+    # Attribution is implied by the response's corpus_id
+    for result in results:
+        result.pop("corpus_id", None)
+    return {
+        "status": "success",
+        "corpus_id": corpus_id,
+        "results": results,
+        "count": len(results),
+        "query": query_text,
+        "message": f"Found {len(results)} results for query: '{query_text}'"
+    }
+
+SEARCH_MODES = ("vector", "keyword", "hybrid")
+
+
+def _invalid_search_mode_error(search_mode: str) -> Dict[str, Any]:
+    """Builds the error response for an unknown search mode."""
+    return {
+        "status": "error",
+        "error_message": f"Unknown search mode '{search_mode}'",
+        "message": f"Invalid search_mode '{search_mode}'; use one of: {', '.join(SEARCH_MODES)}"
+    }
+
+
+def _time_left(deadline_at: Optional[float]) -> Optional[float]:
+    """Returns the seconds until a time.monotonic() deadline, or None without one."""
+    return None if deadline_at is None else max(0.0, deadline_at - time.monotonic())
+
+
+def _retrieve_from_corpus(
+    corpus_id: str,
+    query_text: str,
+    top_k: int,
+    vector_distance_threshold: float,
+    search_mode: str,
+    deadline_at: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Retrieves the top_k results of one corpus in the given search mode.
+    
+    Keyword ranking uses the backend's own BM25 index when it has one, and
+    otherwise re-ranks a larger pool of vector candidates by BM25, so exact
+    terms can still lift chunks that embeddings ranked lower.
+    """
+    backend = get_backend()
+    if search_mode == "vector":
+        return backend.retrieve(
+            corpus_ids=[corpus_id],
+            query_text=query_text,
+            top_k=top_k,
+            vector_distance_threshold=vector_distance_threshold,
+            timeout=_time_left(deadline_at)
+        )
+    
+    pool_size = top_k * max(1, RAG_HYBRID_CANDIDATE_MULTIPLIER)
+    vector_results = None
+    if search_mode == "hybrid" or not backend.supports_lexical:
+        vector_results = backend.retrieve(
+            corpus_ids=[corpus_id],
+            query_text=query_text,
+            top_k=pool_size,
+            vector_distance_threshold=vector_distance_threshold,
+            timeout=_time_left(deadline_at)
+        )
+    if backend.supports_lexical:
+        keyword_results = backend.lexical_retrieve(
+            corpus_ids=[corpus_id],
+            query_text=query_text,
+            top_k=pool_size
+        )
+    else:
+        keyword_results = rank_by_bm25(vector_results, query_text)
+    
+    if search_mode == "keyword":
+        return keyword_results[:top_k]
+    return reciprocal_rank_fusion(
+        {"vector": vector_results, "keyword": keyword_results},
+        top_k=top_k,
+        k=RAG_HYBRID_RRF_K
+    )
+
 # Function for simple direct corpus querying
 def query_rag_corpus(
     corpus_id: str,
     query_text: str,
     top_k: Optional[int] = None,
-    vector_distance_threshold: Optional[float] = None
+    vector_distance_threshold: Optional[float] = None,
+    search_mode: Optional[str] = None
 ) -> Dict[str, Any]:
     """
-    Directly queries a RAG corpus using the Vertex AI RAG API.
+    Directly queries a RAG corpus through the retrieval backend.
+    
+    Successful responses are served from the shared retrieval cache when the
+    same corpus, normalized query, top_k, threshold and search mode were
+    queried recently, and a query identical to one still running waits for
+    that query's response. Transient backend errors are retried with
+    jittered backoff, and slow calls can be hedged (see retry_policy.py).
     
     Args:
         corpus_id: The ID of the corpus to query
         query_text: The search query text
         top_k: Maximum number of results to return (default: 10)
         vector_distance_threshold: Threshold for vector similarity (default: 0.5)
+        search_mode: "vector", "keyword" (BM25, best for exact syllabus terms
+            and chapter names) or "hybrid" (both, fused) (default: "vector")
         
     Returns:
         A dictionary containing the query results
@@ -553,174 +966,743 @@ def query_rag_corpus(
         top_k = RAG_DEFAULT_TOP_K
     if vector_distance_threshold is None:
         vector_distance_threshold = RAG_DEFAULT_VECTOR_DISTANCE_THRESHOLD
+    if search_mode is None:
+        search_mode = RAG_DEFAULT_SEARCH_MODE
+    if search_mode not in SEARCH_MODES:
+        return dict(_invalid_search_mode_error(search_mode), corpus_id=corpus_id)
+    return _query_corpus(corpus_id, query_text, top_k, vector_distance_threshold, search_mode)
+
+
+def _query_corpus(
+    corpus_id: str,
+    query_text: str,
+    top_k: int,
+    vector_distance_threshold: float,
+    search_mode: str,
+    deadline_at: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Runs query_rag_corpus once its options are resolved and validated.
+    
+    Args:
+        deadline_at: time.monotonic() value at which the backend call gives
+            up and no more retries are made (None for no deadline)
+    """
+    cache_key = make_retrieval_key(corpus_id, query_text, top_k, vector_distance_threshold, search_mode)
+    cached = retrieval_cache.get(cache_key)
+    if cached is not None:
+        # Echo this caller's query text rather than the cached spelling
+        cached["query"] = query_text
+        cached["message"] = f"Found {cached['count']} results for query: '{query_text}'"
+        return cached
+    
+    def retrieve() -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            # Execute the query against this corpus only, retrying
+            # transient errors
+            results = retrieval_policy.call(
+                partial(
+                    _retrieve_from_corpus, corpus_id, query_text, top_k, vector_distance_threshold, search_mode,
+                    deadline_at
+                ),
+                kind=f"corpus-{search_mode}",
+                deadline_at=deadline_at
+            )
+            corpus_breakers.record(corpus_id, True, time.monotonic() - started)
+            
+            # Process the results
+            response = _make_query_response(corpus_id, query_text, results)
+            retrieval_cache.put(cache_key, response)
+            return response
+            
+        except RateLimitTimeout as e:
+            # Out of quota says nothing about the corpus's health
+            return {
+                "status": "error",
+                "corpus_id": corpus_id,
+                "error_message": str(e),
+                "message": f"Failed to query corpus: {str(e)}"
+            }
+        except Exception as e:
+            corpus_breakers.record(corpus_id, False, time.monotonic() - started, error=str(e))
+            return {
+                "status": "error",
+                "corpus_id": corpus_id,
+                "error_message": str(e),
+                "message": f"Failed to query corpus: {str(e)}"
+            }
+    
+    return _echo_query(query_flights.do(cache_key, retrieve), query_text)
+
+def set_retrieval_backend(backend: RetrievalBackend) -> None:
+    """
+    Switches every tool to a different retrieval backend, for example a
+    LocalVectorBackend for benchmarks, load tests or offline runs.
+    
+    Cached corpus listings, retrieval and search results and corpus health
+    belong to the previous backend and are dropped.
+    """
+    set_backend(backend)
+    corpus_catalog.reset()
+    retrieval_cache.clear()
+    if _semantic_cache is not None:
+        _semantic_cache.clear()
+    corpus_breakers.reset()
+
+def get_retrieval_cache_stats() -> Dict[str, Any]:
+    """
+    Reports retrieval and semantic cache counters for sizing the caches,
+    how many queries were coalesced with an identical in-flight query,
+    retry and hedging counters, per-corpus circuit breakers, rate limiter
+    queues, and the load on the tool executor.
+    
+    Returns:
+        A dictionary containing:
+        - status: "success"
+        - stats: Hits, misses, hit rate, evictions, expirations,
+          invalidations, and current entry count and size
+        - coalescing: Calls, upstream executions and coalesced
+          (deduplicated) calls of query_rag_corpus and search_all_corpora
+        - semantic_cache: Hits, misses and entries of the cache of
+          search_all_corpora responses reused for similar queries (None
+          when disabled)
+        - retries: Retry and hedge counters, and retrieval latency
+          percentiles as observed and as they would have been without
+          hedging
+        - circuit_breakers: Open and half-open corpora and the state of
+          every corpus with recent failures
+        - rate_limits: Per quota (retrieval, import, model) the current
+          queue depth, by priority, and granted, waited and timed-out calls
+        - tool_executor: Pool size and running, queued, peak and completed
+          tool calls
+    """
+    stats = retrieval_cache.stats()
+    semantic_cache = get_semantic_cache()
+    return {
+        "status": "success",
+        "stats": stats,
+        "coalescing": {
+            "query_rag_corpus": query_flights.stats(),
+            "search_all_corpora": search_flights.stats()
+        },
+        "semantic_cache": semantic_cache.stats() if semantic_cache is not None else None,
+        "retries": retrieval_policy.stats(),
+        "circuit_breakers": corpus_breakers.stats(),
+        "rate_limits": rate_limiters.stats(),
+        "tool_executor": get_tool_executor_stats(),
+        "message": f"Retrieval cache hit rate {stats['hit_rate']:.1%} over {stats['hits'] + stats['misses']} lookups"
+    }
+
+# Marks a task that timed out in _iter_with_deadlines output
+_TIMED_OUT = object()
+
+
+def _iter_with_deadlines(
+    tasks: Dict[str, Callable[..., Any]],
+    per_task_timeout: float,
+    deadline_at: float
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Runs callables concurrently on the shared search pool and yields
+    (task key, result) pairs as tasks finish.
+    
+    A task times out once it has been running for per_task_timeout seconds;
+    every task still pending at deadline_at (a time.monotonic() value) times
+    out as well, and is yielded with _TIMED_OUT as its result. Each task is
+    called with a deadline_at keyword, the earlier of the two, and should
+    give up by then. Timed-out tasks are cancelled if they have not started
+    yet (a task the pool reaches after deadline_at is skipped), otherwise
+    they are abandoned to end at their deadline in the background. A task
+    that raised has its exception as its result.
+    """
+    executor = _get_search_executor()
+    started_at: Dict[str, float] = {}
+    
+    def run_task(key: str, task: Callable[..., Any]) -> Any:
+        start = time.monotonic()
+        if start >= deadline_at:
+            # Queued behind other searches until the caller gave up
+            return _TIMED_OUT
+        started_at[key] = start
+        return task(deadline_at=min(start + per_task_timeout, deadline_at))
+    
+    futures = {executor.submit(run_task, key, task): key for key, task in tasks.items()}
+    pending = set(futures)
+    
     try:
-        # Construct full corpus resource path
-        corpus_path = f"projects/{PROJECT_ID}/locations/{LOCATION}/ragCorpora/{corpus_id}"
-        
-        # Create the resource config
-        rag_resource = rag.RagResource(rag_corpus=corpus_path)
+        while pending:
+            now = time.monotonic()
+            
+            # Expire tasks that have run past their own timeout
+            for future in list(pending):
+                start = started_at.get(futures[future])
+                if start is not None and not future.done() and now - start >= per_task_timeout:
+                    pending.discard(future)
+                    future.cancel()
+                    yield futures[future], _TIMED_OUT
+            
+            remaining = deadline_at - now
+            if not pending or remaining <= 0:
+                break
+            
+            # Wake up at the next per-task expiry, the overall deadline, or
+            # when a task completes, whichever comes first. Queued tasks have
+            # no start time yet, so never sleep longer than one per-task timeout.
+            wake_in = min(remaining, per_task_timeout)
+            for future in pending:
+                start = started_at.get(futures[future])
+                if start is not None:
+                    wake_in = min(wake_in, start + per_task_timeout - now)
+            
+            done, pending = wait(pending, timeout=max(wake_in, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
         
-        # Configure retrieval parameters
-        retrieval_config = rag.RagRetrievalConfig(
+        while pending:
+            future = pending.pop()
+            future.cancel()
+            yield futures[future], _TIMED_OUT
+    finally:
+        # Abandoned early by the consumer: stop whatever has not started
+        for future in pending:
+            future.cancel()
+
+
+def _run_with_deadlines(
+    tasks: Dict[str, Callable[..., Any]],
+    per_task_timeout: float,
+    deadline_at: float
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Runs callables concurrently on the shared search pool and waits for all
+    of them, subject to the deadlines of _iter_with_deadlines.
+    
+    Returns:
+        A tuple of (task results keyed by task key, list of timed-out task
+        keys). A task that raised has its exception as its result.
+    """
+    results: Dict[str, Any] = {}
+    timed_out: List[str] = []
+    for key, result in _iter_with_deadlines(tasks, per_task_timeout, deadline_at):
+        if result is _TIMED_OUT:
+            timed_out.append(key)
+        else:
+            results[key] = result
+    return results, timed_out
+
+
+def _corpus_query_error(corpus_id: str, error: Exception) -> Dict[str, Any]:
+    """Builds the query_rag_corpus error response for an exception."""
+    return {
+        "status": "error",
+        "corpus_id": corpus_id,
+        "error_message": str(error),
+        "message": f"Failed to query corpus: {str(error)}"
+    }
+
+
+def _fan_out_corpus_queries(
+    corpora: List[Dict[str, Any]],
+    query_text: str,
+    top_k: int,
+    vector_distance_threshold: float,
+    per_corpus_timeout: float,
+    deadline_at: float,
+    search_mode: str = "vector"
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """
+    Runs query_rag_corpus for every corpus on the shared search pool.
+    
+    Returns:
+        A tuple of (responses keyed by corpus ID, list of timed-out corpus IDs)
+    """
+    tasks = {
+        corpus["id"]: partial(
+            _query_corpus,
+            corpus_id=corpus["id"],
+            query_text=query_text,
             top_k=top_k,
-            filter=rag.utils.resources.Filter(vector_distance_threshold=vector_distance_threshold)
+            vector_distance_threshold=vector_distance_threshold,
+            search_mode=search_mode
         )
-        
-        # Execute the query directly using the API
-        response = rag.retrieval_query(
-            rag_resources=[rag_resource],
-            text=query_text,
-            rag_retrieval_config=retrieval_config
+        for corpus in corpora
+    }
+    results, timed_out = _run_with_deadlines(tasks, per_corpus_timeout, deadline_at)
+    responses = {
+        corpus_id: _corpus_query_error(corpus_id, result) if isinstance(result, Exception) else result
+        for corpus_id, result in results.items()
+    }
+    return responses, timed_out
+
+
+def _query_corpus_batch(
+    batch: List[Dict[str, Any]],
+    query_text: str,
+    top_k: int,
+    vector_distance_threshold: float,
+    deadline_at: Optional[float] = None
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Queries several corpora with a single retrieval call.
+    
+    The backend attributes each result to its corpus. The call asks for top_k
+    results per corpus and keeps at most top_k per corpus, so the response
+    matches what per-corpus queries would return whenever a corpus got its
+    full share of the merged ranking.
+    
+    Returns:
+        Responses keyed by corpus ID, or None when the batch has to be retried
+        one corpus at a time (the call failed, or a result came back without
+        one of the batch's corpora).
+    """
+    started = time.monotonic()
+    try:
+        results = retrieval_policy.call(
+            partial(
+                get_backend().retrieve,
+                corpus_ids=[corpus["id"] for corpus in batch],
+                query_text=query_text,
+                top_k=top_k * len(batch),
+                vector_distance_threshold=vector_distance_threshold,
+                timeout=_time_left(deadline_at)
+            ),
+            kind="batch",
+            deadline_at=deadline_at
         )
-        
-        # Process the results
-        results = []
-        if hasattr(response, "contexts"):
-            # Handle different response structures
-            contexts = response.contexts
-            if hasattr(contexts, "contexts"):
-                contexts = contexts.contexts
-            
-            # Extract text and metadata from each context
-            for context in contexts:
-                result = {
-                    "text": context.text if hasattr(context, "text") else "",
-                    "source_uri": context.source_uri if hasattr(context, "source_uri") else None,
-                    "relevance_score": context.relevance_score if hasattr(context, "relevance_score") else None
-                }
-                results.append(result)
-        
-        return {
-            "status": "success",
-            "corpus_id": corpus_id,
-            "results": results,
-            "count": len(results),
-            "query": query_text,
-            "message": f"Found {len(results)} results for query: '{query_text}'"
-        }
-        
-    except Exception as e:
+    except Exception:
+        return None
+    
+    results_by_corpus: Dict[str, List[Dict[str, Any]]] = {corpus["id"]: [] for corpus in batch}
+    for result in results:
+        corpus_id = result.get("corpus_id")
+        if corpus_id not in results_by_corpus:
+            return None
+        results_by_corpus[corpus_id].append(result)
+    
+    elapsed = time.monotonic() - started
+    for corpus in batch:
+        corpus_breakers.record(corpus["id"], True, elapsed)
+    
+    # If the merged ranking was cut short, a corpus with fewer than top_k
+    # results may be missing some, so only cache complete per-corpus answers
+    truncated = len(results) >= top_k * len(batch)
+    responses = {}
+    for corpus_id, corpus_results in results_by_corpus.items():
+        corpus_response = _make_query_response(corpus_id, query_text, corpus_results[:top_k])
+        if not truncated or len(corpus_results) >= top_k:
+            retrieval_cache.put(
+                make_retrieval_key(corpus_id, query_text, top_k, vector_distance_threshold),
+                corpus_response
+            )
+        responses[corpus_id] = corpus_response
+    return responses
+
+
+def _batched_corpus_queries(
+    corpora: List[Dict[str, Any]],
+    query_text: str,
+    top_k: int,
+    vector_distance_threshold: float,
+    per_corpus_timeout: float,
+    deadline_at: float
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """
+    Queries corpora in groups of up to RAG_SEARCH_BATCH_SIZE per retrieval
+    call. Only used for vector search, the one mode a shared call can serve,
+    on backends with supports_batch_retrieval (the local backend).
+    
+    Corpora with a cached answer are served from the retrieval cache. The
+    corpora of any batch that fails are queried individually; all calls run
+    concurrently on the shared search pool under the same deadlines.
+    
+    Returns:
+        A tuple of (responses keyed by corpus ID, list of timed-out corpus IDs)
+    """
+    responses: Dict[str, Dict[str, Any]] = {}
+    single: List[Dict[str, Any]] = []
+    batchable: List[Dict[str, Any]] = []
+    
+    for corpus in corpora:
+        cached = retrieval_cache.get(
+            make_retrieval_key(corpus["id"], query_text, top_k, vector_distance_threshold)
+        )
+        if cached is not None:
+            cached["query"] = query_text
+            responses[corpus["id"]] = cached
+        else:
+            batchable.append(corpus)
+    
+    batch_size = max(1, RAG_SEARCH_BATCH_SIZE)
+    batches = [batchable[i:i + batch_size] for i in range(0, len(batchable), batch_size)]
+    
+    tasks: Dict[str, Callable[..., Any]] = {}
+    batch_members: Dict[str, List[Dict[str, Any]]] = {}
+    for index, batch in enumerate(batches):
+        if len(batch) == 1:
+            single.append(batch[0])
+            continue
+        key = f"batch-{index}"
+        batch_members[key] = batch
+        tasks[key] = partial(_query_corpus_batch, batch, query_text, top_k, vector_distance_threshold)
+    for corpus in single:
+        tasks[corpus["id"]] = partial(
+            _query_corpus,
+            corpus_id=corpus["id"],
+            query_text=query_text,
+            top_k=top_k,
+            vector_distance_threshold=vector_distance_threshold,
+            search_mode="vector"
+        )
+    
+    results, expired = _run_with_deadlines(tasks, per_corpus_timeout, deadline_at)
+    
+    timed_out: List[str] = []
+    retry: List[Dict[str, Any]] = []
+    for key in expired:
+        if key in batch_members:
+            timed_out.extend(corpus["id"] for corpus in batch_members[key])
+        else:
+            timed_out.append(key)
+    for key, result in results.items():
+        if key in batch_members:
+            if isinstance(result, dict):
+                responses.update(result)
+            else:
+                retry.extend(batch_members[key])
+        elif isinstance(result, Exception):
+            responses[key] = _corpus_query_error(key, result)
+        else:
+            responses[key] = result
+    
+    # Fall back to one call per corpus for batches that could not be used
+    if retry:
+        retry_responses, retry_timed_out = _fan_out_corpus_queries(
+            retry, query_text, top_k, vector_distance_threshold, per_corpus_timeout, deadline_at
+        )
+        responses.update(retry_responses)
+        timed_out.extend(retry_timed_out)
+    
+    return responses, timed_out
+
+# Routing index over the current catalog, rebuilt when corpora change
+corpus_router = CorpusRouterCache()
+
+
+def _route_corpora(
+    all_corpora: List[Dict[str, Any]],
+    filters: Dict[str, Optional[str]]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Narrows the corpora to search to those matching the grade, subject,
+    board and language filters, falling back to every corpus when no filter
+    is set or nothing matches.
+    
+    Returns:
+        A tuple of (corpora to search, routing summary for the response)
+    """
+    filters = {facet: value for facet, value in filters.items() if value}
+    matched = None
+    if filters and RAG_SEARCH_ROUTING:
+        matched = corpus_router.get(all_corpora).route(filters)
+    corpora = all_corpora if matched is None else [corpus for corpus in all_corpora if corpus["id"] in matched]
+    return corpora, {
+        "filters": filters,
+        "routed": matched is not None,
+        "searched_corpora_count": len(corpora),
+        "total_corpora_count": len(all_corpora)
+    }
+
+
+def _search_option_error(search_mode: str, score_normalization: str) -> Optional[Dict[str, Any]]:
+    """Returns the error response for invalid search options, or None."""
+    if search_mode not in SEARCH_MODES:
+        return _invalid_search_mode_error(search_mode)
+    if score_normalization not in SCORE_NORMALIZATIONS:
         return {
             "status": "error",
-            "corpus_id": corpus_id,
-            "error_message": str(e),
-            "message": f"Failed to query corpus: {str(e)}"
+            "error_message": f"Unknown score normalization '{score_normalization}'",
+            "message": f"Invalid score_normalization '{score_normalization}'; use one of: {', '.join(SCORE_NORMALIZATIONS)}"
         }
+    return None
+
+
+def _add_citations(corpus: Dict[str, Any], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Adds corpus and citation information to one corpus's results, in place."""
+    corpus_id = corpus["id"]
+    corpus_name = corpus.get("display_name", corpus_id)
+    for result in results:
+        # Add citation and source information
+        result["corpus_id"] = corpus_id
+        result["corpus_name"] = corpus_name
+        result["citation"] = f"[Source: {corpus_name} ({corpus_id})]"
+        
+        # Add source file information if available
+        if "source_uri" in result and result["source_uri"]:
+            source_path = result["source_uri"]
+            file_name = source_path.split("/")[-1] if "/" in source_path else source_path
+            result["citation"] += f" File: {file_name}"
+    return results
+
+
+def _skip_open_circuits(
+    corpora: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Splits corpora into those to query and those skipped because their
+    circuit breaker is open.
+    
+    Returns:
+        A tuple of (corpora to query, skipped corpus entries with corpus_id,
+        corpus_name, reason and retry_in_seconds)
+    """
+    allowed, skipped = [], []
+    for corpus in corpora:
+        if corpus_breakers.allow(corpus["id"]):
+            allowed.append(corpus)
+            continue
+        breaker = corpus_breakers.get(corpus["id"]).snapshot()
+        skipped.append({
+            "corpus_id": corpus["id"],
+            "corpus_name": corpus.get("display_name", corpus["id"]),
+            "reason": f"Circuit open after repeated failures: {breaker['last_error']}",
+            "retry_in_seconds": round(breaker["retry_in_seconds"], 1)
+        })
+    return allowed, skipped
+
+
+def _make_search_response(
+    all_corpora: List[Dict[str, Any]],
+    merger: TopKMerger,
+    timed_out: List[Dict[str, str]],
+    query_text: str,
+    skipped: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """
+    Builds the search_all_corpora success response from the merged results,
+    collapsing copies of one passage from several corpora into one result.
+    """
+    skipped = skipped or []
+    all_results = merger.results()
+    collapsed = 0
+    if RAG_SEARCH_COLLAPSE_DUPLICATES:
+        all_results, collapsed = collapse_near_duplicates(all_results, RAG_SEARCH_DUPLICATE_THRESHOLD)
+    
+    # Group the kept results by corpus, in catalog order
+    corpus_results_map = {}  # Map of corpus name to its results
+    searched_corpora = []
+    kept_by_corpus: Dict[str, List[Dict[str, Any]]] = {}
+    for result in all_results:
+        kept_by_corpus.setdefault(result["corpus_id"], []).append(result)
+    for corpus in all_corpora:
+        corpus_specific_results = kept_by_corpus.get(corpus["id"])
+        if corpus_specific_results:
+            corpus_name = corpus.get("display_name", corpus["id"])
+            corpus_results_map[corpus_name] = {
+                "corpus_id": corpus["id"],
+                "corpus_name": corpus_name,
+                "results": corpus_specific_results,
+                "count": len(corpus_specific_results)
+            }
+            searched_corpora.append(corpus_name)
+    
+    # Format citations summary
+    citations_summary = []
+    for corpus_name in searched_corpora:
+        corpus_data = corpus_results_map[corpus_name]
+        citations_summary.append(
+            f"{corpus_name} ({corpus_data['corpus_id']}): {corpus_data['count']} results"
+        )
+    
+    return {
+        "status": "success",
+        "results": all_results,
+        "corpus_results": corpus_results_map,
+        "searched_corpora": searched_corpora,
+        "citations_summary": citations_summary,
+        "timed_out_corpora": timed_out,
+        "skipped_corpora": skipped,
+        "count": len(all_results),
+        "candidate_count": merger.candidate_count,
+        "duplicates_collapsed": collapsed,
+        "query": query_text,
+        "message": f"Found {len(all_results)} results for query '{query_text}' across {len(searched_corpora)} corpora"
+                   + (f" ({len(timed_out)} corpora timed out)" if timed_out else "")
+                   + (f" ({len(skipped)} unhealthy corpora skipped)" if skipped else "")
+                   + (f" ({collapsed} near-duplicate results merged)" if collapsed else ""),
+        "citation_note": "Each result includes a citation indicating its source corpus and file."
+    }
 
 # Function to search across all corpora
 def search_all_corpora(
     query_text: str,
     top_k_per_corpus: Optional[int] = None,
-    vector_distance_threshold: Optional[float] = None
+    vector_distance_threshold: Optional[float] = None,
+    per_corpus_timeout: Optional[float] = None,
+    deadline_seconds: Optional[float] = None,
+    batched: Optional[bool] = None,
+    search_mode: Optional[str] = None,
+    max_results: Optional[int] = None,
+    score_normalization: Optional[str] = None,
+    grade_level: Optional[str] = None,
+    subject_area: Optional[str] = None,
+    board: Optional[str] = None,
+    language: Optional[str] = None,
+    response_format: Optional[str] = None,
+    max_chunk_tokens: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Searches across ALL available corpora for the given query text.
     When a user wants to search for information without specifying a corpus,
     this is the default tool to use.
     
+    When the grade, subject, board or language is known, only corpora whose
+    names, descriptions or tags match are searched (all corpora if none do).
+    Corpora are queried concurrently, several corpora per retrieval call in
+    batched vector mode, and a search identical to one still running waits
+    for that search's response. A search whose query is phrased differently
+    from a recent one but close in meaning (same options and numbers)
+    reuses its response, noted under "semantic_cache". Corpora that do not answer in time are skipped and listed in
+    "timed_out_corpora" instead of delaying the search, and corpora whose
+    recent retrievals keep failing are skipped for a while and listed in
+    "skipped_corpora". Only the global top
+    max_results results are kept, ranked by relevance score, optionally
+    normalized per corpus so corpora with different score scales compare
+    fairly.
+    
     Args:
         query_text: The search query text
         top_k_per_corpus: Maximum number of results to return per corpus (default: 5)
         vector_distance_threshold: Threshold for vector similarity (default: 0.5)
+        per_corpus_timeout: Seconds to wait for a single corpus (default: 10)
+        deadline_seconds: Seconds to wait for the whole search (default: 20)
+        batched: Group corpora into shared retrieval calls when the backend
+            supports it (default: True)
+        search_mode: "vector", "keyword" (BM25, best for exact syllabus terms
+            and chapter names) or "hybrid" (both, fused) (default: "vector")
+        max_results: Maximum number of results across all corpora, 0 for no
+            limit (default: 20)
+        score_normalization: "none", "zscore" or "minmax" normalization of
+            each corpus's scores before ranking (default: "none")
+        grade_level: Grade or class the content is for, e.g. "8" or "Class VIII"
+        subject_area: Subject, e.g. "Science" or "Mathematics"
+        board: Curriculum board, e.g. "CBSE" or "State Board"
+        language: Language or medium of instruction, e.g. "Tamil"
+        response_format: "compact" (each result once, citing a source ID
+            from the "citations" table) or "verbose" (each result with its
+            full citation, also grouped by corpus) (default: "compact")
+        max_chunk_tokens: Truncate each result's text to about this many
+            tokens in the compact format, 0 for full texts (default: 0)
         
     Returns:
-        A dictionary containing the combined search results with citations
+        A dictionary containing the combined search results with citations,
+        the lists of corpora that timed out or were skipped as unhealthy,
+        and how the search was routed
     """
     if top_k_per_corpus is None:
         top_k_per_corpus = RAG_DEFAULT_SEARCH_TOP_K
     if vector_distance_threshold is None:
         vector_distance_threshold = RAG_DEFAULT_VECTOR_DISTANCE_THRESHOLD
-    try:
-        # First, list all available corpora
-        corpora_response = list_rag_corpora()
-        
-        if corpora_response["status"] != "success":
-            return {
-                "status": "error",
-                "error_message": f"Failed to list corpora: {corpora_response.get('error_message', '')}",
-                "message": "Failed to search all corpora - could not retrieve corpus list"
-            }
-        
-        all_corpora = corpora_response.get("corpora", [])
-        
-        if not all_corpora:
-            return {
-                "status": "warning",
-                "message": "No corpora found to search in"
-            }
-        
-        # Search in each corpus
-        all_results = []
-        corpus_results_map = {}  # Map of corpus name to its results
-        searched_corpora = []
-        
-        for corpus in all_corpora:
-            corpus_id = corpus["id"]
-            corpus_name = corpus.get("display_name", corpus_id)
-            
-            # Query this corpus
-            corpus_results = query_rag_corpus(
-                corpus_id=corpus_id,
-                query_text=query_text,
-                top_k=top_k_per_corpus,
-                vector_distance_threshold=vector_distance_threshold
-            )
-            
-            # Add corpus info to the results
-            if corpus_results["status"] == "success":
-                results = corpus_results.get("results", [])
-                corpus_specific_results = []
-                
-                for result in results:
-                    # Add citation and source information
-                    result["corpus_id"] = corpus_id
-                    result["corpus_name"] = corpus_name
-                    result["citation"] = f"[Source: {corpus_name} ({corpus_id})]"
-                    
-                    # Add source file information if available
-                    if "source_uri" in result and result["source_uri"]:
-                        source_path = result["source_uri"]
-                        file_name = source_path.split("/")[-1] if "/" in source_path else source_path
-                        result["citation"] += f" File: {file_name}"
-                    
-                    corpus_specific_results.append(result)
-                    all_results.append(result)
-                
-                # Save results for this corpus
-                if corpus_specific_results:
-                    corpus_results_map[corpus_name] = {
-                        "corpus_id": corpus_id,
-                        "corpus_name": corpus_name,
-                        "results": corpus_specific_results,
-                        "count": len(corpus_specific_results)
-                    }
-                    searched_corpora.append(corpus_name)
-        
-        # Sort all results by relevance score (if available)
-        all_results.sort(
-            key=lambda x: x.get("relevance_score", 0) if x.get("relevance_score") is not None else 0,
-            reverse=True
-        )
-        
-        # Format citations summary
-        citations_summary = []
-        for corpus_name in searched_corpora:
-            corpus_data = corpus_results_map[corpus_name]
-            citations_summary.append(
-                f"{corpus_name} ({corpus_data['corpus_id']}): {corpus_data['count']} results"
-            )
-        
+    if per_corpus_timeout is None:
+        per_corpus_timeout = RAG_SEARCH_PER_CORPUS_TIMEOUT
+    if deadline_seconds is None:
+        deadline_seconds = RAG_SEARCH_DEADLINE
+    if batched is None:
+        batched = RAG_SEARCH_BATCHED
+    if search_mode is None:
+        search_mode = RAG_DEFAULT_SEARCH_MODE
+    if max_results is None:
+        max_results = RAG_SEARCH_MAX_RESULTS
+    if score_normalization is None:
+        score_normalization = RAG_SEARCH_SCORE_NORMALIZATION
+    if response_format is None:
+        response_format = RAG_SEARCH_RESPONSE_FORMAT
+    if max_chunk_tokens is None:
+        max_chunk_tokens = RAG_SEARCH_MAX_CHUNK_TOKENS
+    option_error = _search_option_error(search_mode, score_normalization)
+    if option_error:
+        return option_error
+    if response_format not in RESPONSE_FORMATS:
         return {
-            "status": "success",
-            "results": all_results,
-            "corpus_results": corpus_results_map,
-            "searched_corpora": searched_corpora,
-            "citations_summary": citations_summary,
-            "count": len(all_results),
-            "query": query_text,
-            "message": f"Found {len(all_results)} results for query '{query_text}' across {len(searched_corpora)} corpora",
-            "citation_note": "Each result includes a citation indicating its source corpus and file."
+            "status": "error",
+            "error_message": f"Unknown response format '{response_format}'",
+            "message": f"Invalid response_format '{response_format}'; use one of: {', '.join(RESPONSE_FORMATS)}"
         }
+    
+    def encode(response: Dict[str, Any]) -> Dict[str, Any]:
+        response = _echo_query(response, query_text)
+        if response_format == "compact":
+            return compact_search_response(response, max_chunk_tokens)
+        return response
+    
+    search_options = (
+        top_k_per_corpus, float(vector_distance_threshold), per_corpus_timeout, deadline_seconds,
+        batched, search_mode, max_results, score_normalization, grade_level, subject_area, board, language
+    )
+    
+    # Reuse the response of a recent search for a similar query with the
+    # same options
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is not None:
+        cached = semantic_cache.get(query_text, search_options)
+        if cached is not None:
+            response, similarity = cached
+            response["semantic_cache"] = {"matched_query": response["query"], "similarity": round(similarity, 3)}
+            return encode(response)
+    
+    run_search = partial(
+        _search_all_corpora,
+        query_text=query_text,
+        top_k_per_corpus=top_k_per_corpus,
+        vector_distance_threshold=vector_distance_threshold,
+        per_corpus_timeout=per_corpus_timeout,
+        deadline_seconds=deadline_seconds,
+        batched=batched,
+        search_mode=search_mode,
+        max_results=max_results,
+        score_normalization=score_normalization,
+        filters={"grade": grade_level, "subject": subject_area, "board": board, "language": language}
+    )
+    
+    def search() -> Dict[str, Any]:
+        response = run_search()
+        # Only complete answers are reused for other phrasings
+        if (
+            semantic_cache is not None
+            and response["status"] == "success"
+            and not response["timed_out_corpora"]
+            and not response["skipped_corpora"]
+        ):
+            semantic_cache.put(query_text, search_options, response)
+        return response
+    
+    flight_key = (normalize_query(query_text),) + search_options
+    return encode(search_flights.do(flight_key, search))
+
+
+def _search_all_corpora(
+    query_text: str,
+    top_k_per_corpus: int,
+    vector_distance_threshold: float,
+    per_corpus_timeout: float,
+    deadline_seconds: float,
+    batched: bool,
+    search_mode: str,
+    max_results: int,
+    score_normalization: str,
+    filters: Dict[str, Optional[str]]
+) -> Dict[str, Any]:
+    """Runs search_all_corpora once its options are resolved and validated."""
+    try:
+        for response in _iter_search_events(
+            query_text, top_k_per_corpus, vector_distance_threshold, per_corpus_timeout, deadline_seconds,
+            batched, search_mode, max_results, score_normalization, filters
+        ):
+            pass
+        return response
         
     except Exception as e:
         return {
@@ -729,19 +1711,236 @@ def search_all_corpora(
             "message": f"Failed to search all corpora: {str(e)}"
         }
 
-# Create FunctionTools from the functions for the RAG corpus management tools
-create_corpus_tool = FunctionTool(create_rag_corpus)
-update_corpus_tool = FunctionTool(update_rag_corpus)
-list_corpora_tool = FunctionTool(list_rag_corpora)
-get_corpus_tool = FunctionTool(get_rag_corpus)
-delete_corpus_tool = FunctionTool(delete_rag_corpus)
-import_document_tool = FunctionTool(import_document_to_corpus)
+
+def _iter_search_events(
+    query_text: str,
+    top_k_per_corpus: int,
+    vector_distance_threshold: float,
+    per_corpus_timeout: float,
+    deadline_seconds: float,
+    batched: bool,
+    search_mode: str,
+    max_results: int,
+    score_normalization: str,
+    filters: Dict[str, Optional[str]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Searches the corpora for search_all_corpora and stream_search_all_corpora.
+    
+    Yields one event per queried corpus as it answers (in completion order,
+    or in catalog order after a batched search) with event, corpus_id,
+    corpus_name, completed and total, plus results and count or
+    error_message. The last item is the search_all_corpora response, and
+    the only one when the search fails before any corpus is queried.
+    """
+    # First, list all available corpora from the cached catalog; file
+    # counts are not needed for searching
+    try:
+        all_corpora = corpus_catalog.get_corpora()
+    except Exception as e:
+        yield {
+            "status": "error",
+            "error_message": f"Failed to list corpora: {str(e)}",
+            "message": "Failed to search all corpora - could not retrieve corpus list"
+        }
+        return
+    
+    if not all_corpora:
+        yield {
+            "status": "warning",
+            "message": "No corpora found to search in"
+        }
+        return
+    
+    # Only query the corpora for this grade/subject when they are known,
+    # and skip the ones whose circuit breaker is open
+    all_corpora, routing = _route_corpora(all_corpora, filters)
+    queried_corpora, skipped = _skip_open_circuits(all_corpora)
+    
+    # Query all corpora concurrently; anything still running at its
+    # timeout or at the overall deadline is reported instead of awaited
+    deadline_at = time.monotonic() + deadline_seconds
+    if (batched and search_mode == "vector" and len(queried_corpora) > 1
+            and get_backend().supports_batch_retrieval):
+        responses, batch_timed_out = _batched_corpus_queries(
+            corpora=queried_corpora,
+            query_text=query_text,
+            top_k=top_k_per_corpus,
+            vector_distance_threshold=vector_distance_threshold,
+            per_corpus_timeout=per_corpus_timeout,
+            deadline_at=deadline_at
+        )
+        completions: Iterator[Tuple[str, Any]] = iter([
+            (corpus["id"], _TIMED_OUT if corpus["id"] in batch_timed_out else responses[corpus["id"]])
+            for corpus in queried_corpora
+        ])
+    else:
+        tasks = {
+            corpus["id"]: partial(
+                _query_corpus,
+                corpus_id=corpus["id"],
+                query_text=query_text,
+                top_k=top_k_per_corpus,
+                vector_distance_threshold=vector_distance_threshold,
+                search_mode=search_mode
+            )
+            for corpus in queried_corpora
+        }
+        completions = _iter_with_deadlines(tasks, per_corpus_timeout, deadline_at)
+    
+    corpora_by_id = {corpus["id"]: corpus for corpus in queried_corpora}
+    corpus_responses: Dict[str, Dict[str, Any]] = {}
+    timed_out_ids = set()
+    for completed, (corpus_id, result) in enumerate(completions, start=1):
+        corpus = corpora_by_id[corpus_id]
+        event: Dict[str, Any] = {"corpus_id": corpus_id, "corpus_name": corpus.get("display_name", corpus_id)}
+        if result is _TIMED_OUT:
+            # Not a breaker failure here: a query that was running records
+            # its own outcome once its backend call ends at the deadline,
+            # and one still queued in the pool says nothing about the corpus
+            timed_out_ids.add(corpus_id)
+            event["event"] = "corpus_timed_out"
+        else:
+            if isinstance(result, Exception):
+                result = _corpus_query_error(corpus_id, result)
+            corpus_responses[corpus_id] = result
+            if result["status"] == "success":
+                # Add corpus info to the results
+                event["event"] = "corpus_results"
+                event["results"] = _add_citations(corpus, result.get("results", []))
+                event["count"] = len(event["results"])
+            else:
+                event["event"] = "corpus_error"
+                event["error_message"] = str(result.get("error_message"))
+        event["completed"] = completed
+        event["total"] = len(queried_corpora)
+        yield event
+    
+    timed_out = [
+        {"corpus_id": corpus["id"], "corpus_name": corpus.get("display_name", corpus["id"])}
+        for corpus in all_corpora
+        if corpus["id"] in timed_out_ids
+    ]
+    
+    # Merge corpora in catalog order so ties and the output are stable
+    # regardless of which query finished first; only the global top
+    # max_results are ever held
+    merger = TopKMerger(max_results=max_results, normalization=score_normalization)
+    for corpus in all_corpora:
+        corpus_results = corpus_responses.get(corpus["id"])
+        if corpus_results and corpus_results["status"] == "success":
+            merger.add(corpus_results.get("results", []))
+    
+    response = _make_search_response(all_corpora, merger, timed_out, query_text, skipped)
+    response["routing"] = routing
+    yield response
+
+async def stream_search_all_corpora(
+    query_text: str,
+    top_k_per_corpus: Optional[int] = None,
+    vector_distance_threshold: Optional[float] = None,
+    per_corpus_timeout: Optional[float] = None,
+    deadline_seconds: Optional[float] = None,
+    search_mode: Optional[str] = None,
+    max_results: Optional[int] = None,
+    score_normalization: Optional[str] = None,
+    grade_level: Optional[str] = None,
+    subject_area: Optional[str] = None,
+    board: Optional[str] = None,
+    language: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of search_all_corpora that reports each corpus as soon
+    as it answers, so callers (an SSE endpoint, a streaming tool) can start
+    using the first results while slower corpora are still running.
+    
+    Every corpus is queried on its own (no batching), so one slow corpus
+    never holds back another. Arguments match search_all_corpora.
+    
+    Yields:
+        One event per corpus, in completion order:
+        - event: "corpus_results", "corpus_error" or "corpus_timed_out"
+        - corpus_id, corpus_name
+        - results and count: That corpus's results with citations
+          ("corpus_results" only)
+        - error_message: Why the corpus failed ("corpus_error" only)
+        - top_results: Snapshot of the merged global top max_results so far
+        - completed, total: Corpora answered so far and corpora searched
+        followed by a final event "complete" carrying the same fields as the
+        verbose search_all_corpora response. Failures before any corpus is queried
+        are yielded as a single search_all_corpora style error or warning
+        response.
+    """
+    if top_k_per_corpus is None:
+        top_k_per_corpus = RAG_DEFAULT_SEARCH_TOP_K
+    if vector_distance_threshold is None:
+        vector_distance_threshold = RAG_DEFAULT_VECTOR_DISTANCE_THRESHOLD
+    if per_corpus_timeout is None:
+        per_corpus_timeout = RAG_SEARCH_PER_CORPUS_TIMEOUT
+    if deadline_seconds is None:
+        deadline_seconds = RAG_SEARCH_DEADLINE
+    if search_mode is None:
+        search_mode = RAG_DEFAULT_SEARCH_MODE
+    if max_results is None:
+        max_results = RAG_SEARCH_MAX_RESULTS
+    if score_normalization is None:
+        score_normalization = RAG_SEARCH_SCORE_NORMALIZATION
+    option_error = _search_option_error(search_mode, score_normalization)
+    if option_error:
+        yield option_error
+        return
+    
+    events = _iter_search_events(
+        query_text, top_k_per_corpus, vector_distance_threshold, per_corpus_timeout, deadline_seconds,
+        batched=False,
+        search_mode=search_mode,
+        max_results=max_results,
+        score_normalization=score_normalization,
+        filters={"grade": grade_level, "subject": subject_area, "board": board, "language": language}
+    )
+    merger = TopKMerger(max_results=max_results, normalization=score_normalization)
+    try:
+        while True:
+            # Wait for the next corpus without blocking the event loop
+            event = await asyncio.to_thread(next, events, None)
+            if event is None:
+                break
+            if "event" not in event:
+                # The search_all_corpora response (or error) ends the stream
+                if event["status"] == "success":
+                    event["event"] = "complete"
+                yield event
+                continue
+            if event["event"] == "corpus_results":
+                merger.add(event["results"])
+            event["top_results"] = merger.results()
+            yield event
+    finally:
+        try:
+            events.close()
+        except ValueError:
+            # Still waiting in a worker thread; pending queries finish on their own
+            pass
+
+# Create tools from the functions for the RAG corpus management tools.
+# The blocking calls run on the tool executor so they never stall the event loop.
+create_corpus_tool = ExecutorFunctionTool(create_rag_corpus)
+update_corpus_tool = ExecutorFunctionTool(update_rag_corpus)
+list_corpora_tool = ExecutorFunctionTool(list_rag_corpora)
+get_corpus_tool = ExecutorFunctionTool(get_rag_corpus)
+delete_corpus_tool = ExecutorFunctionTool(delete_rag_corpus)
+import_document_tool = ExecutorFunctionTool(import_document_to_corpus)
+bulk_import_tool = ExecutorFunctionTool(bulk_import_documents_to_corpus)
+sync_corpus_tool = ExecutorFunctionTool(sync_corpus_with_gcs)
 
 # Create FunctionTools from the functions for the RAG file management tools
-list_files_tool = FunctionTool(list_rag_files)
-get_file_tool = FunctionTool(get_rag_file)
-delete_file_tool = FunctionTool(delete_rag_file)
+list_files_tool = ExecutorFunctionTool(list_rag_files)
+get_file_tool = ExecutorFunctionTool(get_rag_file)
+delete_file_tool = ExecutorFunctionTool(delete_rag_file)
 
 # Create FunctionTools from the functions for the RAG query tools
-query_rag_corpus_tool = FunctionTool(query_rag_corpus)
-search_all_corpora_tool = FunctionTool(search_all_corpora) 
\ No newline at end of file
+query_rag_corpus_tool = ExecutorFunctionTool(query_rag_corpus)
+search_all_corpora_tool = ExecutorFunctionTool(search_all_corpora)
+
+# Create FunctionTools from the functions for the RAG monitoring tools
+retrieval_cache_stats_tool = FunctionTool(get_retrieval_cache_stats) 
\ No newline at end of file
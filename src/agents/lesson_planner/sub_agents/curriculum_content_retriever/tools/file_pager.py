@@ -0,0 +1,73 @@
+"""
+Lazy, prefetching iteration over paginated file listings.
+
+Listing a large corpus one page per tool call leaves pagination to the LLM
+agent, and collecting every page before use holds the whole listing in
+memory. The pager walks the pages lazily instead, requesting the next page in
+the background while the caller consumes the current one, so at most two
+pages are held at a time and page latency overlaps with processing.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Fetches one page: page token in, (items, next page token) out
+PageFetcher = Callable[[Optional[str]], Tuple[List[Dict[str, Any]], Optional[str]]]
+
+_prefetch_executor: Optional[ThreadPoolExecutor] = None
+_prefetch_executor_lock = threading.Lock()
+
+
+def _get_prefetch_executor() -> ThreadPoolExecutor:
+    global _prefetch_executor
+    with _prefetch_executor_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-list")
+        return _prefetch_executor
+
+
+def iter_pages(
+    fetch_page: PageFetcher,
+    page_token: Optional[str] = None,
+    prefetch: bool = True
+) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+    """
+    Yields (items, next page token) for every page, starting at page_token.
+
+    With prefetch, the request for page n+1 is in flight while page n is
+    being consumed. Closing the iterator early cancels a prefetch that has
+    not started.
+    """
+    pending: Optional[Future] = None
+    try:
+        page = fetch_page(page_token)
+        while True:
+            items, next_token = page
+            if next_token and prefetch:
+                pending = _get_prefetch_executor().submit(fetch_page, next_token)
+            yield items, next_token
+            if not next_token:
+                return
+            if pending is not None:
+                page, pending = pending.result(), None
+            else:
+                page = fetch_page(next_token)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def iter_items(
+    fetch_page: PageFetcher,
+    page_token: Optional[str] = None,
+    prefetch: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """Yields the items of every page, one at a time."""
+    for items, _ in iter_pages(fetch_page, page_token=page_token, prefetch=prefetch):
+        yield from items
+
+
+def count_items(fetch_page: PageFetcher, prefetch: bool = True) -> int:
+    """Counts the items across all pages without keeping any of them."""
+    return sum(len(items) for items, _ in iter_pages(fetch_page, prefetch=prefetch))
@@ -0,0 +1,193 @@
+"""
+Keyword (BM25) retrieval and rank fusion for curriculum chunks.
+
+Vector search alone misses exact syllabus terms such as chapter names or
+Tamil/Hindi technical vocabulary. This module provides an Indic-aware
+tokenizer, the reduction of a query to its content words, an in-memory BM25
+inverted index, and reciprocal rank fusion to combine keyword and vector
+rankings.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+# Zero-width (non-)joiners shape Indic conjuncts and must not split words
+_JOINERS = {"\u200c", "\u200d"}
+
+# Words that say how a teacher phrased the request rather than what it is about
+_FILLER_WORDS = frozenset({
+    "a", "an", "the", "to", "for", "of", "in", "on", "about", "and", "with",
+    "how", "do", "does", "what", "why", "is", "are", "me", "my", "i", "please",
+    "teach", "teaching", "lesson", "lessons", "plan", "plans", "explain",
+    "explanation", "class", "grade", "std", "standard", "students", "topic",
+    "create", "make", "prepare", "need", "want", "week", "weekly", "day", "days", "daily"
+})
+_NUMBER = re.compile(r"^\d+$")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens, keeping Indic words intact.
+
+    Letters and digits start or continue a token; combining marks (vowel
+    signs, viramas, nuktas) and zero-width joiners continue a token, so words
+    in Devanagari, Tamil and other Brahmic scripts are not broken apart the
+    way a plain \\w+ split breaks them. Text is NFC normalized, joiners are
+    dropped, and native digits are mapped to ASCII digits.
+    """
+    tokens = []
+    current = []
+    for char in unicodedata.normalize("NFC", text or "").casefold():
+        category = unicodedata.category(char)
+        if category[0] == "L" or category[0] == "N":
+            if category == "Nd":
+                char = str(unicodedata.digit(char))
+            current.append(char)
+        elif current and (category[0] == "M" or char in _JOINERS):
+            if char not in _JOINERS:
+                current.append(char)
+        elif current:
+            tokens.append("".join(current))
+            current = []
+    if current:
+        tokens.append("".join(current))
+    return tokens
+
+
+def canonical_query(query_text: str) -> Tuple[str, Tuple[str, ...]]:
+    """Returns the content words of a query, and the numbers it mentions."""
+    tokens = [token for token in tokenize(query_text) if token not in _FILLER_WORDS]
+    numbers = tuple(sorted({token for token in tokens if _NUMBER.match(token)}))
+    return " ".join(tokens), numbers
+
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index over short documents such as chunks.
+
+    Args:
+        k1: Term frequency saturation
+        b: Document length normalization
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, int]] = {}
+        self._doc_terms: Dict[Hashable, Counter] = {}
+        self._doc_lengths: Dict[Hashable, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        """Indexes a document, replacing any earlier version with the same ID."""
+        if doc_id in self._doc_lengths:
+            self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+        self._doc_terms[doc_id] = terms
+        length = sum(terms.values())
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+
+    def remove(self, doc_id: Hashable) -> None:
+        """Removes a document from the index if present."""
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def search(self, query_text: str, top_k: int) -> List[Tuple[Hashable, float]]:
+        """Returns up to top_k (doc_id, BM25 score) pairs with a positive score, best first."""
+        doc_count = len(self._doc_lengths)
+        if not doc_count or top_k <= 0:
+            return []
+        average_length = self._total_length / doc_count or 1.0
+
+        scores: Dict[Hashable, float] = {}
+        for term in set(tokenize(query_text)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1.0 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                length_norm = 1.0 - self.b + self.b * self._doc_lengths[doc_id] / average_length
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1.0) / (frequency + self.k1 * length_norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+
+def rank_by_bm25(results: List[Dict[str, Any]], query_text: str) -> List[Dict[str, Any]]:
+    """
+    Re-ranks a candidate pool of results by BM25 over their text.
+
+    Used when the backend has no keyword index of its own: the vector
+    candidates are indexed on the fly and only those matching a query term
+    are returned, best first, with their BM25 score in relevance_score.
+    """
+    index = BM25Index()
+    for position, result in enumerate(results):
+        index.add(position, result.get("text") or "")
+    ranked = []
+    for position, score in index.search(query_text, len(results)):
+        result = dict(results[position])
+        result["relevance_score"] = score
+        ranked.append(result)
+    return ranked
+
+
+def result_identity(result: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    """Identifies the same chunk across rankings from different retrievers."""
+    return (result.get("corpus_id"), result.get("source_uri"), result.get("text"))
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[Dict[str, Any]]],
+    top_k: int,
+    k: int = 60,
+    identity: Callable[[Dict[str, Any]], Hashable] = result_identity
+) -> List[Dict[str, Any]]:
+    """
+    Fuses several rankings of results with reciprocal rank fusion.
+
+    Each result scores sum(1 / (k + rank)) over the rankings it appears in.
+    Fused results keep the fields of their first occurrence, report the fused
+    score as relevance_score, and record each retriever's own score as
+    "<name>_score" (None when that retriever did not return the result).
+
+    Args:
+        rankings: Ranked result lists keyed by retriever name (e.g. "vector")
+        top_k: Number of fused results to return
+        k: RRF damping constant
+    """
+    fused: Dict[Hashable, Dict[str, Any]] = {}
+    scores: Dict[Hashable, float] = {}
+    for name, ranking in rankings.items():
+        for rank, result in enumerate(ranking, start=1):
+            key = identity(result)
+            if key not in fused:
+                fused[key] = dict(result)
+                for other in rankings:
+                    fused[key][f"{other}_score"] = None
+            fused[key][f"{name}_score"] = result.get("relevance_score")
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+    best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+    results = []
+    for key, score in best:
+        fused[key]["relevance_score"] = score
+        results.append(fused[key])
+    return results
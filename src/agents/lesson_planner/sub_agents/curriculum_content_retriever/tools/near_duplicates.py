@@ -0,0 +1,128 @@
+"""
+Near-duplicate detection of search results with MinHash and LSH.
+
+The same NCERT paragraph is often imported into several corpora (a state
+board copy, a second edition), so search_all_corpora returned it several
+times. Each result text is reduced to a MinHash signature over its word
+shingles; results whose signatures share an LSH band are compared, and a
+result estimated to be at least threshold (Jaccard) similar to a better
+ranked one is collapsed into it. The kept result lists the collapsed
+copies, so no citation is lost.
+
+Signatures use one-permutation hashing: every shingle is hashed once and
+the hash picks one of num_hashes bins, each keeping its minimum, with empty
+bins filled from the next non-empty one (densification). That costs one
+hash per shingle instead of num_hashes, which keeps a result well under a
+millisecond in pure Python.
+
+Copies in different languages share no shingles and are not detected.
+"""
+
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lexical_index import tokenize
+
+_HASH_BITS = 32
+
+
+def minhash_signature(text: str, num_hashes: int = 64, shingle_size: int = 3) -> Optional[Tuple[int, ...]]:
+    """
+    Returns the MinHash signature of a text's word shingles, or None when
+    the text has no words. Words come from the Indic-aware tokenizer, so
+    Devanagari or Tamil words are not split at their vowel signs.
+    """
+    words = tokenize(text)
+    if not words:
+        return None
+    if len(words) <= shingle_size:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+    empty = 1 << _HASH_BITS
+    bins = [empty] * num_hashes
+    for shingle in shingles:
+        hashed = zlib.crc32(shingle.encode("utf-8"))
+        index = hashed % num_hashes
+        if hashed < bins[index]:
+            bins[index] = hashed
+    # Densify: an empty bin borrows the next non-empty bin's value, offset
+    # by the distance so borrowed values rarely collide by accident
+    if empty in bins:
+        original = list(bins)
+        for i in range(num_hashes):
+            if original[i] == empty:
+                distance = 1
+                while original[(i + distance) % num_hashes] == empty:
+                    distance += 1
+                bins[i] = original[(i + distance) % num_hashes] + distance * empty
+    return tuple(bins)
+
+
+def estimated_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimates the Jaccard similarity of two texts from their signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def collapse_near_duplicates(
+    results: List[Dict[str, Any]],
+    threshold: float = 0.8,
+    num_hashes: int = 64,
+    bands: int = 16
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Collapses near-duplicate results into the best ranked copy.
+
+    Args:
+        results: Search results, best first, with text and citation fields
+        threshold: Estimated Jaccard similarity at which results are
+            near-duplicates
+        num_hashes: MinHash signature length
+        bands: LSH bands; num_hashes must be a multiple of bands
+
+    Returns:
+        The kept results in their original order and the number collapsed.
+        A kept result that absorbed copies lists them under "duplicates"
+        (corpus_id, corpus_name, citation, source_uri, relevance_score).
+    """
+    rows = num_hashes // bands
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    signatures: List[Optional[Tuple[int, ...]]] = []
+    kept: List[Dict[str, Any]] = []
+    collapsed = 0
+    for result in results:
+        signature = minhash_signature(result.get("text", ""), num_hashes)
+        if signature is None:
+            kept.append(result)
+            signatures.append(None)
+            continue
+
+        keys = [(band, signature[band * rows:(band + 1) * rows]) for band in range(bands)]
+        original = None
+        checked = set()
+        for key in keys:
+            for index in buckets.get(key, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                if estimated_similarity(signature, signatures[index]) >= threshold:
+                    original = index
+                    break
+            if original is not None:
+                break
+
+        if original is None:
+            for key in keys:
+                buckets.setdefault(key, []).append(len(kept))
+            kept.append(result)
+            signatures.append(signature)
+            continue
+
+        collapsed += 1
+        kept[original].setdefault("duplicates", []).append({
+            field: result.get(field)
+            for field in ("corpus_id", "corpus_name", "citation", "source_uri", "relevance_score")
+            if result.get(field) is not None
+        })
+    return kept, collapsed
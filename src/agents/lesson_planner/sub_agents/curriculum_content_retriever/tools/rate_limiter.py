@@ -0,0 +1,352 @@
+"""
+Token-bucket rate limiting of Vertex AI RAG and Gemini calls.
+
+Every tool call and LLM call used to go out immediately, so peak school hours
+ran into Vertex quota 429s. Calls now take a token from a named bucket
+first ("retrieval", "import", "model"). When the bucket is empty the call
+waits in a priority queue, higher priority first and first come first
+served within a priority, until a token is free or its deadline passes.
+
+Buckets live in process memory by default. With the SQLite store the
+bucket levels are kept in a shared SQLite file, so all worker processes on
+a host draw from the same quota (the priority queue stays per process).
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from ..config import (
+    RATE_LIMIT_STORE,
+    RATE_LIMIT_SQLITE_PATH,
+    RATE_LIMIT_MAX_WAIT_SECONDS,
+    RAG_RETRIEVAL_RATE,
+    RAG_RETRIEVAL_BURST,
+    RAG_IMPORT_RATE,
+    RAG_IMPORT_BURST,
+    MODEL_CALL_RATE,
+    MODEL_CALL_BURST
+)
+
+# Priorities; a larger number is served first
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 5
+PRIORITY_HIGH = 10
+
+# Longest a waiter sleeps between looks at the queue
+_POLL_SECONDS = 0.05
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("rate_limit_priority", default=PRIORITY_NORMAL)
+
+
+class RateLimitTimeout(Exception):
+    """Raised when no token became free before the caller's deadline."""
+
+
+@contextlib.contextmanager
+def rate_limit_priority(priority: int) -> Iterator[None]:
+    """Runs the enclosed calls at the given queue priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class MemoryBucketStore:
+    """Token buckets in process memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # name -> (tokens, updated_at)
+
+    def take(self, name: str, rate: float, burst: float, tokens: float = 1.0) -> float:
+        """
+        Takes tokens if the bucket holds enough. Returns 0 on success,
+        otherwise the seconds until enough tokens will have accumulated.
+        """
+        now = time.monotonic()
+        with self._lock:
+            level, updated_at = self._buckets.get(name, (burst, now))
+            level = min(burst, level + (now - updated_at) * rate)
+            if level >= tokens:
+                self._buckets[name] = (level - tokens, now)
+                return 0.0
+            self._buckets[name] = (level, now)
+            return (tokens - level) / rate
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a SQLite file shared by the worker processes of a host.
+    Each take runs in an immediate transaction, so concurrent workers never
+    spend the same tokens.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated_at REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def take(self, name: str, rate: float, burst: float, tokens: float = 1.0) -> float:
+        """Same contract as MemoryBucketStore.take, across processes."""
+        connection = self._connect()
+        # Wall-clock time, since monotonic clocks are not shared by processes
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+            level, updated_at = row if row else (burst, now)
+            level = min(burst, level + max(0.0, now - updated_at) * rate)
+            wait = 0.0
+            if level >= tokens:
+                level -= tokens
+            else:
+                wait = (tokens - level) / rate
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (name, level, now)
+            )
+            connection.execute("COMMIT")
+            return wait
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+
+class RateLimiter:
+    """
+    One named token bucket with a local priority queue of waiters.
+
+    Args:
+        name: Bucket name (shared by all processes using the same store)
+        rate: Tokens added per second; 0 or less disables limiting
+        burst: Bucket capacity, the most calls that may go out at once
+        store: MemoryBucketStore or SQLiteBucketStore
+        max_wait_seconds: Default deadline for a waiting call
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, store: Any, max_wait_seconds: float):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.store = store
+        self.max_wait_seconds = max_wait_seconds
+
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int]] = []  # (-priority, sequence) heap
+        self._sequence = itertools.count()
+        self._granted = 0
+        self._timed_out = 0
+        self._waited = 0
+        self._wait_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, priority: Optional[int] = None, timeout: Optional[float] = None) -> None:
+        """
+        Blocks until a token is taken. Raises RateLimitTimeout after timeout
+        seconds (default max_wait_seconds).
+        """
+        if not self.enabled:
+            return
+        entry, enqueued_at, deadline = self._enqueue(priority, timeout)
+        try:
+            while True:
+                wait = self._take() if self._at_head(entry) else None
+                wait = self._settle(entry, enqueued_at, deadline, wait)
+                if wait == 0.0:
+                    return
+                time.sleep(wait)
+        except BaseException:
+            self._dequeue(entry)
+            raise
+
+    async def acquire_async(self, priority: Optional[int] = None, timeout: Optional[float] = None) -> None:
+        """
+        acquire for coroutines: waits without blocking the event loop, and
+        takes tokens on a worker thread since the SQLite store may wait on
+        other processes' transactions.
+        """
+        if not self.enabled:
+            return
+        entry, enqueued_at, deadline = self._enqueue(priority, timeout)
+        try:
+            while True:
+                wait = await asyncio.to_thread(self._take) if self._at_head(entry) else None
+                wait = self._settle(entry, enqueued_at, deadline, wait)
+                if wait == 0.0:
+                    return
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._dequeue(entry)
+            raise
+
+    def _enqueue(self, priority: Optional[int], timeout: Optional[float]) -> Tuple[Tuple[int, int], float, float]:
+        priority = _priority.get() if priority is None else priority
+        entry = (-priority, next(self._sequence))
+        with self._lock:
+            heapq.heappush(self._queue, entry)
+        enqueued_at = time.monotonic()
+        timeout = self.max_wait_seconds if timeout is None else timeout
+        return entry, enqueued_at, enqueued_at + timeout
+
+    def _dequeue(self, entry: Tuple[int, int]) -> None:
+        with self._lock:
+            self._discard(entry)
+
+    def _discard(self, entry: Tuple[int, int]) -> None:
+        # Caller holds self._lock
+        if self._queue and self._queue[0] == entry:
+            heapq.heappop(self._queue)
+        elif entry in self._queue:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+
+    def _at_head(self, entry: Tuple[int, int]) -> bool:
+        with self._lock:
+            return self._queue[0] == entry
+
+    def _take(self) -> float:
+        # Store I/O runs outside self._lock, which only guards the queue
+        return self.store.take(self.name, self.rate, self.burst)
+
+    def _settle(self, entry: Tuple[int, int], enqueued_at: float, deadline: float, wait: Optional[float]) -> float:
+        """
+        Records the outcome of a poll, given the store's answer when entry
+        was at the head of the queue (None when it was not). Returns 0 once
+        granted, otherwise how long to sleep before polling again.
+        """
+        now = time.monotonic()
+        if wait == 0.0:
+            with self._lock:
+                # A waiter of higher priority may have arrived mid-take
+                self._discard(entry)
+                self._granted += 1
+                queued_for = now - enqueued_at
+                if queued_for > 0.001:
+                    self._waited += 1
+                    self._wait_seconds += queued_for
+            return 0.0
+        if now >= deadline:
+            with self._lock:
+                self._timed_out += 1
+            raise RateLimitTimeout(
+                f"No '{self.name}' quota became free within the deadline ({self.queue_depth} calls queued)"
+            )
+        return max(0.001, min(_POLL_SECONDS if wait is None else wait, _POLL_SECONDS, deadline - now))
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the rate, current queue depth (by priority) and grant/wait/timeout counters."""
+        with self._lock:
+            by_priority: Dict[int, int] = {}
+            for negated_priority, _ in self._queue:
+                by_priority[-negated_priority] = by_priority.get(-negated_priority, 0) + 1
+            return {
+                "rate_per_second": self.rate,
+                "burst": self.burst,
+                "queue_depth": len(self._queue),
+                "queue_depth_by_priority": by_priority,
+                "granted": self._granted,
+                "waited": self._waited,
+                "mean_wait_seconds": self._wait_seconds / self._waited if self._waited else 0.0,
+                "timed_out": self._timed_out
+            }
+
+
+class RateLimiterRegistry:
+    """
+    The process's named rate limiters, created on first use from the
+    configured rates and sharing one bucket store.
+
+    Args:
+        rates: Bucket name -> (tokens per second, burst)
+        store: "memory" or "sqlite"
+        sqlite_path: Database file for the sqlite store
+        max_wait_seconds: Default deadline for waiting calls
+    """
+
+    def __init__(self, rates: Dict[str, Tuple[float, float]], store: str, sqlite_path: str, max_wait_seconds: float):
+        self.rates = rates
+        self.store_name = store
+        self.sqlite_path = sqlite_path
+        self.max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+        self._store: Any = None
+        self._limiters: Dict[str, RateLimiter] = {}
+
+    def get(self, name: str) -> RateLimiter:
+        with self._lock:
+            limiter = self._limiters.get(name)
+            if limiter is None:
+                if self._store is None:
+                    self._store = (
+                        SQLiteBucketStore(self.sqlite_path) if self.store_name == "sqlite" else MemoryBucketStore()
+                    )
+                rate, burst = self.rates.get(name, (0.0, 1.0))
+                limiter = self._limiters[name] = RateLimiter(name, rate, burst, self._store, self.max_wait_seconds)
+            return limiter
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {
+            "store": self.store_name,
+            "limiters": {name: limiter.stats() for name, limiter in limiters.items()}
+        }
+
+
+# The process's rate limiters: Vertex AI RAG retrievals and imports, and
+# Gemini model calls
+rate_limiters = RateLimiterRegistry(
+    rates={
+        "retrieval": (RAG_RETRIEVAL_RATE, RAG_RETRIEVAL_BURST),
+        "import": (RAG_IMPORT_RATE, RAG_IMPORT_BURST),
+        "model": (MODEL_CALL_RATE, MODEL_CALL_BURST)
+    },
+    store=RATE_LIMIT_STORE,
+    sqlite_path=RATE_LIMIT_SQLITE_PATH,
+    max_wait_seconds=RATE_LIMIT_MAX_WAIT_SECONDS
+)
+
+
+async def limit_model_calls(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    before_model_callback that waits for model quota before every LLM call.
+    If none becomes free in time the call is skipped and the agent gets a
+    RATE_LIMITED error response instead of Vertex AI's 429.
+    """
+    try:
+        await rate_limiters.get("model").acquire_async()
+    except RateLimitTimeout as e:
+        return LlmResponse(error_code="RATE_LIMITED", error_message=str(e))
+    return None
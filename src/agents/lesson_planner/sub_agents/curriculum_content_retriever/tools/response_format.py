@@ -0,0 +1,97 @@
+"""
+Compact encoding of search_all_corpora responses.
+
+The verbose response lists every result twice (in "results" and again under
+"corpus_results") and repeats the corpus name, corpus ID and a citation
+string on every chunk. All of it becomes input tokens for the curriculum
+retriever's model and is then kept in session state. The compact encoding
+lists each result once, refers to its source through a short ID into a
+citation table, and can truncate each chunk to a token budget.
+"""
+
+from typing import Any, Dict, List
+
+RESPONSE_FORMATS = ("compact", "verbose")
+
+# Rough characters per token of Gemini's tokenizer for English text
+_CHARS_PER_TOKEN = 4
+
+# Fields of the verbose response that the compact one keeps, when not empty
+_PASSTHROUGH_FIELDS = (
+    "searched_corpora", "timed_out_corpora", "skipped_corpora", "duplicates_collapsed", "routing",
+    "semantic_cache"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates the number of model tokens in a text."""
+    return (len(text or "") + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text to about max_tokens tokens at a word boundary, marking the cut."""
+    max_chars = max_tokens * _CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + " …"
+
+
+def compact_search_response(response: Dict[str, Any], max_chunk_tokens: int = 0) -> Dict[str, Any]:
+    """
+    Re-encodes a verbose search_all_corpora success response.
+
+    Sources (corpus and file) are numbered S1, S2, ... in order of their
+    first result, and "citations" maps each ID to its citation string.
+    Results keep only their text, score and source ID, plus the IDs of
+    other sources of the same passage under "also_in".
+
+    Args:
+        response: Verbose response; other statuses are returned unchanged
+        max_chunk_tokens: Truncate each result's text to about this many
+            tokens (0 keeps full texts)
+    """
+    if response.get("status") != "success" or "corpus_results" not in response:
+        return response
+
+    citations: Dict[str, str] = {}
+    source_ids: Dict[Any, str] = {}
+
+    def cite(result: Dict[str, Any]) -> str:
+        source_key = (result.get("corpus_id"), result.get("source_uri"))
+        source_id = source_ids.get(source_key)
+        if source_id is None:
+            source_id = source_ids[source_key] = f"S{len(source_ids) + 1}"
+            citations[source_id] = result.get("citation") or f"[Source: {result.get('corpus_id')}]"
+        return source_id
+
+    results: List[Dict[str, Any]] = []
+    for result in response["results"]:
+        text = result.get("text", "")
+        compact = {"source": cite(result), "score": result.get("relevance_score"), "text": text}
+        if result.get("duplicates"):
+            # The same passage in other corpora
+            compact["also_in"] = list(dict.fromkeys(cite(duplicate) for duplicate in result["duplicates"]))
+        if isinstance(compact["score"], float):
+            compact["score"] = round(compact["score"], 3)
+        if max_chunk_tokens > 0:
+            compact["text"] = truncate_to_tokens(text, max_chunk_tokens)
+            if compact["text"] != text:
+                compact["truncated"] = True
+        results.append(compact)
+
+    compact_response = {
+        "status": "success",
+        "query": response["query"],
+        "count": response["count"],
+        "results": results,
+        "citations": citations
+    }
+    for field in _PASSTHROUGH_FIELDS:
+        if response.get(field):
+            compact_response[field] = response[field]
+    compact_response["message"] = response["message"]
+    return compact_response
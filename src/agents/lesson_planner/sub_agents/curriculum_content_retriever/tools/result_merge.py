@@ -0,0 +1,94 @@
+"""
+Global top-k merging of per-corpus retrieval results.
+
+search_all_corpora receives one ranked list per corpus. Instead of
+concatenating and sorting every result, lists are pushed into a bounded
+min-heap that only ever holds the global top max_results, optionally after
+normalizing each corpus's scores so corpora with different score scales
+(BM25 scores, similarities from different embedding models) rank fairly
+against each other.
+"""
+
+import heapq
+import itertools
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+SCORE_NORMALIZATIONS = ("none", "zscore", "minmax")
+
+
+def _raw_score(result: Dict[str, Any]) -> float:
+    # Results without a score rank as if they scored 0
+    score = result.get("relevance_score")
+    return float(score) if score is not None else 0.0
+
+
+def normalize_scores(scores: List[float], method: str) -> List[float]:
+    """
+    Normalizes one corpus's scores.
+
+    "zscore" maps scores to standard deviations from the corpus mean and
+    "minmax" to [0, 1]; a corpus whose scores are all equal gets 0 and 1
+    respectively. "none" returns the scores unchanged.
+    """
+    if method == "none" or not scores:
+        return list(scores)
+    if method == "zscore":
+        mean = sum(scores) / len(scores)
+        std = math.sqrt(sum((score - mean) ** 2 for score in scores) / len(scores))
+        if std == 0:
+            return [0.0] * len(scores)
+        return [(score - mean) / std for score in scores]
+    if method == "minmax":
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0] * len(scores)
+        return [(score - low) / (high - low) for score in scores]
+    raise ValueError(f"Unknown score normalization '{method}'")
+
+
+class TopKMerger:
+    """
+    Bounded-heap merge of ranked result lists into a global top-k.
+
+    Each add() call takes the results of one corpus. Memory stays at
+    max_results entries however many corpora and results are added, and
+    results with equal scores keep the order in which they were added.
+
+    Args:
+        max_results: Size of the global top-k (None or <= 0 keeps everything)
+        normalization: Per-corpus score normalization, one of
+            SCORE_NORMALIZATIONS. When not "none", each kept result carries
+            its normalized score as "normalized_score".
+    """
+
+    def __init__(self, max_results: Optional[int] = None, normalization: str = "none"):
+        if normalization not in SCORE_NORMALIZATIONS:
+            raise ValueError(f"Unknown score normalization '{normalization}'")
+        self.max_results = max_results if max_results and max_results > 0 else None
+        self.normalization = normalization
+        # Min-heap of (score, -sequence, result): the root is the weakest kept
+        # result, and among equal scores the one added last
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._sequence = itertools.count()
+        self.candidate_count = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, results: List[Dict[str, Any]]) -> None:
+        """Adds one corpus's results to the merge."""
+        scores = normalize_scores([_raw_score(result) for result in results], self.normalization)
+        for result, score in zip(results, scores):
+            self.candidate_count += 1
+            if self.normalization != "none":
+                result["normalized_score"] = score
+            entry = (score, -next(self._sequence), result)
+            if self.max_results is None or len(self._heap) < self.max_results:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+
+    def results(self) -> List[Dict[str, Any]]:
+        """Returns the kept results, best first."""
+        return [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
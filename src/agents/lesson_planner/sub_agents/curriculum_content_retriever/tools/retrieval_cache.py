@@ -0,0 +1,158 @@
+"""
+Bounded in-process cache for RAG retrieval results.
+
+Teachers in the same school ask for nearly identical topics, so retrieval
+responses are cached per corpus and query. The cache is an LRU bounded both by
+entry count and by the approximate size of the cached results, entries expire
+after a TTL, and all entries of a corpus can be dropped when its files change.
+"""
+
+import copy
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+# Fixed per-entry and per-result overhead added to the text size estimate
+_ENTRY_OVERHEAD_BYTES = 256
+_RESULT_OVERHEAD_BYTES = 128
+
+
+def normalize_query(query_text: str) -> str:
+    """Normalizes query text so trivially different spellings share a key."""
+    normalized = unicodedata.normalize("NFKC", query_text or "")
+    return " ".join(normalized.casefold().split())
+
+
+def make_retrieval_key(
+    corpus_id: str,
+    query_text: str,
+    top_k: int,
+    vector_distance_threshold: float,
+    search_mode: str = "vector"
+) -> Tuple[str, str, int, float, str]:
+    """Builds the cache key for a single-corpus retrieval."""
+    return (corpus_id, normalize_query(query_text), int(top_k), float(vector_distance_threshold), search_mode)
+
+
+def estimate_response_size(response: Dict[str, Any]) -> int:
+    """Approximates the memory held by a retrieval response, in bytes."""
+    size = _ENTRY_OVERHEAD_BYTES
+    for result in response.get("results", []):
+        size += _RESULT_OVERHEAD_BYTES
+        for value in result.values():
+            if isinstance(value, str):
+                size += len(value.encode("utf-8", errors="ignore"))
+    return size
+
+
+class RetrievalCache:
+    """
+    Thread-safe LRU + TTL cache of retrieval responses.
+
+    Keys are tuples whose first element is the corpus ID, which is what
+    invalidate_corpus uses to find a corpus's entries.
+
+    Args:
+        max_entries: Maximum number of cached responses (0 disables caching)
+        max_bytes: Maximum approximate size of all cached responses
+        ttl_seconds: How long a cached response stays valid
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # key -> (response, size, stored_at)
+        self._entries: "OrderedDict[Hashable, Tuple[Dict[str, Any], int, float]]" = OrderedDict()
+        self._keys_by_corpus: Dict[str, Set[Hashable]] = {}
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Returns a copy of the cached response, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            response, _, stored_at = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        # Callers annotate results in place, so never hand out the cached dicts
+        return copy.deepcopy(response)
+
+    def put(self, key: Hashable, response: Dict[str, Any]) -> None:
+        """Stores a copy of a response, evicting least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        size = estimate_response_size(response)
+        if size > self.max_bytes:
+            return
+        response = copy.deepcopy(response)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (response, size, time.monotonic())
+            self._keys_by_corpus.setdefault(key[0], set()).add(key)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+    def invalidate_corpus(self, corpus_id: str) -> int:
+        """Drops every cached response for a corpus and returns how many."""
+        with self._lock:
+            keys = self._keys_by_corpus.get(corpus_id, set()).copy()
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drops every cached response."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_corpus.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        corpus_keys = self._keys_by_corpus.get(key[0])
+        if corpus_keys is not None:
+            corpus_keys.discard(key)
+            if not corpus_keys:
+                del self._keys_by_corpus[key[0]]
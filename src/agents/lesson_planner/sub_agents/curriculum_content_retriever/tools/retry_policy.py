@@ -0,0 +1,283 @@
+"""
+Retries and hedged requests for retrieval calls.
+
+A single slow Vertex AI call dominates the p99 of a search, and a single
+transient failure silently drops a corpus. The retrieval policy wraps each
+backend call:
+
+- Retryable errors (unavailable, deadline exceeded, resource exhausted, ...)
+  are retried with full-jitter exponential backoff. Retries draw from a
+  budget that refills with every call, so a backend that is down does not
+  get several times its normal traffic.
+- Optionally, a call still running after the observed latency percentile
+  (per kind of call) gets a second, hedged attempt; whichever finishes first
+  wins. The loser is cancelled if it has not started, and its result is
+  discarded otherwise.
+- A call given a deadline is neither retried nor hedged once the deadline
+  would be passed, so a caller that stopped waiting does not keep workers
+  busy with further attempts.
+- Observed latencies are recorded next to what they would have been without
+  hedging (the primary attempt's latency), so the stats show how much tail
+  latency hedging removes.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from google.api_core import exceptions as api_exceptions
+
+_RETRYABLE_ERRORS = (
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.InternalServerError,
+    api_exceptions.TooManyRequests,
+    api_exceptions.ResourceExhausted,
+    api_exceptions.Aborted,
+    api_exceptions.GatewayTimeout,
+    ConnectionError,
+    TimeoutError
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Tells whether an error is transient, so the call may succeed if repeated."""
+    return isinstance(error, _RETRYABLE_ERRORS)
+
+
+class LatencyWindow:
+    """Latencies of the most recent calls, for percentiles."""
+
+    def __init__(self, size: int = 512):
+        self._lock = threading.Lock()
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Returns the given percentile (nearest rank), or None with no samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, max(0, int(round(percent / 100.0 * len(samples))) - 1))
+        return samples[rank]
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of calls: every call adds
+    ratio tokens and every retry spends one.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+class RetrievalPolicy:
+    """
+    Runs retrieval calls with retries and, optionally, hedging.
+
+    Args:
+        max_attempts: Attempts per call, including the first
+        base_delay: Backoff cap before the first retry, doubled per retry;
+            the actual sleep is uniform between 0 and the cap
+        max_delay: Largest backoff cap
+        retry_budget_ratio: Retries allowed per call on average
+        hedge: Send a second attempt when the first is slow
+        hedge_percentile: Latency percentile after which to hedge
+        hedge_min_samples: Calls of a kind observed before hedging it
+        max_workers: Threads running hedged attempts
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        retry_budget_ratio: float = 0.2,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        max_workers: int = 16
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_workers = max_workers
+        self.budget = RetryBudget(retry_budget_ratio)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Upstream latency of single attempts, per kind of call
+        self._attempt_latency: Dict[str, LatencyWindow] = {}
+        # End-to-end latency of calls, as observed and as it would have been
+        # without hedging
+        self._observed = LatencyWindow()
+        self._unhedged = LatencyWindow()
+        self._counters = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "retries_denied": 0,
+            "retries_past_deadline": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "losers_cancelled": 0
+        }
+
+    def call(self, fn: Callable[[], Any], kind: str = "retrieve", deadline_at: Optional[float] = None) -> Any:
+        """
+        Calls fn with retries (and hedging when enabled) and returns its
+        result, raising the last error once attempts run out.
+
+        Args:
+            kind: Calls of one kind share a latency distribution for hedging
+                (e.g. single-corpus versus batched retrievals)
+            deadline_at: time.monotonic() value after which no retry or
+                hedge is started (None for no deadline)
+        """
+        self._count("calls")
+        self.budget.deposit()
+        started = time.monotonic()
+        for attempt in range(self.max_attempts):
+            try:
+                result, slow_primary = self._attempt(fn, kind, deadline_at)
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts or not is_retryable(e):
+                    raise
+                if not self.budget.try_spend():
+                    self._count("retries_denied")
+                    raise
+                cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+                delay = random.uniform(0, cap)
+                if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                    self._count("retries_past_deadline")
+                    raise
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            observed = time.monotonic() - started
+            self._observed.record(observed)
+            if slow_primary is None:
+                self._unhedged.record(observed)
+            else:
+                # Without hedging the call would have lasted until the
+                # primary attempt finished
+                hedge_finished = time.monotonic()
+                slow_primary.add_done_callback(
+                    lambda primary: self._unhedged.record(
+                        observed + max(0.0, time.monotonic() - hedge_finished)
+                        if not primary.cancelled() and primary.exception() is None
+                        else observed
+                    )
+                )
+            return result
+
+    def _attempt(self, fn: Callable[[], Any], kind: str, deadline_at: Optional[float]) -> Tuple[Any, Optional[Future]]:
+        """
+        Runs one attempt, hedged when it outlasts the hedge percentile
+        before the deadline. Returns the result and, when the hedge won,
+        the primary attempt.
+        """
+        window = self._latency_window(kind)
+        hedge_after = None
+        if self.hedge and len(window) >= self.hedge_min_samples:
+            hedge_after = window.percentile(self.hedge_percentile)
+        if hedge_after is not None and deadline_at is not None and time.monotonic() + hedge_after >= deadline_at:
+            hedge_after = None
+        if hedge_after is None:
+            return self._timed(fn, window), None
+
+        executor = self._get_executor()
+        primary = executor.submit(self._timed, fn, window)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result(), None
+
+        self._count("hedges")
+        pending = {primary, executor.submit(self._timed, fn, window)}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in pending:
+                    if loser.cancel():
+                        self._count("losers_cancelled")
+                if future is primary:
+                    return future.result(), None
+                self._count("hedge_wins")
+                return future.result(), primary
+        raise error
+
+    def _timed(self, fn: Callable[[], Any], window: LatencyWindow) -> Any:
+        self._count("attempts")
+        started = time.monotonic()
+        result = fn()
+        window.record(time.monotonic() - started)
+        return result
+
+    def _latency_window(self, kind: str) -> LatencyWindow:
+        with self._lock:
+            window = self._attempt_latency.get(kind)
+            if window is None:
+                window = self._attempt_latency[kind] = LatencyWindow()
+            return window
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rag-hedge")
+            return self._executor
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns retry and hedge counters and observed versus unhedged latency percentiles."""
+        def percentiles(window: LatencyWindow) -> Dict[str, Optional[float]]:
+            return {f"p{p}": window.percentile(p) for p in (50, 95, 99)}
+
+        with self._lock:
+            counters = dict(self._counters)
+            hedge_after = {
+                kind: window.percentile(self.hedge_percentile)
+                for kind, window in self._attempt_latency.items()
+                if len(window) >= self.hedge_min_samples
+            }
+        return {
+            **counters,
+            "hedging": self.hedge,
+            "hedge_after_seconds": hedge_after if self.hedge else {},
+            "latency_seconds": percentiles(self._observed),
+            "unhedged_latency_seconds": percentiles(self._unhedged)
+        }
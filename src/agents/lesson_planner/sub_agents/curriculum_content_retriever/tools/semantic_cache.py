@@ -0,0 +1,180 @@
+"""
+Semantic cache of search_all_corpora responses.
+
+The retrieval cache only matches queries that normalize to the same text, so
+"teach fractions to class 5" and "grade 5 fractions lesson" both go
+upstream. This cache embeds each query and keeps the embeddings of recent
+searches in a small in-memory matrix. A new search whose embedding is at
+least similarity_threshold (cosine) close to a cached one, with the same
+search options, reuses that search's response.
+
+Before embedding, queries are reduced to their content words: filler such as
+"teach", "lesson" or "class" is dropped, so phrasings of one topic embed
+alike. Queries that mention different numbers (grades, chapters, units)
+never match, however similar the rest of the text.
+
+The embedder is pluggable; the default is the local backend's hashing
+embedder, which needs no model or network access.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .backends.local import Embedder, HashingEmbedder
+from .lexical_index import canonical_query
+
+
+class SemanticQueryCache:
+    """
+    Thread-safe cache of search responses looked up by query similarity.
+
+    Entries are evicted least recently used beyond max_entries and expire
+    after ttl_seconds.
+
+    Args:
+        similarity_threshold: Smallest cosine similarity at which a cached
+            response is reused
+        max_entries: Maximum number of cached responses (0 disables caching)
+        ttl_seconds: How long a cached response stays valid
+        embedder: Callable embedding a list of texts into rows of a matrix
+            (default: HashingEmbedder)
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float,
+        max_entries: int,
+        ttl_seconds: float,
+        embedder: Optional[Embedder] = None
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embedder = embedder or HashingEmbedder()
+
+        self._lock = threading.Lock()
+        # entry id -> (scope, numbers, canonical query, response, stored_at);
+        # ordered from least to most recently used
+        self._entries: "OrderedDict[int, Tuple[Hashable, Tuple[str, ...], str, Dict[str, Any], float]]" = OrderedDict()
+        # Row i of the matrix is the normalized embedding of entry _row_ids[i]
+        self._matrix: Optional[np.ndarray] = None
+        self._row_ids: List[int] = []
+        self._next_id = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def set_embedder(self, embedder: Embedder) -> None:
+        """Switches the embedder; cached embeddings from the old one are dropped."""
+        with self._lock:
+            self.embedder = embedder
+            self._clear()
+
+    def get(self, query_text: str, scope: Hashable) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Returns a copy of the most similar cached response for a search
+        with the same scope (search options), with its similarity, or None.
+        """
+        if self.max_entries <= 0:
+            return None
+        canonical, numbers = canonical_query(query_text)
+        vector = self._embed(canonical)
+        with self._lock:
+            self._expire()
+            best_id, best_similarity = None, self.similarity_threshold
+            if self._row_ids:
+                similarities = self._matrix @ vector
+                for row in np.argsort(-similarities):
+                    similarity = float(similarities[row])
+                    if similarity < best_similarity:
+                        break
+                    entry_id = self._row_ids[row]
+                    entry_scope, entry_numbers, _, _, _ = self._entries[entry_id]
+                    if entry_scope == scope and entry_numbers == numbers:
+                        best_id, best_similarity = entry_id, similarity
+                        break
+            if best_id is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self._hits += 1
+            response = self._entries[best_id][3]
+        # Callers annotate responses in place, so never hand out the cached dict
+        return copy.deepcopy(response), best_similarity
+
+    def put(self, query_text: str, scope: Hashable, response: Dict[str, Any]) -> None:
+        """Stores a copy of a search response, evicting least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        canonical, numbers = canonical_query(query_text)
+        vector = self._embed(canonical)
+        response = copy.deepcopy(response)
+        with self._lock:
+            # A query already cached in this scope is replaced, not duplicated
+            for entry_id, (entry_scope, _, entry_canonical, _, _) in self._entries.items():
+                if entry_scope == scope and entry_canonical == canonical:
+                    self._remove(entry_id)
+                    break
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (scope, numbers, canonical, response, time.monotonic())
+            row = vector[np.newaxis, :]
+            self._matrix = row if self._matrix is None else np.vstack([self._matrix, row])
+            self._row_ids.append(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drops every cached response, e.g. after a corpus's files changed."""
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "similarity_threshold": self.similarity_threshold
+            }
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embedder([text])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        expired = [
+            entry_id for entry_id, (_, _, _, _, stored_at) in self._entries.items()
+            if now - stored_at >= self.ttl_seconds
+        ]
+        for entry_id in expired:
+            self._remove(entry_id)
+        self._expirations += len(expired)
+
+    def _remove(self, entry_id: int) -> None:
+        del self._entries[entry_id]
+        row = self._row_ids.index(entry_id)
+        del self._row_ids[row]
+        self._matrix = np.delete(self._matrix, row, axis=0) if self._row_ids else None
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._matrix = None
+        self._row_ids = []
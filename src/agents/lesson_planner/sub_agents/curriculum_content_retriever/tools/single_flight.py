@@ -0,0 +1,85 @@
+"""
+Single-flight coalescing of identical in-flight calls.
+
+When a class of teachers runs the same workshop, dozens of identical
+retrievals arrive together. The retrieval cache cannot help until the first
+of them finishes, so without coalescing each one goes upstream. A
+SingleFlight lets the first caller for a key (the leader) make the call
+while concurrent callers with the same key wait for the leader's result,
+so only one upstream call is made per key at a time.
+"""
+
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """
+    Thread-safe coalescer of concurrent calls with equal keys.
+
+    Waiters receive a deep copy of the leader's result (callers annotate
+    results in place) or the leader's exception. A key is only coalesced
+    while its call is running; the next call after it finishes starts a new
+    one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> [future, number of waiters]
+        self._in_flight: Dict[Hashable, List[Any]] = {}
+        self._calls = 0
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Returns fn()'s result, running fn only if no call with this key is in
+        flight and otherwise waiting for the running call.
+        """
+        with self._lock:
+            self._calls += 1
+            flight = self._in_flight.get(key)
+            if flight is None:
+                flight = self._in_flight[key] = [Future(), 0]
+                self._executions += 1
+                leader = True
+            else:
+                flight[1] += 1
+                self._coalesced += 1
+                leader = False
+
+        future = flight[0]
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        # The leader may modify its result once returned, so waiters get a
+        # snapshot taken now
+        if self._finish(key):
+            future.set_result(copy.deepcopy(result))
+        else:
+            future.set_result(None)
+        return result
+
+    def _finish(self, key: Hashable) -> int:
+        """Ends the flight for key and returns how many callers joined it."""
+        with self._lock:
+            return self._in_flight.pop(key)[1]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns call, execution and coalesced counters."""
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "coalesced_rate": self._coalesced / self._calls if self._calls else 0.0,
+                "in_flight": len(self._in_flight)
+            }
@@ -5,13 +5,13 @@ This module provides tools for creating and listing GCS buckets
 to be used with the Agent Development Kit (ADK).
 """
 
-from google.cloud import storage
 from google.api_core.exceptions import GoogleAPIError
-from google.adk.tools import ToolContext, FunctionTool
+from google.adk.tools import ToolContext
 from typing import Dict, Any, Optional
 import logging
+from .cloud_clients import get_storage_client
+from .tool_executor import ExecutorFunctionTool
 from ..config import (
-    PROJECT_ID,
     GCS_DEFAULT_STORAGE_CLASS,
     GCS_DEFAULT_LOCATION,
     GCS_LIST_BUCKETS_MAX_RESULTS,
@@ -27,8 +27,6 @@ logging.basicConfig(
     format=LOG_FORMAT
 )
 
-# Initialize the GCS client
-client = storage.Client(project=PROJECT_ID)
 
 def create_gcs_bucket(
     tool_context: ToolContext,
@@ -53,8 +51,8 @@ def create_gcs_bucket(
     if location is None:
         location = GCS_DEFAULT_LOCATION
     try:
-        # Initialize the client
-        client = storage.Client(project=PROJECT_ID)
+        # Use the shared client
+        client = get_storage_client()
         
         # Check if the bucket already exists
         try:
@@ -117,8 +115,8 @@ def list_gcs_buckets(
     if max_results is None:
         max_results = GCS_LIST_BUCKETS_MAX_RESULTS
     try:
-        # Initialize the client
-        client = storage.Client(project=PROJECT_ID)
+        # Use the shared client
+        client = get_storage_client()
         
         # List the buckets with optional filtering
         bucket_iterator = client.list_buckets(prefix=prefix, max_results=max_results)
@@ -165,8 +163,8 @@ def get_bucket_details(
         A dictionary containing the bucket details and a list of files
     """
     try:
-        # Initialize the client
-        client = storage.Client(project=PROJECT_ID)
+        # Use the shared client
+        client = get_storage_client()
         
         # Get the bucket
         bucket = client.get_bucket(bucket_name)
@@ -240,8 +238,8 @@ def list_blobs_in_bucket(
     if max_results is None:
         max_results = GCS_LIST_BLOBS_MAX_RESULTS
     try:
-        # Initialize the client
-        client = storage.Client(project=PROJECT_ID)
+        # Use the shared client
+        client = get_storage_client()
         
         # Get the bucket
         bucket = client.bucket(bucket_name)
@@ -340,7 +338,7 @@ def upload_file_to_gcs(
                         destination_blob_name += ".pdf"
                 
                 # Upload to GCS
-                client = storage.Client(project=PROJECT_ID)
+                client = get_storage_client()
                 bucket = client.bucket(bucket_name)
                 blob = bucket.blob(destination_blob_name)
                 
@@ -385,9 +383,10 @@ def upload_file_to_gcs(
             "message": f"An unexpected error occurred: {str(e)}"
         }
 
-# Create FunctionTools from the functions
-create_bucket_tool = FunctionTool(create_gcs_bucket)
-list_buckets_tool = FunctionTool(list_gcs_buckets)
-get_bucket_details_tool = FunctionTool(get_bucket_details)
-list_blobs_tool = FunctionTool(list_blobs_in_bucket)
-upload_file_gcs_tool = FunctionTool(upload_file_to_gcs) 
\ No newline at end of file
+# Create tools from the functions, run on the tool executor so that
+# blocking GCS calls never stall the event loop
+create_bucket_tool = ExecutorFunctionTool(create_gcs_bucket)
+list_buckets_tool = ExecutorFunctionTool(list_gcs_buckets)
+get_bucket_details_tool = ExecutorFunctionTool(get_bucket_details)
+list_blobs_tool = ExecutorFunctionTool(list_blobs_in_bucket)
+upload_file_gcs_tool = ExecutorFunctionTool(upload_file_to_gcs)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Bounded executor for running blocking tools off the event loop.
+
+ADK calls a synchronous tool function directly on the event loop, so a slow
+retrieval_query or list_blobs stalls every other /run_sse stream the
+process is serving. The corpus and storage tools are registered as
+ExecutorFunctionTool instead: the agent awaits a coroutine that runs the
+unchanged synchronous function on a dedicated, process-wide thread pool.
+The pool is bounded, so a burst of tool calls queues in the executor
+instead of spawning threads without limit, and the loop keeps streaming
+meanwhile.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from google.adk.tools import FunctionTool
+from google.genai import types
+
+from ..config import TOOL_MAX_WORKERS
+
+_tool_executor: Optional[ThreadPoolExecutor] = None
+_tool_executor_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"running": 0, "queued": 0, "completed": 0, "peak_running": 0}
+
+
+def _get_tool_executor() -> ThreadPoolExecutor:
+    """Returns the shared tool pool, creating it on first use."""
+    global _tool_executor
+    with _tool_executor_lock:
+        if _tool_executor is None:
+            _tool_executor = ThreadPoolExecutor(max_workers=TOOL_MAX_WORKERS, thread_name_prefix="rag-tool")
+        return _tool_executor
+
+
+def _run_tracked(call: Callable[[], Any]) -> Any:
+    with _stats_lock:
+        _stats["queued"] -= 1
+        _stats["running"] += 1
+        _stats["peak_running"] = max(_stats["peak_running"], _stats["running"])
+    try:
+        return call()
+    finally:
+        with _stats_lock:
+            _stats["running"] -= 1
+            _stats["completed"] += 1
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Runs a blocking function on the tool pool and awaits its result."""
+    # Carry context variables (e.g. tracing spans) over to the worker thread
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    with _stats_lock:
+        _stats["queued"] += 1
+    future = _get_tool_executor().submit(_run_tracked, call)
+    future.add_done_callback(_release_if_cancelled)
+    # Cancelling the awaiting task cancels the call if it has not started
+    return await asyncio.wrap_future(future)
+
+
+def _release_if_cancelled(future: Future) -> None:
+    if future.cancelled():
+        with _stats_lock:
+            _stats["queued"] -= 1
+
+
+def async_tool(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wraps a synchronous tool function in a coroutine function that runs it on
+    the tool pool.
+
+    The wrapper keeps the function's name, docstring and signature, so
+    FunctionTool builds the same declaration (and still passes tool_context
+    when the function asks for it).
+    """
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_blocking(func, *args, **kwargs)
+    return wrapper
+
+
+class ExecutorFunctionTool(FunctionTool):
+    """
+    FunctionTool for a blocking function, run on the tool pool.
+
+    The model sees the same declaration as for FunctionTool(func). It is
+    taken from func itself: when ADK strips tool_context from a declaration
+    it rebuilds the function from its code object, which would drop the
+    wrapper's borrowed docstring.
+    """
+
+    def __init__(self, func: Callable[..., Any]):
+        super().__init__(async_tool(func))
+        self._declaration_tool = FunctionTool(func)
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return self._declaration_tool._get_declaration()
+
+
+def get_tool_executor_stats() -> Dict[str, Any]:
+    """Returns the pool size and its running, queued, peak and completed call counts."""
+    with _stats_lock:
+        return {"max_workers": TOOL_MAX_WORKERS, **_stats}
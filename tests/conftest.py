@@ -0,0 +1,37 @@
+"""
+Shared fixtures for the agent tests.
+
+The agents are imported the way ADK imports them, as top-level packages of
+src/agents. No test talks to Google Cloud: corpus tools run against the
+in-process local backend, and Vertex AI behaviour is checked with
+Vertex-shaped objects.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "agents"))
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "test-project")
+# Keep import checkpoints and sync manifests out of the home directory
+os.environ.setdefault("RAG_IMPORT_CHECKPOINT_DIR", tempfile.mkdtemp(prefix="rag-checkpoints-"))
+
+
+@pytest.fixture
+def documents():
+    """Source URI -> text of the documents the local backend can import."""
+    return {}
+
+
+@pytest.fixture
+def local_backend(documents):
+    """Installs a fresh local backend for the corpus tools, reading sources from documents."""
+    from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+    from lesson_planner.sub_agents.curriculum_content_retriever.tools.backends.local import LocalVectorBackend
+
+    backend = LocalVectorBackend(chunk_size=20, chunk_overlap=0, read_source=documents.__getitem__)
+    corpus_tools.set_retrieval_backend(backend)
+    yield backend
+    corpus_tools.set_retrieval_backend(LocalVectorBackend())
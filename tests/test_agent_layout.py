@@ -0,0 +1,48 @@
+"""Layout of the lesson planning pipeline in lesson_planner.agent."""
+
+import os
+import subprocess
+import sys
+
+_SRC_AGENTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "agents")
+
+# The retrieval mode is read when the agent module is imported, so each mode
+# is checked in a fresh interpreter
+_DESCRIBE = """
+from lesson_planner import agent
+stage, generation = agent.root_agent.sub_agents
+print(type(stage).__name__, stage.name, *[sub_agent.name for sub_agent in stage.sub_agents], generation.name)
+"""
+
+
+def _describe(mode):
+    env = dict(os.environ, CURRICULUM_RETRIEVAL_MODE=mode)
+    return subprocess.run(
+        [sys.executable, "-c", _DESCRIBE], cwd=_SRC_AGENTS, env=env, capture_output=True, text=True, timeout=120
+    )
+
+
+def test_direct_mode_runs_the_retrieval_stage_beside_intent_analysis():
+    described = _describe("direct")
+    assert described.returncode == 0, described.stderr
+    assert described.stdout.split() == [
+        "ParallelAgent", "lesson_preparation_stage", "TeacherIntentAnalysisAgent",
+        "curriculum_retrieval_stage", "LessonPlanCreationAgent"
+    ]
+
+
+def test_llm_mode_runs_the_retriever_agent_beside_intent_analysis():
+    from lesson_planner.sub_agents.curriculum_content_retriever.agent import root_agent as retriever
+
+    described = _describe("llm")
+    assert described.returncode == 0, described.stderr
+    assert described.stdout.split() == [
+        "ParallelAgent", "lesson_preparation_stage", "TeacherIntentAnalysisAgent",
+        retriever.name, "LessonPlanCreationAgent"
+    ]
+
+
+def test_unknown_modes_are_rejected():
+    described = _describe("semantic")
+    assert described.returncode != 0
+    assert "Unknown curriculum retrieval mode 'semantic'" in described.stderr
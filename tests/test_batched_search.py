@@ -0,0 +1,48 @@
+"""Batched vector search across corpora."""
+
+import pytest
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+
+DOCUMENTS = {
+    "gs://b/science.txt": "Photosynthesis lets green plants turn sunlight, water and carbon dioxide into food.",
+    "gs://b/maths.txt": "A fraction such as one half names a part of a whole pizza.",
+    "gs://b/history.txt": "The Mauryan empire was founded by Chandragupta Maurya."
+}
+
+
+@pytest.fixture
+def corpora(local_backend, documents):
+    documents.update(DOCUMENTS)
+    corpus_ids = []
+    for uri in DOCUMENTS:
+        corpus_id = corpus_tools.create_rag_corpus(uri.rsplit("/", 1)[-1])["corpus_id"]
+        corpus_tools.import_document_to_corpus(corpus_id, uri)
+        corpus_ids.append(corpus_id)
+    calls = []
+    retrieve = local_backend.retrieve
+    local_backend.retrieve = lambda corpus_ids, **kwargs: calls.append(list(corpus_ids)) or retrieve(corpus_ids, **kwargs)
+    return corpus_ids, calls
+
+
+def _search(query_text):
+    return corpus_tools.search_all_corpora(
+        query_text, vector_distance_threshold=1.0, batched=True, search_mode="vector", response_format="verbose"
+    )
+
+
+def test_batching_backends_share_one_retrieval_call(corpora):
+    corpus_ids, calls = corpora
+    response = _search("photosynthesis sunlight")
+    assert response["status"] == "success"
+    assert calls == [corpus_ids]
+    assert response["results"][0]["source_uri"] == "gs://b/science.txt"
+
+
+def test_backends_without_batching_are_queried_per_corpus(corpora, local_backend):
+    corpus_ids, calls = corpora
+    local_backend.supports_batch_retrieval = False
+    response = _search("fraction of a pizza")
+    assert response["status"] == "success"
+    assert sorted(calls) == sorted([corpus_id] for corpus_id in corpus_ids)
+    assert response["results"][0]["source_uri"] == "gs://b/maths.txt"
@@ -0,0 +1,81 @@
+"""Resumable bulk imports and their checkpoints."""
+
+import json
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.bulk_import import (
+    ImportCheckpoint,
+    read_manifest,
+    run_bulk_import
+)
+
+URIS = [f"gs://b/doc-{i}.pdf" for i in range(7)]
+
+
+def _import(calls, fail_on=()):
+    def import_batch(batch):
+        calls.append(list(batch))
+        if any(uri in fail_on for uri in batch):
+            raise RuntimeError("operation already running")
+        return {"imported": len(batch), "skipped": 0, "failed": 0}
+
+    return import_batch
+
+
+def test_checkpoint_survives_a_restart(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = ImportCheckpoint(path, "c1")
+    checkpoint.record(["gs://b/a.pdf"], {"gs://b/b.pdf": "boom"})
+
+    reloaded = ImportCheckpoint(path, "c1")
+    assert reloaded.completed == {"gs://b/a.pdf"}
+    assert reloaded.failed == {"gs://b/b.pdf": "boom"}
+    assert ImportCheckpoint(path, "other-corpus").completed == set()
+
+    reloaded.record(["gs://b/b.pdf"], {})
+    assert ImportCheckpoint(path, "c1").failed == {}
+    assert json.loads(open(path).read())["completed"] == ["gs://b/a.pdf", "gs://b/b.pdf"]
+
+
+def test_imports_in_batches_and_skips_completed_uris():
+    calls = []
+    checkpoint = ImportCheckpoint(None, "c1")
+    checkpoint.record(URIS[:2], {})
+    summary = run_bulk_import(_import(calls), URIS + URIS[:1], checkpoint, batch_size=2, max_concurrency=2)
+    assert summary["total"] == 7 and summary["already_completed"] == 2
+    assert summary["imported"] == 5 and summary["failed"] == 0
+    assert sorted(uri for batch in calls for uri in batch) == URIS[2:]
+    assert max(len(batch) for batch in calls) == 2
+    assert checkpoint.completed == set(URIS)
+
+
+def test_failed_batches_are_retried_on_the_next_run(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    calls = []
+    summary = run_bulk_import(
+        _import(calls, fail_on={URIS[3]}), URIS, ImportCheckpoint(path, "c1"),
+        batch_size=2, max_concurrency=1, max_retries=1, retry_backoff_seconds=0
+    )
+    assert summary["failed_uris"].keys() == {URIS[2], URIS[3]}
+    assert len([batch for batch in calls if URIS[3] in batch]) == 2
+
+    calls.clear()
+    summary = run_bulk_import(_import(calls), URIS, ImportCheckpoint(path, "c1"), batch_size=2, max_concurrency=1)
+    assert calls == [[URIS[2], URIS[3]]]
+    assert summary["already_completed"] == 5 and summary["failed"] == 0
+
+
+def test_reported_file_failures_fail_the_whole_batch():
+    checkpoint = ImportCheckpoint(None, "c1")
+    summary = run_bulk_import(
+        lambda batch: {"imported": 1, "skipped": 0, "failed": 1}, URIS[:2], checkpoint, batch_size=2, max_concurrency=1
+    )
+    assert summary["failed"] == 2
+    assert checkpoint.completed == set()
+
+
+def test_manifests_are_json_lists_or_lines(tmp_path):
+    listing = tmp_path / "manifest.txt"
+    listing.write_text("# syllabus\ngs://b/a.pdf\n\n gs://b/b.pdf \n")
+    assert read_manifest(str(listing)) == ["gs://b/a.pdf", "gs://b/b.pdf"]
+    listing.write_text(json.dumps(["gs://b/a.pdf"]))
+    assert read_manifest(str(listing)) == ["gs://b/a.pdf"]
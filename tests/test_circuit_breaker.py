@@ -0,0 +1,83 @@
+"""Circuit breaker state transitions."""
+
+import time
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerRegistry
+)
+
+
+def _breaker(**overrides):
+    settings = dict(
+        window_size=4, min_calls=4, failure_rate=0.5, slow_call_seconds=1.0, open_seconds=0.05, half_open_probes=2
+    )
+    settings.update(overrides)
+    return CircuitBreaker(**settings)
+
+
+def _open(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record(False, error="unavailable")
+    assert breaker.state == OPEN
+
+
+def test_opens_once_enough_recent_calls_fail():
+    breaker = _breaker()
+    for success in (False, True, False):
+        breaker.record(success)
+    assert breaker.state == CLOSED  # Too few calls to judge
+    breaker.record(True, latency_seconds=2.0)  # Slow, so it counts as failed
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot()["last_error"] == "Slow call (2.0 s)"
+
+
+def test_half_open_probes_close_the_breaker():
+    breaker = _breaker()
+    _open(breaker)
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and breaker.allow()
+    assert not breaker.allow()  # Only half_open_probes in flight
+    breaker.record(True)
+    assert breaker.state == HALF_OPEN
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["failure_rate"] == 0.0
+
+
+def test_a_failed_probe_reopens_the_breaker():
+    breaker = _breaker()
+    _open(breaker)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(False, error="still down")
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["times_opened"] == 2
+
+
+def test_disabled_registries_allow_everything():
+    registry = CircuitBreakerRegistry(
+        enabled=False, window_size=1, min_calls=1, failure_rate=0.1, slow_call_seconds=1, open_seconds=60, half_open_probes=1
+    )
+    registry.record("c1", False)
+    assert registry.allow("c1")
+    assert registry.stats()["tracked_corpora"] == 0
+
+
+def test_searches_skip_corpora_with_open_breakers(local_backend, documents):
+    documents["gs://b/science.txt"] = "Photosynthesis makes food from sunlight."
+    corpus_id = corpus_tools.create_rag_corpus("Science")["corpus_id"]
+    corpus_tools.import_document_to_corpus(corpus_id, "gs://b/science.txt")
+    breaker = corpus_tools.corpus_breakers.get(corpus_id)
+    for _ in range(breaker.min_calls):
+        corpus_tools.corpus_breakers.record(corpus_id, False, error="unavailable")
+
+    response = corpus_tools.search_all_corpora("photosynthesis", vector_distance_threshold=1.0, response_format="verbose")
+    assert response["results"] == []
+    assert [corpus["corpus_id"] for corpus in response["skipped_corpora"]] == [corpus_id]
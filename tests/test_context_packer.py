@@ -0,0 +1,61 @@
+"""Token-budgeted packing of curriculum content."""
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.context_packer import pack_chunks, pack_text
+
+CONTENT = """# Photosynthesis for Class 7
+
+Green plants make their own food from sunlight, water and carbon dioxide in a process called photosynthesis. [Source: S1]
+
+Key points:
+- Chlorophyll in the leaves absorbs light energy for the reaction.
+- Stomata on the underside of leaves let carbon dioxide in and oxygen out.
+1) Water travels up from the roots through the xylem vessels.
+
+The Mauryan empire was founded by Chandragupta Maurya in ancient India. [Source: S2]"""
+
+
+def test_text_within_budget_round_trips_unchanged():
+    packed, report = pack_text(CONTENT, [], token_budget=10_000)
+    assert packed == CONTENT
+    assert report["tokens_saved"] == 0 and report["kept"] == report["chunks"]
+
+
+def test_tight_budgets_keep_the_best_blocks_in_order():
+    retrieved = [{
+        "text": "Green plants make their own food from sunlight, water and carbon dioxide in a process called photosynthesis.",
+        "score": 0.9,
+        "source": "S1"
+    }, {
+        "text": "Chlorophyll in the leaves absorbs light energy for the reaction.",
+        "score": 0.6,
+        "source": "S1"
+    }]
+    packed, report = pack_text(CONTENT, retrieved, token_budget=60)
+    assert report["packed_tokens"] <= 60 and report["tokens_saved"] > 0
+    assert packed.startswith("# Photosynthesis for Class 7\n\nGreen plants make their own food")
+    assert "Mauryan" not in packed
+    assert packed.index("Green plants") < packed.index("Chlorophyll")
+    # A kept list item stays on its own line under the heading before it
+    assert "Key points:\n- Chlorophyll" in packed
+
+
+def test_near_duplicates_keep_the_better_copy():
+    text = "Photosynthesis turns sunlight water and carbon dioxide into glucose and oxygen in green leaves"
+    kept, report = pack_chunks(
+        [{"text": text, "score": 0.5, "source": "a"}, {"text": text + " daily", "score": 0.9, "source": "b"}],
+        token_budget=1000
+    )
+    assert [chunk["source"] for chunk in kept] == ["b"]
+    assert report["duplicates_dropped"] == 1
+
+
+def test_source_decay_spreads_the_budget_across_sources():
+    chunks = [
+        {"text": "alpha " * 10, "score": 1.0, "source": "a"},
+        {"text": "beta " * 10, "score": 0.95, "source": "a"},
+        {"text": "gamma " * 10, "score": 0.9, "source": "b"}
+    ]
+    kept, _ = pack_chunks(chunks, token_budget=30, source_decay=0.5)
+    assert [chunk["source"] for chunk in kept] == ["a", "b"]
+    kept, _ = pack_chunks(chunks, token_budget=30, source_decay=1.0)
+    assert [chunk["source"] for chunk in kept] == ["a", "a"]
@@ -0,0 +1,70 @@
+"""Corpus catalog caching and file-listing invalidation."""
+
+import threading
+import time
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.corpus_catalog import CorpusCatalog
+
+
+def _wait_for_counts(catalog):
+    for _ in range(500):
+        with catalog._lock:
+            if not catalog._counts_in_flight:
+                return
+        time.sleep(0.01)
+    raise AssertionError("background file counts did not finish")
+
+
+def test_catalog_is_fetched_once_until_invalidated():
+    fetches = []
+    catalog = CorpusCatalog(lambda: fetches.append(1) or [{"id": "c1", "name": "c1"}], lambda _: 0, 60, 60)
+    assert catalog.get_corpora() == catalog.get_corpora() == [{"id": "c1", "name": "c1"}]
+    assert len(fetches) == 1
+    catalog.invalidate()
+    catalog.get_corpora()
+    assert len(fetches) == 2
+
+
+def test_file_counts_are_refreshed_in_the_background():
+    catalog = CorpusCatalog(lambda: [], lambda _: 2, 60, 60)
+    assert catalog.get_file_count("c1") is None
+    _wait_for_counts(catalog)
+    assert catalog.get_file_count("c1") == 2
+
+
+def test_a_count_started_before_invalidation_is_not_cached():
+    counting_started, release = threading.Event(), threading.Event()
+    files = ["gs://b/a.pdf"]
+
+    def count_files(corpus_id):
+        count = len(files)
+        counting_started.set()
+        release.wait(timeout=5)
+        return count
+
+    catalog = CorpusCatalog(lambda: [], count_files, 60, 60)
+    catalog.get_file_count("c1")
+    assert counting_started.wait(timeout=5)
+
+    # A file is imported while the old count is still running
+    files.append("gs://b/b.pdf")
+    catalog.invalidate_file_count("c1")
+    release.set()
+    _wait_for_counts(catalog)
+    with catalog._lock:
+        assert "c1" not in catalog._file_counts
+
+    assert catalog.get_file_count("c1") is None
+    _wait_for_counts(catalog)
+    assert catalog.get_file_count("c1") == 2
+
+
+def test_reset_drops_counts_in_flight():
+    release = threading.Event()
+    catalog = CorpusCatalog(lambda: [], lambda _: release.wait(timeout=5) and 1, 60, 60)
+    catalog.get_file_count("c1")
+    catalog.reset()
+    release.set()
+    _wait_for_counts(catalog)
+    with catalog._lock:
+        assert catalog._file_counts == {}
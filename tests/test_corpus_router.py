@@ -0,0 +1,60 @@
+"""Routing searches to corpora by grade, subject, board and language."""
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.corpus_router import (
+    CorpusRouter,
+    CorpusRouterCache,
+    extract_corpus_metadata,
+    extract_request_facets,
+    parse_facet_values
+)
+
+CORPORA = [
+    {"id": "sci8", "display_name": "Class 8 Science - CBSE", "description": ""},
+    {"id": "sci7", "display_name": "Class VII Science", "description": "NCERT textbook"},
+    {"id": "maths5", "display_name": "Grade 5 Maths (Tamil medium)", "description": ""},
+    {"id": "social", "display_name": "Social Science", "description": "grade: 6-8, board: state board"},
+    {"id": "dictionary", "display_name": "Hindi-English dictionary", "description": ""}
+]
+
+
+def test_facet_values_are_normalized():
+    assert parse_facet_values("grade", "Class VIII") == {"8"}
+    assert parse_facet_values("grade", "6 to 8") == {"6", "7", "8"}
+    assert parse_facet_values("subject", "Maths") == {"mathematics"}
+    assert parse_facet_values("board", "NCERT") == {"cbse"}
+    assert parse_facet_values("subject", "Astronomy") == {"astronomy"}
+
+
+def test_corpus_metadata_comes_from_names_and_tags():
+    metadata = extract_corpus_metadata(CORPORA[0])
+    assert (metadata["grade"], metadata["subject"], metadata["board"]) == ({"8"}, {"science"}, {"cbse"})
+    social = extract_corpus_metadata(CORPORA[3])
+    # "social science" is not also read as "science"
+    assert social["subject"] == {"social science"}
+    assert social["grade"] == {"6", "7", "8"} and social["board"] == {"state board"}
+
+
+def test_routes_to_matching_and_compatible_corpora():
+    router = CorpusRouter(CORPORA)
+    assert router.route({"grade": "8", "subject": "science"}) == {"sci8"}
+    assert router.route({"grade": "7"}) == {"sci7", "social"}
+    assert router.route({"language": "Hindi"}) == {"dictionary"}
+    # Nothing set, or nothing matching, searches every corpus
+    assert router.route({"grade": None}) is None
+    assert router.route({"subject": "astronomy"}) is None
+
+
+def test_request_facets_separate_medium_from_subject():
+    assert extract_request_facets("Class 7 science lessons in Tamil") == {
+        "grade": "7", "subject": "science", "board": None, "language": "tamil"
+    }
+    assert extract_request_facets("Teach Class 6 Hindi poems")["subject"] == "hindi"
+    assert extract_request_facets("Class 6 and class 7 revision")["grade"] is None
+
+
+def test_router_is_rebuilt_only_when_the_catalog_changes():
+    cache = CorpusRouterCache()
+    router = cache.get(CORPORA)
+    assert cache.get([dict(corpus) for corpus in CORPORA]) is router
+    renamed = CORPORA[:-1] + [{"id": "dictionary", "display_name": "Class 3 EVS", "description": ""}]
+    assert cache.get(renamed) is not router
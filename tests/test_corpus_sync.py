@@ -0,0 +1,145 @@
+"""Incremental corpus sync: the diff, the run and the lock."""
+
+import os
+import time
+
+import pytest
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.corpus_sync import (
+    SyncInProgressError,
+    SyncLock,
+    compute_sync_diff,
+    load_sync_manifest,
+    run_sync
+)
+
+PREFIX = "gs://b/syllabus/"
+
+
+def _object(name, generation=1, md5_hash="m"):
+    return {"uri": PREFIX + name, "generation": generation, "md5_hash": md5_hash}
+
+
+class _Corpus:
+    """In-memory corpus the sync imports into and deletes from."""
+
+    def __init__(self, *names):
+        self.files = {f"f-{name}": PREFIX + name for name in names}
+        self.failing = set()
+
+    def listing(self):
+        return [{"id": file_id, "source_uri": uri} for file_id, uri in self.files.items()]
+
+    def import_batch(self, uris):
+        if self.failing & set(uris):
+            raise RuntimeError("import failed")
+        for uri in uris:
+            self.files[f"f-{uri.rsplit('/', 1)[-1]}-{len(self.files)}"] = uri
+        return {"imported": len(uris), "skipped": 0, "failed": 0}
+
+    def delete_file(self, file_id):
+        del self.files[file_id]
+
+
+def _sync(corpus, objects, manifest_path, **kwargs):
+    return run_sync(
+        corpus_id="c1",
+        prefix_uri=PREFIX,
+        gcs_objects=objects,
+        corpus_files=corpus.listing(),
+        manifest_path=manifest_path,
+        import_batch=corpus.import_batch,
+        delete_file=corpus.delete_file,
+        batch_size=10,
+        max_concurrency=1,
+        max_retries=0,
+        **kwargs
+    )
+
+
+def test_diff_classifies_objects_and_files():
+    manifest = {PREFIX + "a.pdf": {"generation": 1, "md5_hash": "m"}, PREFIX + "b.pdf": {"generation": 1, "md5_hash": "m"}}
+    corpus_files = [
+        {"id": "1", "source_uri": PREFIX + "a.pdf"},
+        {"id": "2", "source_uri": PREFIX + "b.pdf"},
+        {"id": "3", "source_uri": PREFIX + "legacy.pdf"},
+        {"id": "4", "source_uri": PREFIX + "gone.pdf"},
+        {"id": "5", "source_uri": "gs://b/other/kept.pdf"}
+    ]
+    objects = [_object("a.pdf"), _object("b.pdf", generation=2), _object("legacy.pdf"), _object("new.pdf")]
+    diff = compute_sync_diff(objects, corpus_files, manifest, PREFIX)
+    assert diff["new"] == [PREFIX + "new.pdf"]
+    assert diff["changed"] == [PREFIX + "b.pdf"]
+    # Imported before syncing was used, so not re-embedded
+    assert diff["unchanged"] == [PREFIX + "a.pdf", PREFIX + "legacy.pdf"]
+    # Files outside the prefix are never removed
+    assert diff["removed"] == [PREFIX + "gone.pdf"]
+
+
+def test_sync_applies_the_diff_and_a_rerun_is_a_no_op(tmp_path):
+    manifest_path = str(tmp_path / "sync.json")
+    corpus = _Corpus("a.pdf", "gone.pdf")
+    objects = [_object("a.pdf"), _object("new.pdf")]
+
+    summary = _sync(corpus, objects, manifest_path)
+    assert (summary["imported"], summary["deleted"]) == (1, 1)
+    assert sorted(corpus.files.values()) == [PREFIX + "a.pdf", PREFIX + "new.pdf"]
+    assert set(load_sync_manifest(manifest_path, "c1")) == {PREFIX + "a.pdf", PREFIX + "new.pdf"}
+
+    summary = _sync(corpus, objects, manifest_path)
+    assert (summary["new_count"], summary["changed_count"], summary["removed_count"]) == (0, 0, 0)
+    assert summary["unchanged_count"] == 2
+
+
+def test_changed_objects_are_replaced(tmp_path):
+    manifest_path = str(tmp_path / "sync.json")
+    corpus = _Corpus()
+    _sync(corpus, [_object("a.pdf")], manifest_path)
+    summary = _sync(corpus, [_object("a.pdf", md5_hash="edited")], manifest_path)
+    assert summary["changed"] == [PREFIX + "a.pdf"]
+    assert (summary["deleted"], summary["imported"]) == (1, 1)
+    assert list(corpus.files.values()) == [PREFIX + "a.pdf"]
+    assert load_sync_manifest(manifest_path, "c1")[PREFIX + "a.pdf"]["md5_hash"] == "edited"
+
+
+def test_failed_imports_are_picked_up_by_the_next_run(tmp_path):
+    manifest_path = str(tmp_path / "sync.json")
+    corpus = _Corpus()
+    corpus.failing = {PREFIX + "a.pdf"}
+    summary = _sync(corpus, [_object("a.pdf")], manifest_path)
+    assert PREFIX + "a.pdf" in summary["failed_uris"]
+    assert load_sync_manifest(manifest_path, "c1") == {}
+
+    corpus.failing = set()
+    assert _sync(corpus, [_object("a.pdf")], manifest_path)["imported"] == 1
+
+
+def test_an_empty_listing_deletes_nothing(tmp_path):
+    corpus = _Corpus("a.pdf")
+    summary = _sync(corpus, [], str(tmp_path / "sync.json"))
+    assert summary["deleted"] == 0 and summary["warnings"]
+    assert list(corpus.files.values()) == [PREFIX + "a.pdf"]
+
+
+def test_dry_runs_change_nothing(tmp_path):
+    manifest_path = str(tmp_path / "sync.json")
+    corpus = _Corpus("gone.pdf")
+    summary = _sync(corpus, [_object("new.pdf")], manifest_path, dry_run=True)
+    assert (summary["new"], summary["removed"]) == ([PREFIX + "new.pdf"], [PREFIX + "gone.pdf"])
+    assert list(corpus.files.values()) == [PREFIX + "gone.pdf"]
+    assert not os.path.exists(manifest_path)
+
+
+def test_lock_refuses_overlapping_runs_and_takes_over_stale_ones(tmp_path):
+    path = str(tmp_path / "sync.json.lock")
+    with SyncLock(path, stale_after_seconds=60):
+        with pytest.raises(SyncInProgressError):
+            with SyncLock(path, stale_after_seconds=60):
+                pass
+    assert not os.path.exists(path)
+
+    open(path, "w").close()
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+    with SyncLock(path, stale_after_seconds=60):
+        assert os.path.exists(path)
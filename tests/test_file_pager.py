@@ -0,0 +1,54 @@
+import threading
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.file_pager import (
+    count_items,
+    iter_items,
+    iter_pages
+)
+
+
+def _fetcher(total, page_size, calls):
+    def fetch_page(page_token):
+        calls.append(page_token)
+        start = int(page_token or 0)
+        items = [{"id": i} for i in range(start, min(start + page_size, total))]
+        end = start + page_size
+        return items, str(end) if end < total else None
+    return fetch_page
+
+
+def test_iter_items_walks_every_page_with_and_without_prefetch():
+    for prefetch in (True, False):
+        calls = []
+        assert [item["id"] for item in iter_items(_fetcher(7, 3, calls), prefetch=prefetch)] == list(range(7))
+        assert calls == [None, "3", "6"]
+
+
+def test_next_page_is_fetched_while_the_current_one_is_consumed():
+    second_page_requested = threading.Event()
+
+    def fetch_page(page_token):
+        if page_token:
+            second_page_requested.set()
+            return [{"id": 1}], None
+        return [{"id": 0}], "1"
+
+    pages = iter_pages(fetch_page)
+    next(pages)
+    # The first page is still being consumed, yet the second is already on its way
+    assert second_page_requested.wait(timeout=5)
+    assert [items for items, _ in pages] == [[{"id": 1}]]
+
+
+def test_iteration_can_start_mid_listing_and_stop_early():
+    calls = []
+    pages = iter_pages(_fetcher(10, 2, calls), page_token="4", prefetch=False)
+    assert next(pages) == ([{"id": 4}, {"id": 5}], "6")
+    pages.close()
+    assert calls == ["4"]
+
+
+def test_count_items_sums_the_pages():
+    calls = []
+    assert count_items(_fetcher(5, 2, calls)) == 5
+    assert count_items(_fetcher(0, 2, [])) == 0
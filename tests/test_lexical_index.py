@@ -0,0 +1,52 @@
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.lexical_index import (
+    BM25Index,
+    canonical_query,
+    rank_by_bm25,
+    reciprocal_rank_fusion,
+    tokenize
+)
+
+
+def test_tokenize_keeps_indic_words_whole():
+    # Devanagari vowel signs and viramas continue the word
+    assert tokenize("प्रकाश संश्लेषण!") == ["प्रकाश", "संश्लेषण"]
+    assert tokenize("ஒளிச்சேர்க்கை") == ["ஒளிச்சேர்க்கை"]
+    assert tokenize("Class ७ Science") == ["class", "7", "science"]
+
+
+def test_canonical_query_drops_filler_words():
+    assert canonical_query("Please make a lesson plan to teach photosynthesis for class 7") == (
+        "photosynthesis 7", ("7",)
+    )
+    assert canonical_query("Teach photosynthesis")[0] == canonical_query("photosynthesis lesson")[0]
+
+
+def test_bm25_ranks_term_matches_and_forgets_removed_documents():
+    index = BM25Index()
+    index.add("fractions", "a fraction is part of a whole")
+    index.add("plants", "plants make food by photosynthesis using sunlight")
+    index.add("light", "sunlight is light from the sun")
+
+    assert [doc_id for doc_id, _ in index.search("photosynthesis sunlight", 3)] == ["plants", "light"]
+    index.remove("plants")
+    assert [doc_id for doc_id, _ in index.search("photosynthesis sunlight", 3)] == ["light"]
+    assert len(index) == 2
+
+
+def test_rank_by_bm25_keeps_only_matching_candidates():
+    results = [{"text": "fractions of a pizza", "relevance_score": 0.9}, {"text": "plants and sunlight", "relevance_score": 0.2}]
+    ranked = rank_by_bm25(results, "sunlight")
+    assert [r["text"] for r in ranked] == ["plants and sunlight"]
+    assert ranked[0]["relevance_score"] > 0
+    assert results[1]["relevance_score"] == 0.2
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    shared = {"corpus_id": "c", "source_uri": "gs://b/a.txt", "text": "shared", "relevance_score": 0.5}
+    vector = [{"corpus_id": "c", "source_uri": "gs://b/v.txt", "text": "vector only", "relevance_score": 0.9}, shared]
+    lexical = [dict(shared, relevance_score=7.0)]
+
+    fused = reciprocal_rank_fusion({"vector": vector, "lexical": lexical}, top_k=2)
+    assert [r["text"] for r in fused] == ["shared", "vector only"]
+    assert fused[0]["vector_score"] == 0.5 and fused[0]["lexical_score"] == 7.0
+    assert fused[1]["lexical_score"] is None
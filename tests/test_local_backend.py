@@ -0,0 +1,155 @@
+import threading
+
+import pytest
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.backends.local import (
+    HashingEmbedder,
+    LocalVectorBackend,
+    VectorIndex,
+    chunk_text
+)
+
+PHOTOSYNTHESIS = (
+    "Photosynthesis is the process by which green plants use sunlight to make food "
+    "from carbon dioxide and water."
+)
+FRACTIONS = "A fraction names a part of a whole, such as one half or three quarters of a pizza."
+
+
+def test_chunk_text_overlaps_and_covers_every_word():
+    words = [f"w{i}" for i in range(25)]
+    chunks = chunk_text(" ".join(words), chunk_size=10, chunk_overlap=2)
+    assert chunks[0].split() == words[:10]
+    assert chunks[1].split()[:2] == words[8:10]
+    assert chunks[-1].split()[-1] == "w24"
+    assert chunk_text("   ", 10, 2) == []
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dimensions=64)
+    first, second = embedder(["fractions of a pizza", "fractions of a pizza"])
+    assert (first == second).all()
+    assert abs(float((first ** 2).sum()) - 1.0) < 1e-5
+
+
+def test_ivf_search_finds_the_exact_best_match():
+    embedder = HashingEmbedder(dimensions=64)
+    texts = [f"topic {i} chapter {i * 7}" for i in range(200)]
+    index = VectorIndex(64, nprobe=64)
+    index.add([str(i) for i in range(200)], embedder(texts))
+    query = embedder(["topic 42 chapter 294"])[0]
+    assert index.search(query, 1)[0][0] == "42"
+    assert index.search(query, 1, approximate=True)[0][0] == "42"
+
+
+def test_retrieve_attributes_results_and_applies_the_distance_threshold():
+    backend = LocalVectorBackend(chunk_size=50, chunk_overlap=0)
+    science = backend.create_corpus("Science", "", "model")["id"]
+    maths = backend.create_corpus("Maths", "", "model")["id"]
+    backend.add_document(science, PHOTOSYNTHESIS, source_uri="gs://b/science.txt")
+    backend.add_document(maths, FRACTIONS, source_uri="gs://b/maths.txt")
+
+    results = backend.retrieve([science, maths], "photosynthesis sunlight plants", top_k=5, vector_distance_threshold=1.0)
+    assert results[0]["corpus_id"] == science
+    assert results[0]["source_uri"] == "gs://b/science.txt"
+    assert [r["relevance_score"] for r in results] == sorted((r["relevance_score"] for r in results), reverse=True)
+
+    strict = backend.retrieve([science, maths], "photosynthesis sunlight plants", top_k=5, vector_distance_threshold=0.0)
+    assert strict == []
+
+
+def test_reimporting_a_source_replaces_or_skips_it():
+    sources = {"gs://b/science.txt": PHOTOSYNTHESIS}
+    backend = LocalVectorBackend(chunk_size=5, chunk_overlap=0, read_source=sources.__getitem__)
+    corpus_id = backend.create_corpus("Science", "", "model")["id"]
+
+    assert backend.import_files(corpus_id, ["gs://b/science.txt", "gs://b/missing.txt"]) == {
+        "imported": 1, "skipped": 0, "failed": 1
+    }
+    assert backend.import_files(corpus_id, ["gs://b/science.txt"])["skipped"] == 1
+
+    sources["gs://b/science.txt"] = FRACTIONS
+    assert backend.import_files(corpus_id, ["gs://b/science.txt"])["imported"] == 1
+    assert len(backend.list_files(corpus_id)[0]) == 1
+    texts = [r["text"] for r in backend.lexical_retrieve([corpus_id], "photosynthesis", top_k=5)]
+    assert texts == []
+
+
+def test_list_files_pages_through_every_file():
+    backend = LocalVectorBackend()
+    corpus_id = backend.create_corpus("Science", "", "model")["id"]
+    for i in range(5):
+        backend.add_document(corpus_id, f"document {i}", source_uri=f"gs://b/{i}.txt")
+
+    first, token = backend.list_files(corpus_id, page_size=2)
+    second, token = backend.list_files(corpus_id, page_size=2, page_token=token)
+    third, token = backend.list_files(corpus_id, page_size=2, page_token=token)
+    assert token is None
+    assert [f["source_uri"] for f in first + second + third] == [f"gs://b/{i}.txt" for i in range(5)]
+    assert all("_content_hash" not in f for f in first)
+
+
+def test_deleting_a_corpus_or_file_removes_its_chunks():
+    backend = LocalVectorBackend()
+    corpus_id = backend.create_corpus("Science", "", "model")["id"]
+    rag_file = backend.add_document(corpus_id, PHOTOSYNTHESIS, source_uri="gs://b/science.txt")
+    backend.delete_file(corpus_id, rag_file["id"])
+    assert backend.retrieve([corpus_id], "photosynthesis", top_k=5, vector_distance_threshold=1.0) == []
+    with pytest.raises(KeyError):
+        backend.delete_file(corpus_id, rag_file["id"])
+
+    backend.delete_corpus(corpus_id)
+    with pytest.raises(KeyError):
+        backend.get_corpus(corpus_id)
+
+
+def test_corpus_tools_run_against_the_local_backend(local_backend, documents):
+    documents["gs://b/science.txt"] = PHOTOSYNTHESIS
+    corpus_id = corpus_tools.create_rag_corpus("Class 7 Science")["corpus_id"]
+    assert corpus_tools.import_document_to_corpus(corpus_id, "gs://b/science.txt")["status"] == "success"
+
+    response = corpus_tools.query_rag_corpus(corpus_id, "photosynthesis sunlight", vector_distance_threshold=1.0)
+    assert response["status"] == "success"
+    assert response["results"][0]["source_uri"] == "gs://b/science.txt"
+
+    assert corpus_tools.delete_rag_corpus(corpus_id)["status"] == "success"
+    assert corpus_tools.query_rag_corpus(corpus_id, "photosynthesis")["status"] == "error"
+
+
+def test_counting_files_walks_the_pages(local_backend, documents):
+    corpus_id = corpus_tools.create_rag_corpus("Class 7 Science")["corpus_id"]
+    for i in range(5):
+        documents[f"gs://b/{i}.txt"] = f"{PHOTOSYNTHESIS} Part {i}."
+    local_backend.import_files(corpus_id, list(documents))
+    pages = []
+    list_files = local_backend.list_files
+    local_backend.list_files = lambda *args, **kwargs: pages.append(kwargs["page_token"]) or list_files(*args, **kwargs)
+
+    response = corpus_tools.list_rag_files(corpus_id, page_size=2, count_only=True)
+    assert response["count"] == 5
+    assert "files" not in response
+    assert pages == [None, "2", "4"]
+
+
+def test_refreshed_file_counts_walk_each_corpus_concurrently(local_backend, documents):
+    corpus_ids = [corpus_tools.create_rag_corpus(name)["corpus_id"] for name in ("Science", "Maths")]
+    for corpus_id, files in zip(corpus_ids, (3, 1)):
+        uris = [f"gs://b/{corpus_id}/{i}.txt" for i in range(files)]
+        documents.update({uri: f"{PHOTOSYNTHESIS} Part {uri}." for uri in uris})
+        local_backend.import_files(corpus_id, uris)
+    # Both first pages must be requested before either is served
+    both_listing = threading.Barrier(2, timeout=5)
+    list_files = local_backend.list_files
+
+    def first_pages_together(corpus_id, **kwargs):
+        if kwargs["page_token"] is None:
+            both_listing.wait()
+        return list_files(corpus_id, **kwargs)
+
+    local_backend.list_files = first_pages_together
+    response = corpus_tools.list_rag_corpora(refresh_file_counts=True)
+    assert {corpus["id"]: corpus["files_count"] for corpus in response["corpora"]} == dict(zip(corpus_ids, (3, 1)))
+
+    local_backend.list_files = list_files
+    assert corpus_tools.get_rag_corpus(corpus_ids[0])["files_count"] == 3
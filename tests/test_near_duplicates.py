@@ -0,0 +1,78 @@
+"""MinHash collapsing of near-duplicate search results."""
+
+import random
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.near_duplicates import (
+    collapse_near_duplicates,
+    estimated_similarity,
+    minhash_signature
+)
+
+PARAGRAPH = (
+    "Photosynthesis is the process by which green plants and some other organisms use sunlight to "
+    "synthesize foods from carbon dioxide and water. Photosynthesis in plants generally involves the "
+    "green pigment chlorophyll and generates oxygen as a byproduct."
+)
+
+
+def _result(text, corpus_id, score):
+    return {
+        "text": text,
+        "corpus_id": corpus_id,
+        "corpus_name": corpus_id.upper(),
+        "citation": f"[Source: {corpus_id}]",
+        "source_uri": f"gs://{corpus_id}/ch1.pdf",
+        "relevance_score": score
+    }
+
+
+def test_signatures_estimate_jaccard_similarity():
+    assert minhash_signature("   ") is None
+    signature = minhash_signature(PARAGRAPH)
+    assert len(signature) == 64 and signature == minhash_signature(PARAGRAPH.upper())
+    assert estimated_similarity(signature, minhash_signature(PARAGRAPH + " It happens in leaves.")) > 0.8
+
+    words = [f"word{i}" for i in range(200)]
+    unrelated = minhash_signature(" ".join(random.Random(7).sample(words, 50)))
+    assert estimated_similarity(signature, unrelated) < 0.2
+
+
+def test_copies_collapse_into_the_best_ranked_result():
+    results = [
+        _result(PARAGRAPH, "cbse", 0.9),
+        _result("Fractions name parts of a whole.", "maths", 0.85),
+        _result(PARAGRAPH.replace("generally ", ""), "stateboard", 0.8),
+        _result("", "empty", 0.1)
+    ]
+    kept, collapsed = collapse_near_duplicates(results, threshold=0.7)
+    assert collapsed == 1
+    assert [result["corpus_id"] for result in kept] == ["cbse", "maths", "empty"]
+    assert kept[0]["duplicates"] == [{
+        "corpus_id": "stateboard",
+        "corpus_name": "STATEBOARD",
+        "citation": "[Source: stateboard]",
+        "source_uri": "gs://stateboard/ch1.pdf",
+        "relevance_score": 0.8
+    }]
+
+
+def test_distinct_passages_are_all_kept():
+    results = [_result(f"Chapter {i}: " + " ".join(f"topic{i}-{j}" for j in range(30)), f"c{i}", 1.0) for i in range(20)]
+    kept, collapsed = collapse_near_duplicates(results)
+    assert collapsed == 0 and len(kept) == 20
+
+
+def test_devanagari_copies_are_compared_by_whole_words():
+    paragraph = (
+        "प्रकाश संश्लेषण वह प्रक्रिया है जिसके द्वारा हरे पौधे सूर्य के प्रकाश की उपस्थिति में "
+        "कार्बन डाइऑक्साइड और जल से अपना भोजन बनाते हैं। इस प्रक्रिया में ऑक्सीजन गैस मुक्त होती है।"
+    )
+    results = [
+        _result(paragraph, "cbse", 0.9),
+        _result(paragraph.replace("मुक्त होती", "बाहर निकलती"), "stateboard", 0.8)
+    ]
+    kept, collapsed = collapse_near_duplicates(results, threshold=0.7)
+    assert collapsed == 1 and kept[0]["duplicates"][0]["corpus_id"] == "stateboard"
+
+    # Words that differ only in their vowel signs are different words
+    assert estimated_similarity(minhash_signature("दिन में पानी पीना"), minhash_signature("दान में पीना पानी")) < 0.5
@@ -0,0 +1,99 @@
+"""Token buckets, the priority queue of waiters and the stores behind them."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.rate_limiter import (
+    MemoryBucketStore,
+    RateLimiter,
+    RateLimitTimeout,
+    SQLiteBucketStore
+)
+
+
+def _limiter(rate=10.0, burst=2.0, store=None, max_wait_seconds=1.0):
+    return RateLimiter("test", rate, burst, store or MemoryBucketStore(), max_wait_seconds)
+
+
+def test_burst_goes_out_at_once_then_calls_wait_for_tokens():
+    limiter = _limiter(rate=20.0, burst=2.0)
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.04
+    stats = limiter.stats()
+    assert (stats["granted"], stats["waited"], stats["queue_depth"]) == (3, 1, 0)
+
+
+def test_waiting_past_the_deadline_raises_and_leaves_the_queue():
+    limiter = _limiter(rate=0.1, burst=1.0)
+    limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(timeout=0.05)
+    assert limiter.queue_depth == 0
+    assert limiter.stats()["timed_out"] == 1
+
+
+def test_higher_priority_waiters_are_served_first():
+    limiter = _limiter(rate=10.0, burst=1.0)
+    limiter.acquire()
+    order = []
+    blocker = threading.Thread(target=lambda: (limiter.acquire(priority=0), order.append("low")))
+    blocker.start()
+    while limiter.queue_depth == 0:
+        time.sleep(0.001)
+    limiter.acquire(priority=10)
+    order.append("high")
+    blocker.join()
+    assert order == ["high", "low"]
+
+
+def test_disabled_limiters_never_wait():
+    limiter = _limiter(rate=0.0)
+    for _ in range(100):
+        limiter.acquire(timeout=0.0)
+    assert limiter.stats()["granted"] == 0
+
+
+class _SlowStore(MemoryBucketStore):
+    """A store whose takes block like a contended SQLite transaction."""
+
+    limiter = None
+
+    def __init__(self):
+        super().__init__()
+        self.lock_held_during_take = []
+
+    def take(self, *args, **kwargs):
+        self.lock_held_during_take.append(self.limiter._lock.locked())
+        time.sleep(0.1)
+        return super().take(*args, **kwargs)
+
+
+def test_async_takes_run_off_the_event_loop_without_the_queue_lock():
+    store = _SlowStore()
+    limiter = store.limiter = _limiter(store=store)
+    ticks = []
+
+    async def tick():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(limiter.acquire_async(), tick())
+
+    asyncio.run(main())
+    # The loop kept running while the take slept
+    assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.09
+    assert store.lock_held_during_take == [False]
+
+
+def test_sqlite_buckets_are_shared_between_stores(tmp_path):
+    path = str(tmp_path / "buckets.sqlite")
+    first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+    assert first.take("model", rate=0.01, burst=1.0) == 0.0
+    assert second.take("model", rate=0.01, burst=1.0) > 0.0
@@ -0,0 +1,73 @@
+"""Compact encoding of search responses."""
+
+import json
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.response_format import (
+    compact_search_response,
+    estimate_tokens,
+    truncate_to_tokens
+)
+
+
+def _result(text, corpus_id, source_uri, score, **extra):
+    return {
+        "text": text,
+        "corpus_id": corpus_id,
+        "corpus_name": corpus_id.title(),
+        "source_uri": source_uri,
+        "relevance_score": score,
+        "citation": f"[Source: {corpus_id.title()} ({corpus_id})] File: {source_uri.rsplit('/', 1)[-1]}",
+        **extra
+    }
+
+
+def _verbose():
+    results = [
+        _result("Plants make food from sunlight.", "science", "gs://b/ch1.pdf", 0.91234,
+                duplicates=[_result("Plants make food.", "evs", "gs://b/evs.pdf", 0.8)]),
+        _result("Chlorophyll absorbs light.", "science", "gs://b/ch1.pdf", 0.8),
+        _result("Leaves release oxygen.", "science", "gs://b/ch2.pdf", 0.7)
+    ]
+    return {
+        "status": "success",
+        "query": "photosynthesis",
+        "count": len(results),
+        "results": results,
+        "corpus_results": {"Science": {"results": results}},
+        "searched_corpora": ["Science"],
+        "timed_out_corpora": [],
+        "message": "Found 3 results"
+    }
+
+
+def test_each_source_is_cited_once():
+    compact = compact_search_response(_verbose())
+    assert [(r["source"], r["score"]) for r in compact["results"]] == [("S1", 0.912), ("S1", 0.8), ("S3", 0.7)]
+    assert compact["results"][0]["also_in"] == ["S2"]
+    assert compact["citations"] == {
+        "S1": "[Source: Science (science)] File: ch1.pdf",
+        "S2": "[Source: Evs (evs)] File: evs.pdf",
+        "S3": "[Source: Science (science)] File: ch2.pdf"
+    }
+    # Empty fields are dropped, the rest pass through
+    assert "timed_out_corpora" not in compact and compact["searched_corpora"] == ["Science"]
+    assert "corpus_results" not in compact
+    assert len(json.dumps(compact)) < len(json.dumps(_verbose()))
+
+
+def test_chunks_are_truncated_at_word_boundaries():
+    text = "photosynthesis " * 40
+    cut = truncate_to_tokens(text, 10)
+    assert cut.endswith(" …") and len(cut) <= 42 and estimate_tokens(cut) <= 11
+    assert truncate_to_tokens("short text", 10) == "short text"
+
+    response = _verbose()
+    response["results"][2]["text"] = text
+    compact = compact_search_response(response, max_chunk_tokens=10)
+    assert compact["results"][2]["truncated"] is True
+    assert "truncated" not in compact["results"][0]
+
+
+def test_errors_pass_through_unchanged():
+    error = {"status": "error", "error_message": "boom", "message": "Failed"}
+    assert compact_search_response(error) is error
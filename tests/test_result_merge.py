@@ -0,0 +1,52 @@
+import pytest
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.result_merge import (
+    TopKMerger,
+    normalize_scores
+)
+
+
+def _results(corpus, *scores):
+    return [{"corpus": corpus, "text": f"{corpus}-{i}", "relevance_score": score} for i, score in enumerate(scores)]
+
+
+def test_normalize_scores_handles_flat_corpora():
+    assert normalize_scores([1.0, 3.0], "minmax") == [0.0, 1.0]
+    assert normalize_scores([1.0, 3.0], "zscore") == [-1.0, 1.0]
+    assert normalize_scores([2.0, 2.0], "minmax") == [1.0, 1.0]
+    assert normalize_scores([2.0, 2.0], "zscore") == [0.0, 0.0]
+    with pytest.raises(ValueError):
+        normalize_scores([1.0], "softmax")
+
+
+def test_merger_keeps_the_global_top_k_in_order():
+    merger = TopKMerger(max_results=3)
+    merger.add(_results("a", 0.9, 0.4, 0.1))
+    merger.add(_results("b", 0.8, 0.5))
+    assert [r["text"] for r in merger.results()] == ["a-0", "b-0", "b-1"]
+    assert merger.candidate_count == 5
+    assert len(merger) == 3
+
+
+def test_equal_scores_keep_insertion_order():
+    merger = TopKMerger(max_results=2)
+    merger.add(_results("a", 0.5))
+    merger.add(_results("b", 0.5))
+    merger.add(_results("c", 0.5))
+    assert [r["text"] for r in merger.results()] == ["a-0", "b-0"]
+
+
+def test_minmax_normalization_ranks_corpora_on_a_common_scale():
+    merger = TopKMerger(max_results=2, normalization="minmax")
+    # A BM25-style corpus with large raw scores and a cosine-similarity one
+    merger.add(_results("bm25", 12.0, 11.0, 2.0))
+    merger.add(_results("vector", 0.9, 0.1))
+    top = merger.results()
+    assert {r["corpus"] for r in top} == {"bm25", "vector"}
+    assert all(r["normalized_score"] == 1.0 for r in top)
+
+
+def test_missing_scores_rank_as_zero_and_no_limit_keeps_everything():
+    merger = TopKMerger(max_results=None)
+    merger.add([{"text": "unscored"}, {"text": "scored", "relevance_score": 0.2}])
+    assert [r["text"] for r in merger.results()] == ["scored", "unscored"]
@@ -0,0 +1,88 @@
+"""The LRU + TTL retrieval cache and its invalidation by corpus tools."""
+
+import time
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.retrieval_cache import (
+    RetrievalCache,
+    make_retrieval_key,
+    normalize_query
+)
+
+
+def _response(text="x"):
+    return {"status": "success", "results": [{"text": text}]}
+
+
+def test_keys_ignore_case_and_spacing():
+    assert normalize_query("  Photosynthesis\tCLASS 7 ") == "photosynthesis class 7"
+    assert make_retrieval_key("c1", "Fractions  Class 5", 5, 0.5) == make_retrieval_key("c1", "fractions class 5", 5, 0.5)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = RetrievalCache(max_entries=2, max_bytes=1 << 20, ttl_seconds=60)
+    cache.put(("c1", "a"), _response("a"))
+    cache.put(("c1", "b"), _response("b"))
+    assert cache.get(("c1", "a")) is not None
+    cache.put(("c1", "c"), _response("c"))
+    assert cache.get(("c1", "b")) is None
+    assert cache.get(("c1", "a"))["results"][0]["text"] == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_bounds_the_cache():
+    cache = RetrievalCache(max_entries=100, max_bytes=1000, ttl_seconds=60)
+    cache.put(("c1", "huge"), _response("x" * 2000))
+    assert cache.get(("c1", "huge")) is None
+    for i in range(10):
+        cache.put(("c1", i), _response("y" * 200))
+    assert cache.stats()["bytes"] <= 1000
+
+
+def test_entries_expire_after_the_ttl():
+    cache = RetrievalCache(max_entries=10, max_bytes=1 << 20, ttl_seconds=0.05)
+    cache.put(("c1", "a"), _response())
+    time.sleep(0.06)
+    assert cache.get(("c1", "a")) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cached_responses_are_copies():
+    cache = RetrievalCache(max_entries=10, max_bytes=1 << 20, ttl_seconds=60)
+    response = _response()
+    cache.put(("c1", "a"), response)
+    response["results"][0]["text"] = "changed"
+    cache.get(("c1", "a"))["results"][0]["citation"] = "annotated"
+    assert cache.get(("c1", "a"))["results"][0] == {"text": "x"}
+
+
+def test_invalidating_a_corpus_keeps_the_others():
+    cache = RetrievalCache(max_entries=10, max_bytes=1 << 20, ttl_seconds=60)
+    cache.put(("c1", "a"), _response())
+    cache.put(("c1", "b"), _response())
+    cache.put(("c2", "a"), _response())
+    assert cache.invalidate_corpus("c1") == 2
+    assert cache.get(("c1", "a")) is None
+    assert cache.get(("c2", "a")) is not None
+
+
+def test_importing_or_deleting_files_invalidates_cached_queries(local_backend, documents):
+    documents["gs://b/science.txt"] = "Photosynthesis makes food from sunlight."
+    documents["gs://b/more.txt"] = "Photosynthesis takes place in chloroplasts."
+    corpus_id = corpus_tools.create_rag_corpus("Science")["corpus_id"]
+    corpus_tools.import_document_to_corpus(corpus_id, "gs://b/science.txt")
+
+    def sources():
+        response = corpus_tools.query_rag_corpus(corpus_id, "photosynthesis", vector_distance_threshold=1.0)
+        return sorted(result["source_uri"] for result in response["results"])
+
+    assert sources() == ["gs://b/science.txt"]
+    assert sources() == ["gs://b/science.txt"]
+    assert corpus_tools.retrieval_cache.stats()["hits"] == 1
+
+    corpus_tools.import_document_to_corpus(corpus_id, "gs://b/more.txt")
+    assert sources() == ["gs://b/more.txt", "gs://b/science.txt"]
+
+    file_id = next(f["id"] for f in local_backend.list_files(corpus_id)[0] if f["source_uri"] == "gs://b/science.txt")
+    assert corpus_tools.delete_rag_file(corpus_id, file_id)["status"] == "success"
+    assert sources() == ["gs://b/more.txt"]
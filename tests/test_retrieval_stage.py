@@ -0,0 +1,53 @@
+"""The deterministic curriculum retrieval stage."""
+
+import asyncio
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from lesson_planner.sub_agents.curriculum_content_retriever.retrieval_stage import (
+    RETRIEVAL_REPORT_KEY,
+    build_search,
+    retrieval_stage
+)
+from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+
+
+def test_build_search_keeps_content_words_and_named_facets():
+    query, filters = build_search("Create a weekly lesson plan for Class 7 science on photosynthesis, CBSE")
+    assert "photosynthesis" in query.split()
+    assert "weekly" not in query.split() and "plan" not in query.split()
+    assert filters == {"grade_level": "7", "subject_area": "science", "board": "cbse"}
+
+
+def _run(agent, text):
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="test")
+        session = await runner.session_service.create_session(app_name="test", user_id="teacher")
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        async for _ in runner.run_async(user_id="teacher", session_id=session.id, new_message=message):
+            pass
+        session = await runner.session_service.get_session(app_name="test", user_id="teacher", session_id=session.id)
+        return session.state
+
+    return asyncio.run(run())
+
+
+def test_stage_writes_cited_passages_without_a_model(local_backend, documents):
+    documents["gs://b/science.txt"] = "Photosynthesis is how green plants make food from sunlight and water."
+    corpus_id = corpus_tools.create_rag_corpus("Science")["corpus_id"]
+    corpus_tools.import_document_to_corpus(corpus_id, "gs://b/science.txt")
+
+    stage = retrieval_stage.model_copy(update={"parent_agent": None})
+    state = _run(stage, "Plan a week of lessons on photosynthesis")
+    content = state["curriculum_content"]
+    assert "Photosynthesis is how green plants make food" in content
+    assert "## Citations" in content and "science.txt" in content
+    report = state[RETRIEVAL_REPORT_KEY]
+    assert (report["status"], report["results"]) == ("success", 1)
+
+
+def test_stage_reports_an_empty_search(local_backend):
+    stage = retrieval_stage.model_copy(update={"parent_agent": None})
+    state = _run(stage, "Plan a week of lessons on fractions")
+    assert state["curriculum_content"].startswith("No curriculum content")
@@ -0,0 +1,108 @@
+"""Retries, the retry budget and hedged requests."""
+
+import threading
+import time
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.retry_policy import (
+    LatencyWindow,
+    RetrievalPolicy,
+    RetryBudget
+)
+
+
+def _flaky(failures, error=api_exceptions.ServiceUnavailable("try again")):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error
+        return "ok"
+
+    return fn, calls
+
+
+def test_transient_errors_are_retried():
+    fn, calls = _flaky(2)
+    policy = RetrievalPolicy(max_attempts=3, base_delay=0.001)
+    assert policy.call(fn) == "ok"
+    assert len(calls) == 3
+    assert policy.stats()["retries"] == 2
+
+
+def test_other_errors_and_the_last_attempt_raise():
+    fn, calls = _flaky(1, error=api_exceptions.NotFound("no such corpus"))
+    with pytest.raises(api_exceptions.NotFound):
+        RetrievalPolicy(max_attempts=3, base_delay=0.001).call(fn)
+    assert len(calls) == 1
+
+    fn, calls = _flaky(5)
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        RetrievalPolicy(max_attempts=2, base_delay=0.001).call(fn)
+    assert len(calls) == 2
+
+
+def test_the_budget_caps_retries_when_everything_fails():
+    budget = RetryBudget(ratio=0.5, max_tokens=1.0)
+    assert budget.try_spend() and not budget.try_spend()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_spend()
+
+    policy = RetrievalPolicy(max_attempts=3, base_delay=0.001)
+    policy.budget = RetryBudget(ratio=0.0, max_tokens=1.0)
+    for _ in range(3):
+        with pytest.raises(api_exceptions.ServiceUnavailable):
+            policy.call(_flaky(5)[0])
+    assert policy.stats()["retries"] == 1
+    assert policy.stats()["retries_denied"] == 3
+
+
+def test_latency_percentiles_use_nearest_rank():
+    window = LatencyWindow()
+    assert window.percentile(95) is None
+    for seconds in range(1, 101):
+        window.record(seconds / 100)
+    assert window.percentile(50) == 0.5
+    assert window.percentile(95) == 0.95
+
+
+def test_slow_calls_are_hedged_and_the_faster_attempt_wins():
+    policy = RetrievalPolicy(hedge=True, hedge_percentile=50, hedge_min_samples=5)
+    for _ in range(5):
+        policy.call(lambda: time.sleep(0.01))
+
+    attempts = []
+    lock = threading.Lock()
+
+    def first_attempt_stalls():
+        with lock:
+            attempts.append(1)
+            attempt = len(attempts)
+        time.sleep(0.5 if attempt == 1 else 0.01)
+        return attempt
+
+    started = time.monotonic()
+    assert policy.call(first_attempt_stalls) == 2
+    assert time.monotonic() - started < 0.3
+    stats = policy.stats()
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_nothing_is_retried_or_hedged_past_the_deadline():
+    fn, calls = _flaky(2)
+    policy = RetrievalPolicy(max_attempts=3, base_delay=0.001)
+    with pytest.raises(api_exceptions.ServiceUnavailable):
+        policy.call(fn, deadline_at=time.monotonic())
+    assert len(calls) == 1
+    assert policy.stats()["retries_past_deadline"] == 1
+
+    policy = RetrievalPolicy(hedge=True, hedge_percentile=50, hedge_min_samples=5)
+    for _ in range(5):
+        policy.call(lambda: time.sleep(0.01))
+    # The caller gives up before the hedge would be sent
+    policy.call(lambda: time.sleep(0.1), deadline_at=time.monotonic() + 0.005)
+    assert policy.stats()["hedges"] == 0
@@ -0,0 +1,70 @@
+"""Deadlines of corpus queries in search_all_corpora."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+
+DOCUMENTS = {
+    "gs://b/science.txt": "Photosynthesis lets green plants turn sunlight, water and carbon dioxide into food.",
+    "gs://b/maths.txt": "A fraction such as one half names a part of a whole pizza."
+}
+
+
+def _import_corpora(documents):
+    documents.update(DOCUMENTS)
+    corpus_ids = []
+    for uri in DOCUMENTS:
+        corpus_id = corpus_tools.create_rag_corpus(uri.rsplit("/", 1)[-1])["corpus_id"]
+        corpus_tools.import_document_to_corpus(corpus_id, uri)
+        corpus_ids.append(corpus_id)
+    return corpus_ids
+
+
+def test_each_corpus_query_gets_its_remaining_time(local_backend, documents):
+    _import_corpora(documents)
+    timeouts = []
+    retrieve = local_backend.retrieve
+    local_backend.retrieve = lambda *args, **kwargs: timeouts.append(kwargs["timeout"]) or retrieve(*args, **kwargs)
+
+    response = corpus_tools.search_all_corpora(
+        "photosynthesis", vector_distance_threshold=1.0, per_corpus_timeout=3, deadline_seconds=20, batched=False
+    )
+    assert response["status"] == "success"
+    assert len(timeouts) == 2 and all(0 < timeout <= 3 for timeout in timeouts)
+
+    # Direct queries have no search deadline
+    timeouts.clear()
+    corpus_tools.query_rag_corpus(local_backend.list_corpora()[0]["id"], "fractions")
+    assert timeouts == [None]
+
+
+def test_queued_corpora_missing_the_deadline_are_not_counted_against_their_breaker(
+    local_backend, documents, monkeypatch
+):
+    slow_id, queued_id = _import_corpora(documents)
+    release = threading.Event()
+    retrieve = local_backend.retrieve
+
+    def slow_first_corpus(corpus_ids, **kwargs):
+        if slow_id in corpus_ids:
+            release.wait(timeout=5)
+        return retrieve(corpus_ids, **kwargs)
+
+    local_backend.retrieve = slow_first_corpus
+    # One worker: the slow corpus holds it and the other one never starts
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(corpus_tools, "_search_executor", pool)
+
+    response = corpus_tools.search_all_corpora(
+        "photosynthesis", vector_distance_threshold=1.0, per_corpus_timeout=0.2, deadline_seconds=0.2,
+        batched=False, response_format="verbose"
+    )
+    assert {c["corpus_id"] for c in response["timed_out_corpora"]} == {slow_id, queued_id}
+
+    release.set()
+    pool.shutdown(wait=True)
+    queued = corpus_tools.corpus_breakers.get(queued_id).snapshot()
+    assert (queued["state"], queued["recent_calls"]) == ("closed", 0)
+    # The running query records its outcome once, when it finishes
+    assert corpus_tools.corpus_breakers.get(slow_id).snapshot()["recent_calls"] == 1
@@ -0,0 +1,73 @@
+"""search_all_corpora and its streaming variant share one search."""
+
+import asyncio
+import time
+
+import pytest
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+
+DOCUMENTS = {
+    "gs://b/fast.txt": "Photosynthesis makes food in green leaves using sunlight.",
+    "gs://b/slow.txt": "Photosynthesis needs sunlight, water and carbon dioxide.",
+    "gs://b/hung.txt": "Photosynthesis releases oxygen into the air."
+}
+
+
+@pytest.fixture
+def corpora(local_backend, documents):
+    documents.update(DOCUMENTS)
+    delays = {}
+    for uri, delay in zip(DOCUMENTS, (0.0, 0.2, 1.0)):
+        corpus_id = corpus_tools.create_rag_corpus(uri.rsplit("/", 1)[-1])["corpus_id"]
+        corpus_tools.import_document_to_corpus(corpus_id, uri)
+        delays[corpus_id] = delay
+    retrieve = local_backend.retrieve
+
+    def slow_retrieve(corpus_ids, **kwargs):
+        time.sleep(max(delays[corpus_id] for corpus_id in corpus_ids))
+        return retrieve(corpus_ids, **kwargs)
+
+    local_backend.retrieve = slow_retrieve
+    return list(delays)
+
+
+def _stream(**kwargs):
+    async def collect():
+        return [event async for event in corpus_tools.stream_search_all_corpora("photosynthesis sunlight", **kwargs)]
+
+    return asyncio.run(collect())
+
+
+def test_stream_reports_corpora_as_they_answer_with_growing_snapshots(corpora):
+    fast, slow, hung = corpora
+    events = _stream(vector_distance_threshold=1.0, per_corpus_timeout=0.5, search_mode="vector")
+
+    assert [(event["event"], event.get("corpus_id")) for event in events] == [
+        ("corpus_results", fast), ("corpus_results", slow), ("corpus_timed_out", hung), ("complete", None)
+    ]
+    assert [event["completed"] for event in events[:3]] == [1, 2, 3]
+    assert {result["corpus_id"] for result in events[0]["top_results"]} == {fast}
+    assert {result["corpus_id"] for result in events[1]["top_results"]} == {fast, slow}
+    scores = [result["relevance_score"] for result in events[1]["top_results"]]
+    assert scores == sorted(scores, reverse=True)
+    assert events[2]["top_results"] == events[1]["top_results"]
+
+    final = events[-1]
+    assert [corpus["corpus_id"] for corpus in final["timed_out_corpora"]] == [hung]
+    assert {result["corpus_id"] for result in final["results"]} == {fast, slow}
+
+
+def test_stream_ends_with_the_search_all_corpora_response(corpora):
+    final = _stream(vector_distance_threshold=1.0, search_mode="vector")[-1]
+    response = corpus_tools.search_all_corpora(
+        "photosynthesis sunlight", vector_distance_threshold=1.0, search_mode="vector",
+        batched=False, response_format="verbose"
+    )
+    assert final["event"] == "complete"
+    assert [r["text"] for r in final["results"]] == [r["text"] for r in response["results"]]
+    assert final["searched_corpora"] == response["searched_corpora"]
+
+
+def test_stream_yields_a_single_error_for_bad_options(corpora):
+    assert _stream(search_mode="fuzzy") == [corpus_tools._invalid_search_mode_error("fuzzy")]
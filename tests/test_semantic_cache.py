@@ -0,0 +1,60 @@
+"""The semantic cache of search responses."""
+
+import time
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.semantic_cache import SemanticQueryCache
+
+OPTIONS = ("vector", 5)
+
+
+def _cache(**overrides):
+    settings = dict(similarity_threshold=0.9, max_entries=10, ttl_seconds=60)
+    settings.update(overrides)
+    return SemanticQueryCache(**settings)
+
+
+def test_rephrased_queries_reuse_the_response():
+    cache = _cache()
+    cache.put("teach fractions to class 5", OPTIONS, {"results": ["fractions"]})
+    response, similarity = cache.get("grade 5 fractions lesson", OPTIONS)
+    assert response == {"results": ["fractions"]} and similarity >= 0.9
+
+
+def test_different_numbers_options_or_topics_miss():
+    cache = _cache()
+    cache.put("teach fractions to class 5", OPTIONS, {"results": []})
+    assert cache.get("teach fractions to class 6", OPTIONS) is None
+    assert cache.get("teach fractions to class 5", ("keyword", 5)) is None
+    assert cache.get("photosynthesis in plants", OPTIONS) is None
+    assert cache.stats()["misses"] == 3
+
+
+def test_entries_are_evicted_and_expire():
+    cache = _cache(max_entries=2)
+    for topic in ("fractions", "photosynthesis", "mauryan empire"):
+        cache.put(topic, OPTIONS, {"topic": topic})
+    assert cache.get("fractions", OPTIONS) is None
+    assert cache.get("mauryan empire", OPTIONS)[0] == {"topic": "mauryan empire"}
+
+    cache = _cache(ttl_seconds=0.05)
+    cache.put("fractions", OPTIONS, {})
+    time.sleep(0.06)
+    assert cache.get("fractions", OPTIONS) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_similar_searches_are_answered_from_the_cache(local_backend, documents):
+    documents["gs://b/maths.txt"] = "A fraction such as one half names a part of a whole."
+    corpus_id = corpus_tools.create_rag_corpus("Maths")["corpus_id"]
+    corpus_tools.import_document_to_corpus(corpus_id, "gs://b/maths.txt")
+    first = corpus_tools.search_all_corpora("teach fractions to class 5", vector_distance_threshold=1.0)
+    second = corpus_tools.search_all_corpora("grade 5 fractions lesson", vector_distance_threshold=1.0)
+    assert "semantic_cache" not in first
+    assert second["semantic_cache"]["matched_query"] == "teach fractions to class 5"
+    assert second["results"] == first["results"]
+
+    # New files make every cached search stale
+    documents["gs://b/more.txt"] = "Fractions with equal denominators are added by adding numerators."
+    corpus_tools.import_document_to_corpus(corpus_id, "gs://b/more.txt")
+    assert "semantic_cache" not in corpus_tools.search_all_corpora("grade 5 fractions lesson", vector_distance_threshold=1.0)
@@ -0,0 +1,61 @@
+"""Coalescing of identical in-flight calls."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.single_flight import SingleFlight
+
+
+def _concurrent_calls(flight, key, fn, callers=5):
+    started = threading.Barrier(callers)
+
+    def call():
+        started.wait()
+        return flight.do(key, fn)
+
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        return [executor.submit(call) for _ in range(callers)]
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def fetch():
+        executions.append(1)
+        release.wait(timeout=5)
+        return {"results": [{"text": "photosynthesis"}]}
+
+    threading.Timer(0.2, release.set).start()
+    results = [future.result() for future in _concurrent_calls(flight, "key", fetch)]
+    assert len(executions) == 1
+    assert all(result == {"results": [{"text": "photosynthesis"}]} for result in results)
+    # Every caller gets its own copy to annotate
+    assert len({id(result) for result in results}) == 5
+    assert flight.stats()["coalesced"] == 4
+
+
+def test_waiters_receive_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(timeout=5)
+        raise RuntimeError("upstream down")
+
+    threading.Timer(0.2, release.set).start()
+    for future in _concurrent_calls(flight, "key", fail, callers=3):
+        with pytest.raises(RuntimeError, match="upstream down"):
+            future.result()
+
+
+def test_finished_calls_are_not_reused():
+    flight = SingleFlight()
+    calls = []
+    assert flight.do("key", lambda: calls.append(1) or len(calls)) == 1
+    assert flight.do("key", lambda: calls.append(1) or len(calls)) == 2
+    assert flight.do("other", lambda: "other") == "other"
+    assert flight.stats()["in_flight"] == 0
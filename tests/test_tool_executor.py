@@ -0,0 +1,52 @@
+"""Blocking tools run on the tool executor, off the event loop."""
+
+import asyncio
+import threading
+
+from google.adk.tools import FunctionTool
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.tool_executor import (
+    ExecutorFunctionTool,
+    get_tool_executor_stats
+)
+
+
+def lookup_chapter(chapter: int) -> dict:
+    """
+    Looks up a textbook chapter.
+
+    Args:
+        chapter: Chapter number
+    """
+    return {"chapter": chapter}
+
+
+def test_the_event_loop_keeps_ticking_while_a_blocking_tool_runs():
+    ticked = threading.Event()
+
+    def blocking_tool(chapter: int) -> dict:
+        """Blocks its thread until the event loop has ticked."""
+        return {"chapter": chapter, "loop_ticked": ticked.wait(timeout=5)}
+
+    async def heartbeat():
+        for _ in range(3):
+            await asyncio.sleep(0.01)
+        ticked.set()
+
+    async def run():
+        completed_before = get_tool_executor_stats()["completed"]
+        result, _ = await asyncio.gather(
+            ExecutorFunctionTool(blocking_tool).run_async(args={"chapter": 4}, tool_context=None),
+            heartbeat()
+        )
+        return result, get_tool_executor_stats()["completed"] - completed_before
+
+    result, completed = asyncio.run(run())
+    assert result == {"chapter": 4, "loop_ticked": True}
+    assert completed == 1
+
+
+def test_the_model_sees_the_plain_function_declaration():
+    declaration = ExecutorFunctionTool(lookup_chapter)._get_declaration()
+    assert declaration == FunctionTool(lookup_chapter)._get_declaration()
+    assert "Looks up a textbook chapter" in declaration.description
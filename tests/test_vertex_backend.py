@@ -0,0 +1,136 @@
+"""Vertex AI backend behaviour, checked with Vertex-shaped SDK objects."""
+
+import pytest
+from google.api_core.exceptions import DeadlineExceeded
+from google.cloud import aiplatform_v1beta1
+
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.backends import vertex
+from lesson_planner.sub_agents.curriculum_content_retriever.tools.result_merge import TopKMerger
+
+Context = aiplatform_v1beta1.RagContexts.Context
+
+
+class _FakeRagServiceClient:
+    def __init__(self, contexts):
+        self.contexts = contexts
+        self.requests = []
+        self.timeouts = []
+
+    def retrieve_contexts(self, request, timeout=None):
+        self.timeouts.append(timeout)
+        self.requests.append(request)
+        return aiplatform_v1beta1.RetrieveContextsResponse(
+            contexts=aiplatform_v1beta1.RagContexts(contexts=self.contexts)
+        )
+
+
+@pytest.fixture
+def vertex_backend():
+    # Skip vertexai.init; nothing here reaches Google Cloud
+    backend = vertex.VertexRagBackend.__new__(vertex.VertexRagBackend)
+    backend.project_id = "test-project"
+    backend.location = "us-central1"
+    return backend
+
+
+def _serve(monkeypatch, contexts):
+    client = _FakeRagServiceClient(contexts)
+    monkeypatch.setattr(vertex, "get_rag_service_client", lambda location: client)
+    return client
+
+
+def test_cosine_distance_scores_become_similarities():
+    assert vertex._context_relevance(Context(score=0.1)) == pytest.approx(0.9)
+    assert vertex._context_relevance(Context(distance=0.3)) == pytest.approx(0.7)
+    assert vertex._context_relevance(Context(score=0.0)) == pytest.approx(1.0)
+
+
+def test_closer_contexts_rank_first(monkeypatch, vertex_backend):
+    _serve(monkeypatch, [
+        Context(text="far", source_uri="gs://b/far.pdf", score=0.45),
+        Context(text="near", source_uri="gs://b/near.pdf", score=0.1)
+    ])
+    results = vertex_backend.retrieve(["c1"], "photosynthesis", top_k=5, vector_distance_threshold=0.5)
+    assert [r["corpus_id"] for r in results] == ["c1", "c1"]
+
+    merger = TopKMerger(max_results=1)
+    merger.add(results)
+    assert [r["text"] for r in merger.results()] == ["near"]
+
+
+def test_retrieve_sends_one_resource_per_corpus(monkeypatch, vertex_backend):
+    client = _serve(monkeypatch, [])
+    vertex_backend.retrieve(["c1"], "fractions", top_k=3, vector_distance_threshold=0.4)
+    request = client.requests[0]
+    assert [r.rag_corpus for r in request.vertex_rag_store.rag_resources] == [
+        "projects/test-project/locations/us-central1/ragCorpora/c1"
+    ]
+    assert request.query.rag_retrieval_config.top_k == 3
+    assert request.query.rag_retrieval_config.filter.vector_distance_threshold == pytest.approx(0.4)
+    assert client.timeouts == [None]
+
+
+def test_retrieve_gives_the_rpc_what_is_left_of_the_timeout(monkeypatch, vertex_backend):
+    client = _serve(monkeypatch, [])
+    vertex_backend.retrieve(["c1"], "fractions", top_k=3, vector_distance_threshold=0.4, timeout=5.0)
+    assert 4.0 < client.timeouts[0] <= 5.0
+
+    with pytest.raises(DeadlineExceeded):
+        vertex_backend.retrieve(["c1"], "fractions", top_k=3, vector_distance_threshold=0.4, timeout=0.0)
+    assert len(client.requests) == 1
+
+
+class _FakeFilesPager:
+    """Stands in for ListRagFilesPager: one page that also iterates its files."""
+
+    def __init__(self, rag_files):
+        self.rag_files = rag_files
+        self.next_page_token = ""
+
+    def __iter__(self):
+        return iter(self.rag_files)
+
+
+def _rag_file(file_id, uri):
+    return aiplatform_v1beta1.RagFile(
+        name=f"projects/test-project/locations/us-central1/ragCorpora/c1/ragFiles/{file_id}",
+        display_name=uri.rsplit("/", 1)[-1],
+        gcs_source=aiplatform_v1beta1.GcsSource(uris=[uri])
+    )
+
+
+def test_file_source_uri_comes_from_the_import_source():
+    assert vertex._file_source_uri(_rag_file("f1", "gs://b/a.pdf")) == "gs://b/a.pdf"
+    drive_file = aiplatform_v1beta1.RagFile(google_drive_source=aiplatform_v1beta1.GoogleDriveSource(
+        resource_ids=[aiplatform_v1beta1.GoogleDriveSource.ResourceId(resource_id="abc")]
+    ))
+    assert vertex._file_source_uri(drive_file) == "https://drive.google.com/file/d/abc"
+    assert vertex._file_source_uri(aiplatform_v1beta1.RagFile()) is None
+
+
+def test_sync_sees_the_files_already_in_a_vertex_corpus(monkeypatch, vertex_backend):
+    from lesson_planner.sub_agents.curriculum_content_retriever.tools import corpus_tools
+    from lesson_planner.sub_agents.curriculum_content_retriever.tools.backends.local import LocalVectorBackend
+
+    rag_files = [_rag_file("f1", "gs://b/syllabus/a.pdf"), _rag_file("f2", "gs://b/syllabus/old.pdf")]
+    imported, deleted = [], []
+    monkeypatch.setattr(vertex.rag, "list_files", lambda corpus_name, **kwargs: _FakeFilesPager(rag_files))
+    monkeypatch.setattr(vertex.rag, "import_files", lambda corpus_name, uris: imported.extend(uris))
+    monkeypatch.setattr(vertex.rag, "delete_file", lambda name: deleted.append(name.rsplit("/", 1)[-1]))
+    monkeypatch.setattr(corpus_tools, "list_gcs_objects", lambda prefix: [
+        {"uri": "gs://b/syllabus/a.pdf", "generation": 1, "md5_hash": "x"},
+        {"uri": "gs://b/syllabus/new.pdf", "generation": 1, "md5_hash": "y"}
+    ])
+    corpus_tools.set_retrieval_backend(vertex_backend)
+    try:
+        files, _ = vertex_backend.list_files("c1")
+        assert [f["source_uri"] for f in files] == ["gs://b/syllabus/a.pdf", "gs://b/syllabus/old.pdf"]
+        result = corpus_tools.sync_corpus_with_gcs("c1", "gs://b/syllabus/")
+    finally:
+        corpus_tools.set_retrieval_backend(LocalVectorBackend())
+    assert result["status"] == "success", result
+    assert (result["new"], result["removed"], result["unchanged_count"]) == (
+        ["gs://b/syllabus/new.pdf"], ["gs://b/syllabus/old.pdf"], 1
+    )
+    assert imported == ["gs://b/syllabus/new.pdf"]
+    assert deleted == ["f2"]